@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Add api folder to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from http_handler import make_handler
+import service
+
+# Logika endpoint ada di service.py (sama dengan index.py / backend-ml)
+handler = make_handler(service.anomalies)
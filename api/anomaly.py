@@ -0,0 +1,378 @@
+"""
+Deteksi anomali online: hari dengan revenue / pengeluaran tidak biasa dan
+stok barang yang turun lebih cepat dari pemakaian menurut resep (BOM).
+
+Setiap series punya RobustDetector: baseline EWMA dan sebaran EWMA deviasi
+absolut (MAD eksponensial). Satu titik baru = satu update O(1); skor
+(x - baseline) / sebaran dihitung dengan statistik sebelum titik itu masuk,
+jadi anomali tidak "menyembunyikan" dirinya sendiri. Error yang masuk ke
+kedua EWMA dipotong ke +-HUBER_K x sebaran (Huber), jadi satu lonjakan
+tidak menggeser baseline / melebarkan sebaran sampai anomali berikutnya
+lolos.
+
+Seed (sekali per proses, tanpa loop per titik):
+- revenue / expense harian dari financials (hari tanpa transaksi = 0),
+  seluruh histori di-filter dengan scipy.signal.lfilter (beberapa pass
+  sampai titik yang dipotong stabil, hasil sama dengan update() per titik)
+- stok per barang: yang dinilai adalah selisih harian pemakaian aktual -
+  pemakaian menurut BOM (unit transaksi per layanan x jumlah_dipakai_per_unit),
+  hari tanpa pemakaian tercatat = 0. inventory_items hanya menyimpan stok
+  terakhir, jadi pemakaian aktual dibaca dari reconciliation.ledger
+  (penurunan stok_sisa dari event change feed) mulai hari yang tercakup
+  ledger; tidak ada histori untuk di-seed
+
+Setelah itu hanya hari yang baru ditutup (sebelum hari ini, jam lokal toko)
+yang diproses; histori tidak pernah dihitung ulang. Koreksi data pada hari
+yang sudah diproses tidak mengubah baseline.
+"""
+import math
+import threading
+from collections import deque
+from datetime import timedelta
+import numpy as np
+from db import get_client, execute
+from date_parser import local_today
+from fetch_data import get_financial_series
+from workload import load_transactions
+from reconciliation import expected_usage, ledger
+import metrics
+from logger import get_logger
+
+log = get_logger(__name__)
+
+ALPHA = 0.1             # Bobot titik baru EWMA (~rata-rata 19 hari terakhir)
+THRESHOLD = 3.5         # |skor| minimum untuk dianggap anomali
+WARMUP = 14             # Titik pertama yang hanya membangun baseline
+MIN_SPREAD = 0.01       # Sebaran minimum relatif terhadap baseline / skala series (series datar)
+HUBER_K = 2.0           # Error EWMA dipotong ke +-HUBER_K x sebaran setelah warm-up
+MAX_FIT_PASSES = 50     # Batas pass fit() sebelum jatuh ke update() per titik
+MAD_TO_SIGMA = math.sqrt(math.pi / 2)  # Deviasi absolut rata-rata -> sigma (normal)
+MAX_ANOMALIES = 1000    # Anomali terbaru yang disimpan
+
+# Arah yang dianggap anomali per jenis series
+DIRECTIONS = {'revenue': 'both', 'expense': 'up', 'stock': 'up'}
+
+
+def _lfilter():
+    # scipy (dependency sklearn) hanya dipakai saat seed
+    from scipy.signal import lfilter
+    return lfilter
+
+
+class RobustDetector:
+    """EWMA + EWMA deviasi absolut (error dipotong Huber) untuk satu series; update O(1)"""
+    def __init__(self, series, kind, label=None, scale=0.0):
+        self.series = series
+        self.kind = kind
+        self.label = label or series
+        self.scale = scale      # Besaran tipikal series (sebaran minimum jika baseline ~0)
+        self.mean = None
+        self.dev = 0.0
+        self.count = 0
+        self.last_date = None
+
+    def _spread(self, mean, dev):
+        """Sebaran (sigma) dari statistik EWMA; skalar atau array"""
+        floor = np.maximum(np.abs(mean), self.scale) * MIN_SPREAD
+        return np.maximum(np.maximum(dev * MAD_TO_SIGMA, floor), 1e-9)
+
+    def _flagged(self, score):
+        direction = DIRECTIONS[self.kind]
+        if direction == 'up':
+            return score >= THRESHOLD
+        if direction == 'down':
+            return score <= -THRESHOLD
+        return np.abs(score) >= THRESHOLD
+
+    def _anomaly(self, day, value, expected, score):
+        return {
+            'series': self.series,
+            'label': self.label,
+            'kind': self.kind,
+            'date': str(day),
+            'value': float(value),
+            'expected': float(expected),
+            'score': round(float(score), 2),
+            'direction': 'naik' if score > 0 else 'turun'
+        }
+
+    def update(self, day, value, offset=0.0):
+        """
+        Masukkan satu titik; yang dinilai value - offset (offset = nilai yang
+        diharapkan dari luar, mis. pemakaian menurut BOM)
+        Returns: anomali (dict) atau None
+        """
+        anomaly = None
+        x = value - offset
+        if self.mean is None:
+            self.mean = float(x)
+        else:
+            error = x - self.mean
+            if self.count >= WARMUP:
+                spread = float(self._spread(self.mean, self.dev))
+                score = error / spread
+                if self._flagged(score):
+                    anomaly = self._anomaly(day, value, offset + self.mean, score)
+                error = min(max(error, -HUBER_K * spread), HUBER_K * spread)
+            self.mean += ALPHA * error
+            self.dev += ALPHA * (abs(error) - self.dev)
+        self.count += 1
+        self.last_date = day
+        return anomaly
+
+    def fit(self, dates, values, flag=True):
+        """
+        Seed dari histori secara vectorized; hasil sama dengan memanggil
+        update() per titik. Returns: list anomali (kosong jika flag=False)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return []
+        paths = self._fit_paths(values)
+        if paths is None:
+            return self._fit_sequential(dates, values, flag)
+        means, devs = paths
+
+        anomalies = []
+        if flag and n > WARMUP:
+            # Skor titik t memakai statistik setelah titik t-1
+            prior_mean = means[WARMUP - 1:-1]
+            scores = (values[WARMUP:] - prior_mean) / self._spread(prior_mean, devs[WARMUP - 1:-1])
+            day_strings = np.asarray(dates, dtype='datetime64[D]')[WARMUP:]
+            for i in np.flatnonzero(self._flagged(scores)).tolist():
+                anomalies.append(self._anomaly(day_strings[i], values[WARMUP + i], prior_mean[i], scores[i]))
+
+        self.mean = float(means[-1])
+        self.dev = float(devs[-1])
+        self.count = n
+        self.last_date = np.asarray(dates, dtype='datetime64[D]')[-1].item()
+        return anomalies
+
+    def _fit_paths(self, values):
+        """
+        means[t] / devs[t] = statistik setelah titik t. Rekursi dengan error
+        terpotong tidak linear, jadi dihitung sebagai fixed point: potong error
+        memakai jalur dari pass sebelumnya, filter ulang dengan lfilter, ulangi
+        sampai jalur tidak berubah (biasanya beberapa pass).
+        Returns: (means, devs), atau None jika tidak konvergen
+        """
+        lfilter = _lfilter()
+        decay = 1 - ALPHA
+        n = len(values)
+        means = np.empty(n)
+        devs = np.zeros(n)
+        means[0] = values[0]
+        if n == 1:
+            return means, devs
+
+        # Pass pertama tanpa pemotongan; error titik t (t >= 1) baru dipotong
+        # setelah warm-up (t >= WARMUP)
+        unclipped = np.arange(1, n) < WARMUP
+        inputs = values[1:]
+        limit = np.full(n - 1, np.inf)
+        for _ in range(MAX_FIT_PASSES):
+            means[1:], _ = lfilter([ALPHA], [1, -decay], inputs, zi=[decay * values[0]])
+            clipped = np.clip(values[1:] - means[:-1], -limit, limit)
+            devs[1:] = lfilter([ALPHA], [1, -decay], np.abs(clipped))
+
+            # Input efektif EWMA: baseline sebelumnya + error terpotong
+            next_inputs = means[:-1] + clipped
+            next_limit = HUBER_K * self._spread(means[:-1], devs[:-1])
+            next_limit[unclipped] = np.inf
+            if np.allclose(next_inputs, inputs, rtol=1e-12, atol=0) and np.allclose(next_limit, limit, rtol=1e-12, atol=0):
+                return means, devs
+            inputs, limit = next_inputs, next_limit
+        return None
+
+    def _fit_sequential(self, dates, values, flag):
+        anomalies = []
+        for day, value in zip(np.asarray(dates, dtype='datetime64[D]').tolist(), values.tolist()):
+            anomaly = self.update(day, value)
+            if anomaly is not None and flag:
+                anomalies.append(anomaly)
+        return anomalies
+
+    def info(self):
+        return {
+            'label': self.label,
+            'kind': self.kind,
+            'expected': self.mean,
+            'spread': float(self._spread(self.mean, self.dev)) if self.mean is not None else None,
+            'points': self.count,
+            'last_date': str(self.last_date) if self.last_date else None
+        }
+
+
+def _dense_daily(dates, values, end):
+    """Series harian rapat (hari kosong = 0) dari tanggal pertama sampai sebelum `end`"""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    keep = dates < np.datetime64(end, 'D')
+    dates, values = dates[keep], np.asarray(values, dtype=np.float64)[keep]
+    if len(dates) == 0:
+        return dates, values
+    axis = np.arange(dates[0], dates[-1] + 1)
+    dense = np.zeros((len(axis),) + values.shape[1:], dtype=np.float64)
+    np.add.at(dense, (dates - dates[0]).astype(np.int64), values)
+    return axis, dense
+
+
+class AnomalyMonitor:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seed_lock = threading.Lock()
+        self.detectors = None       # {series: RobustDetector}
+        self.anomalies = deque(maxlen=MAX_ANOMALIES)
+        self.expected = {}          # {id_inventory_item: (dates, pemakaian BOM harian)}
+        self.synced_day = None      # Hari lokal terakhir financials & pemakaian BOM diproses
+
+    # --- SEED ---
+
+    def seed(self):
+        """Bangun semua detector dari histori (sekali), vectorized per series"""
+        today = local_today()
+        with metrics.stage('fetch'):
+            financials = get_financial_series()
+        items, expected = self._load_expected(today)
+        ledger.seed_stock(items)  # Mulai mencatat pemakaian aktual jika change feed terhubung
+
+        detectors, anomalies = {}, []
+        with metrics.stage('aggregate'):
+            dates, revenue, expense = financials
+            if dates is not None:
+                axis, dense = _dense_daily(dates, np.column_stack([revenue, expense]), today)
+                for column, name in enumerate(('revenue', 'expense')):
+                    detectors[name] = RobustDetector(name, name)
+                    anomalies += detectors[name].fit(axis, dense[:, column])
+
+            # Stok: belum ada histori pemakaian aktual, detector mulai dari titik pertama ledger
+            for item_id, (_, usage) in expected.items():
+                name = f"stock:{item_id}"
+                detectors[name] = RobustDetector(name, 'stock', item_id, scale=float(usage.mean()))
+
+            for item in items:
+                detector = detectors.get(f"stock:{item['id_inventory_item']}")
+                if detector is not None and item.get('nama_barang'):
+                    detector.label = item['nama_barang']
+
+        with self.lock:
+            self.detectors = detectors
+            self.expected = expected
+            self.synced_day = today
+            self.anomalies.clear()
+            self.anomalies.extend(sorted(anomalies, key=lambda a: a['date']))
+
+    def _load_expected(self, today):
+        """Returns: (baris inventory_items, pemakaian BOM harian per barang)"""
+        with metrics.stage('fetch'):
+            transactions = load_transactions()
+            supabase = get_client()
+            bom = execute(supabase.table('service_bom') \
+                .select('service_id, id_inventory_item, jumlah_dipakai_per_unit')).data or []
+            items = execute(supabase.table('inventory_items') \
+                .select('id_inventory_item, nama_barang, stok_sisa')).data or []
+        with metrics.stage('aggregate'):
+            return items, self._bom_usage(transactions, bom, items, today)
+
+    def _bom_usage(self, transactions, bom, items, today):
+        """
+        Pemakaian harian per barang menurut BOM sampai kemarin (reconciliation.expected_usage)
+        Returns: {id_inventory_item: (dates, pemakaian)}
+        """
+        if transactions is None or not bom:
+            return {}
+        item_ids = sorted({row['id_inventory_item'] for row in bom} | {item['id_inventory_item'] for item in items})
+        dates, usage = expected_usage(transactions, bom, item_ids)
+        closed = int(np.searchsorted(dates, np.datetime64(today, 'D'), side='left'))
+        if closed == 0:
+            return {}
+        usage = usage[:, :closed].toarray()
+        used = np.flatnonzero(usage.any(axis=1))
+        return {item_ids[i]: (dates[:closed], usage[i]) for i in used.tolist()}
+
+    def ensure_seeded(self):
+        if self.detectors is not None:
+            return
+        with self.seed_lock:
+            if self.detectors is None:
+                self.seed()
+
+    # --- UPDATE (O(1) per titik baru) ---
+
+    def sync(self):
+        """Proses hari yang baru ditutup sejak update terakhir"""
+        self.ensure_seeded()
+        today = local_today()
+
+        # Hari baru ditutup paling banyak sekali per hari lokal
+        financials, expected = (None, None, None), None
+        if self.synced_day != today:
+            financials = get_financial_series()
+            _, expected = self._load_expected(today)
+        dates, revenue, expense = financials
+        with self.lock:
+            if expected is not None:
+                self.expected = expected
+            if dates is not None:
+                self.synced_day = today
+                for name, values in (('revenue', revenue), ('expense', expense)):
+                    detector = self.detectors.get(name)
+                    if detector is None or detector.last_date is None:
+                        continue
+                    start = np.datetime64(detector.last_date + timedelta(days=1), 'D')
+                    axis, dense = _dense_daily(dates, values, today)
+                    new = axis >= start
+                    for day, value in zip(axis[new].tolist(), dense[new].tolist()):
+                        self._record(detector.update(day, value))
+            self._close_stock_days(today)
+
+    def _close_stock_days(self, today):
+        """
+        Selisih pemakaian aktual (ledger) - pemakaian BOM untuk setiap hari
+        tercakup ledger yang sudah ditutup; hari tanpa pemakaian tercatat = 0
+        """
+        if ledger.since is None:
+            return
+        yesterday = today - timedelta(days=1)
+        consumed = ledger.consumption(ledger.since, yesterday)
+        for item_id in set(consumed) | set(self.expected):
+            name = f"stock:{item_id}"
+            detector = self.detectors.get(name)
+            if detector is None:
+                detector = self.detectors[name] = RobustDetector(name, 'stock', item_id)
+            day = ledger.since if detector.last_date is None else max(detector.last_date + timedelta(days=1), ledger.since)
+            used = consumed.get(item_id, {})
+            while day <= yesterday:
+                self._record(detector.update(day, used.get(day, 0.0), offset=self._expected_on(item_id, day)))
+                day += timedelta(days=1)
+
+    def _expected_on(self, item_id, day):
+        """Pemakaian menurut BOM satu barang pada satu hari (0 jika tidak ada transaksi)"""
+        if item_id not in self.expected:
+            return 0.0
+        dates, usage = self.expected[item_id]
+        index = int((np.datetime64(day, 'D') - dates[0]).astype(np.int64))
+        return float(usage[index]) if 0 <= index < len(usage) else 0.0
+
+    def _record(self, anomaly):
+        if anomaly is not None:
+            self.anomalies.append(anomaly)
+            log.warning("anomaly detected", extra=anomaly)
+
+    # --- QUERY ---
+
+    def report(self, days=30):
+        """Anomali dalam `days` hari terakhir data + baseline setiap series"""
+        self.sync()
+        with self.lock:
+            last_dates = [d.last_date for d in self.detectors.values() if d.last_date is not None]
+            since = str(max(last_dates) - timedelta(days=days - 1)) if last_dates else None
+            recent = [a for a in self.anomalies if since is None or a['date'] >= since]
+            return {
+                'since': since,
+                'anomalies': sorted(recent, key=lambda a: (a['date'], -abs(a['score'])), reverse=True),
+                'series': {name: detector.info() for name, detector in self.detectors.items()}
+            }
+
+
+monitor = AnomalyMonitor()
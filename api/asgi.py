@@ -0,0 +1,139 @@
+"""
+ASGI adapter untuk server long-running.
+
+POST /api/chatbot dijawab langsung di event loop: non-streaming lewat
+service.chat_async, SSE lewat service.chat_stream_async (token dikirim
+begitu gateway menerimanya). Ratusan chat yang menunggu Groq tidak memakan
+satu thread per request. Request lain diteruskan ke Flask app (index.py).
+
+Dijalankan dari backend-ml (app.asgi_app, konfigurasi di gunicorn.conf.py):
+
+    cd backend-ml
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn app:asgi_app
+"""
+import asyncio
+import json
+from asgiref.wsgi import WsgiToAsgi
+from index import app as flask_app
+import service
+import serialize
+import metrics
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def wait_disconnect(receive):
+    """Selesai saat client menutup koneksi (body request sudah dibaca habis)"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_sse(send, receive, events):
+    """Kirim async iterator SSE (str) per potongan; berhenti jika client putus"""
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),  # Jangan di-buffer oleh proxy
+        (b'access-control-allow-origin', b'*'),
+    ]})
+
+    async def pump():
+        async for message in events:
+            await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    streaming = asyncio.ensure_future(pump())
+    disconnected = asyncio.ensure_future(wait_disconnect(receive))
+    await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    if streaming.done():
+        disconnected.cancel()
+        streaming.result()
+    else:
+        # Client pergi: CancelledError masuk ke iterator -> panggilan upstream di gateway dibatalkan
+        streaming.cancel()
+        try:
+            await streaming
+        except asyncio.CancelledError:
+            pass
+
+
+async def send_json(send, payload, status_code=200, headers=None, timing=None):
+    body = serialize.dumps(payload)
+    raw_headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+        (b'access-control-allow-origin', b'*'),
+    ]
+    if timing is not None:
+        # timing = (endpoint, waktu mulai dari metrics.begin_request())
+        server_timing = metrics.end_request(timing[0], status_code, timing[1])
+        raw_headers.append((b'server-timing', server_timing.encode()))
+    for key, value in (headers or {}).items():
+        raw_headers.append((key.lower().encode(), str(value).encode()))
+
+    await send({'type': 'http.response.start', 'status': status_code, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            service.start_warm_up()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] == '/api/chatbot':
+        body = await read_body(receive)
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+
+        body_error = service.chat_body_error(data)
+        if body_error:
+            await send_json(send, *body_error)
+            return
+
+        headers = dict(scope.get('headers') or [])
+        accept = headers.get(b'accept', b'').decode('latin-1')
+
+        started = metrics.begin_request()
+        if not service.wants_stream(data, accept):
+            payload, status_code, *headers = await service.chat_async(data)
+            await send_json(send, payload, status_code, *headers, timing=(scope['path'], started))
+            return
+
+        message, error_result = service.validate_chat_body(data)
+        bot = None
+        if error_result is None:
+            bot = await asyncio.to_thread(service.get_chatbot)
+            if bot is None:
+                error_result = service.chatbot_not_ready()
+        if error_result:
+            await send_json(send, *error_result, timing=(scope['path'], started))
+            return
+
+        await send_sse(send, receive, service.chat_stream_async(bot, message))
+        metrics.end_request(scope['path'], 200, started)
+        return
+
+    await wsgi_app(scope, receive, send)
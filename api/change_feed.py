@@ -0,0 +1,205 @@
+"""
+Change feed: perubahan baris dari database diterapkan langsung ke state
+in-process, tanpa polling atau fetch ulang seluruh tabel.
+
+    financials                                -> data financials, revenue harian & rollup /api/historical per hari (fetch_data.py)
+    transactions, inventory_items, service_bom -> usage index inventory (inventory.py)
+    transactions                              -> histogram ETA pesanan (turnaround.py)
+    inventory_items                           -> pemakaian stok harian (anomaly.py, reconciliation.py)
+    faq                                       -> index FAQ chatbot (service.py)
+
+Modul pemilik state mendaftarkan handler dengan subscribe(table, handler);
+handler dipanggil handler(op, new, old) dengan op INSERT | UPDATE | DELETE.
+Handler harus idempotent (upsert / delete per primary key), karena event
+yang datang selama fetch penuh berjalan diputar ulang setelahnya.
+
+Sumber event (CHANGE_FEED, satu listener per proses / worker):
+- off      : nonaktif (default, mis. serverless)
+- local    : client lokal DATA_SOURCE=memory|sqlite memancarkan event setiap
+             insert/update/delete (fake_supabase.py), untuk development & test
+- postgres : LISTEN/NOTIFY ke CHANGE_FEED_DSN (butuh psycopg), trigger di
+             database memanggil pg_notify (lihat CHANGE_FEED_SQL)
+
+Selama sumber terhubung (is_live()), data financials dianggap selalu terkini
+sehingga request tidak me-refresh dari Supabase. Jika koneksi putus,
+fetch_data kembali ke stale-while-revalidate biasa.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from config import CHANGE_FEED, CHANGE_FEED_DSN, CHANGE_FEED_CHANNEL
+import metrics
+from logger import get_logger
+
+log = get_logger(__name__)
+
+TABLES = ('financials', 'transactions', 'inventory_items', 'service_bom', 'faq')
+OPERATIONS = ('INSERT', 'UPDATE', 'DELETE')
+
+PRIMARY_KEYS = {
+    'financials': ('id_transaksi',),
+    'transactions': ('id_transaction',),
+    'inventory_items': ('id_inventory_item',),
+    'service_bom': ('service_id', 'id_inventory_item'),
+    'faq': ('id',),
+}
+
+# Trigger untuk CHANGE_FEED=postgres (jalankan sekali di SQL editor Supabase);
+# channel NOTIFY mengikuti CHANGE_FEED_CHANNEL yang di-LISTEN oleh _listen_postgres
+CHANGE_FEED_SQL = """
+create or replace function apiklaundry_notify_change() returns trigger as $$
+begin
+  perform pg_notify('%s', json_build_object(
+    'type', tg_op, 'table', tg_table_name,
+    'record', case when tg_op = 'DELETE' then null else row_to_json(new) end,
+    'old_record', case when tg_op = 'INSERT' then null else row_to_json(old) end
+  )::text);
+  return null;
+end;
+$$ language plpgsql;
+
+-- ulangi untuk transactions, inventory_items, service_bom, faq
+create trigger financials_changes after insert or update or delete on financials
+  for each row execute function apiklaundry_notify_change();
+""" % CHANGE_FEED_CHANNEL.replace("'", "''")
+
+_handlers = {table: [] for table in TABLES}
+_state = {
+    'source': None,
+    'connected': False,
+    'generation': 0,  # Naik setiap (re)connect: event selama putus mungkin hilang
+    'events': 0,
+    'last_event_at': None,
+    'error': None
+}
+_state_lock = threading.Lock()
+
+
+def subscribe(table, handler):
+    """Daftarkan handler(op, new, old) untuk perubahan satu tabel"""
+    _handlers[table].append(handler)
+
+
+def row_key(table, row):
+    """Primary key baris (tuple) untuk tabel yang didukung"""
+    return tuple(row.get(column) for column in PRIMARY_KEYS[table])
+
+
+def parse_event(payload):
+    """
+    Normalisasi payload event:
+    - webhook / trigger NOTIFY: {'type', 'table', 'record', 'old_record'}
+    - Supabase realtime (postgres_changes): {'eventType', 'table', 'new', 'old'}
+    Returns: (table, op, new, old)
+    Raises: ValueError jika tabel/operasi tidak dikenal
+    """
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+
+    table = payload.get('table')
+    op = (payload.get('type') or payload.get('eventType') or '').upper()
+    new = payload.get('record', payload.get('new')) or None
+    old = payload.get('old_record', payload.get('old')) or None
+
+    if table not in _handlers:
+        raise ValueError(f"Unsupported table: {table}")
+    if op not in OPERATIONS:
+        raise ValueError(f"Unsupported operation: {op}")
+    if (op == 'DELETE' and not old) or (op != 'DELETE' and not new):
+        raise ValueError(f"Missing row data for {op} on {table}")
+    return table, op, new, old
+
+
+def apply(payload):
+    """Terapkan satu event ke semua handler tabelnya"""
+    table, op, new, old = parse_event(payload)
+    with metrics.stage('change_feed'):
+        for handler in _handlers[table]:
+            try:
+                handler(op, new, old)
+            except Exception:
+                log.exception("change handler failed", extra={'table': table, 'op': op})
+
+    with _state_lock:
+        _state['events'] += 1
+        _state['last_event_at'] = time.time()
+
+
+def is_live():
+    """True selama sumber event terhubung (state in-process dijaga terkini)"""
+    with _state_lock:
+        return _state['connected']
+
+
+def generation():
+    """
+    Nomor koneksi saat ini. State yang di-seed pada generasi sebelumnya
+    harus di-fetch ulang (event selama koneksi putus tidak diterima).
+    """
+    with _state_lock:
+        return _state['generation']
+
+
+def _set_connected(connected, error=None):
+    with _state_lock:
+        changed = _state['connected'] != connected
+        _state['connected'] = connected
+        if changed and connected:
+            _state['generation'] += 1
+        _state['error'] = error
+    if changed:
+        log.info("change feed connected" if connected else "change feed disconnected",
+                 extra={'source': _state['source'], 'error': error})
+
+
+def status():
+    with _state_lock:
+        last = _state['last_event_at']
+        return {
+            'source': _state['source'],
+            'connected': _state['connected'],
+            'generation': _state['generation'],
+            'events': _state['events'],
+            'last_event_at': datetime.fromtimestamp(last, timezone.utc).isoformat() if last else None,
+            'error': _state['error']
+        }
+
+
+def start(kind=CHANGE_FEED):
+    """Mulai listener sesuai CHANGE_FEED (sekali per proses)"""
+    with _state_lock:
+        if _state['source'] is not None or kind == 'off':
+            return
+        _state['source'] = kind
+
+    if kind == 'local':
+        import db
+        db.get_client().subscribe(apply)
+        _set_connected(True)
+    elif kind == 'postgres':
+        threading.Thread(target=_listen_postgres, name='change-feed', daemon=True).start()
+    else:
+        raise ValueError("CHANGE_FEED must be one of: off, local, postgres")
+
+
+def _listen_postgres():
+    """LISTEN CHANGE_FEED_CHANNEL, reconnect dengan backoff jika koneksi putus"""
+    import psycopg
+
+    backoff = 1
+    while True:
+        try:
+            with psycopg.connect(CHANGE_FEED_DSN, autocommit=True) as connection:
+                connection.execute(f'LISTEN "{CHANGE_FEED_CHANNEL}"')
+                _set_connected(True)
+                backoff = 1
+                for notify in connection.notifies():
+                    try:
+                        apply(notify.payload)
+                    except ValueError as error:
+                        log.warning("invalid change event", extra={'error': str(error)})
+        except Exception as error:
+            _set_connected(False, str(error))
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
@@ -0,0 +1,160 @@
+"""
+Async chat path untuk chatbot Groq.
+
+Semua panggilan LLM dijalankan di SATU event loop (thread background) memakai
+AsyncGroq, sehingga request yang sedang menunggu Groq tidak memakan worker thread:
+- Semaphore membatasi jumlah panggilan upstream yang berjalan bersamaan
+- Pertanyaan identik yang sedang diproses digabung (coalescing) jadi 1 panggilan
+- Setiap request punya timeout sendiri (CHAT_TIMEOUT_SECONDS)
+
+stream_response() (SSE) memakai semaphore & timeout yang sama; potongan teks
+dari loop gateway diteruskan ke loop pemanggil lewat asyncio.Queue. Stream
+tidak digabung (setiap client menerima token-nya sendiri).
+"""
+import asyncio
+import threading
+from groq import AsyncGroq
+from config import CHATBOT_BACKEND, CHAT_MAX_CONCURRENCY, CHAT_TIMEOUT_SECONDS, GROQ_API_KEY
+from logger import get_logger
+from singleflight import normalize_question
+
+log = get_logger(__name__)
+
+
+def create_async_llm_client():
+    """Versi async dari chatbot.create_llm_client()"""
+    if CHATBOT_BACKEND == 'fake':
+        from fake_groq import AsyncFakeGroq
+        return AsyncFakeGroq()
+    return AsyncGroq(api_key=GROQ_API_KEY)
+
+
+class ChatTimeout(Exception):
+    """Groq tidak menjawab dalam CHAT_TIMEOUT_SECONDS"""
+
+
+class ChatGateway:
+    def __init__(self, bot, client=None, max_concurrency=CHAT_MAX_CONCURRENCY, timeout=CHAT_TIMEOUT_SECONDS):
+        self.bot = bot  # LaundryChatbot: dipakai untuk konteks FAQ & prompt
+        self.client = client or create_async_llm_client()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        # Event loop khusus gateway, jalan di daemon thread
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='chat-gateway', daemon=True)
+        self._thread.start()
+
+        self._semaphore = None  # Dibuat di dalam loop gateway
+        self._inflight = {}     # {normalized_question: asyncio.Task}
+
+    def _limit(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _call_upstream(self, user_input):
+        async with self._limit():
+            chat_completion = await self.client.chat.completions.create(
+                messages=self.bot.build_messages(user_input),
+                model="llama-3.1-8b-instant",
+                temperature=0.5,
+                max_tokens=500,
+            )
+            return chat_completion.choices[0].message.content
+
+    def _forget(self, key, task):
+        self._inflight.pop(key, None)
+        # Tandai exception sudah "diambil" walau semua penunggu sudah timeout duluan
+        if not task.cancelled():
+            task.exception()
+
+    async def _ask(self, user_input):
+        """Jalan di loop gateway: gabungkan pertanyaan identik yang sedang diproses"""
+        key = normalize_question(user_input)
+        task = self._inflight.get(key)
+
+        if task is None:
+            # Timeout juga dipasang di task upstream agar tidak ada panggilan yatim
+            task = asyncio.ensure_future(asyncio.wait_for(self._call_upstream(user_input), self.timeout))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+
+        try:
+            # shield: timeout satu penunggu tidak membatalkan task milik penunggu lain
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            raise ChatTimeout(f"Chatbot tidak merespons dalam {self.timeout:g} detik")
+
+    async def get_response(self, user_input):
+        """
+        Awaitable dari event loop mana pun (async Flask view, ASGI, dll).
+        Returns: jawaban bot (str). Raises ChatTimeout jika melewati batas waktu.
+        """
+        if not GROQ_API_KEY and CHATBOT_BACKEND != 'fake':
+            return "Maaf, API Key Groq belum dikonfigurasi."
+
+        future = asyncio.run_coroutine_threadsafe(self._ask(user_input), self.loop)
+        try:
+            return await asyncio.wrap_future(future)
+        except ChatTimeout:
+            raise
+        except Exception as e:
+            log.error("groq request failed (async)", extra={'error': str(e)})
+            return f"DEBUG ERROR: {str(e)}"  # Sama dengan LaundryChatbot.get_response
+
+    async def _stream_upstream(self, user_input, put):
+        async with self._limit():
+            stream = await self.client.chat.completions.create(
+                messages=self.bot.build_messages(user_input),
+                model="llama-3.1-8b-instant",
+                temperature=0.5,
+                max_tokens=500,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    put(('delta', chunk.choices[0].delta.content))
+
+    async def _stream(self, user_input, put):
+        """Jalan di loop gateway: seluruh generation dibatasi self.timeout"""
+        try:
+            await asyncio.wait_for(self._stream_upstream(user_input, put), self.timeout)
+            put(('done', None))
+        except asyncio.TimeoutError:
+            put(('error', ChatTimeout(f"Chatbot tidak merespons dalam {self.timeout:g} detik")))
+        except Exception as e:
+            put(('error', e))
+
+    async def stream_response(self, user_input):
+        """
+        Async iterator potongan teks jawaban (dari event loop mana pun).
+        Error / ChatTimeout diteruskan sebagai exception; jika iterator ditutup
+        lebih awal (client putus), panggilan upstream ikut dibatalkan.
+        """
+        if not GROQ_API_KEY and CHATBOT_BACKEND != 'fake':
+            yield "Maaf, API Key Groq belum dikonfigurasi."
+            return
+
+        caller = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        put = lambda item: caller.call_soon_threadsafe(queue.put_nowait, item)
+        future = asyncio.run_coroutine_threadsafe(self._stream(user_input, put), self.loop)
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == 'done':
+                    return
+                if kind == 'error':
+                    raise value
+                yield value
+        finally:
+            future.cancel()
+
+    def stats(self):
+        """Jumlah pertanyaan unik yang sedang menunggu Groq"""
+        return {
+            "inflight": len(self._inflight),
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+        }
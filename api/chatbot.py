@@ -1,75 +1,106 @@
-import os
-import json
-from supabase import create_client, Client
-from dotenv import load_dotenv
 from groq import Groq
+from config import CHATBOT_BACKEND, GROQ_API_KEY
+from db import get_client
+from logger import get_logger
 
-# 1. Load Konfigurasi Environment
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+log = get_logger(__name__)
+
+def create_llm_client():
+    """Buat client LLM sesuai CHATBOT_BACKEND ('groq' atau 'fake' untuk offline/test)"""
+    if CHATBOT_BACKEND == 'fake':
+        from fake_groq import FakeGroq
+        return FakeGroq()
+    return Groq(api_key=GROQ_API_KEY)
 
 class LaundryChatbot:
-    def __init__(self):
-        self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        self.groq_client = Groq(api_key=GROQ_API_KEY)
+    def __init__(self, groq_client=None):
+        self.supabase = get_client()
+        self.groq_client = groq_client or create_llm_client()
+        self.is_fake = groq_client is not None or CHATBOT_BACKEND == 'fake'
         self.context = ""
+        self.faq_count = 0
+        self.rows = {}  # {id: baris faq}
         # Muat pengetahuan saat inisialisasi
         self.load_knowledge_base()
 
     def load_knowledge_base(self):
         """Mengambil data dari tabel 'faq' di Supabase dan format jadi string konteks"""
-        print("🤖 Sedang memuat data otak chatbot (Groq Context)...")
+        log.debug("loading faq context (groq)")
         try:
             response = self.supabase.table('faq').select('*').execute()
             data = response.data
             
+            self.rows = {item.get('id'): item for item in data or []}
+            self.build(data)
             if data:
-                # Format data menjadi string konteks yang mudah dibaca LLM
-                context_lines = ["Berikut adalah informasi resmi tentang APIK Laundry:"]
-                for item in data:
-                    q = item.get('pertanyaan', '')
-                    a = item.get('jawaban', '')
-                    context_lines.append(f"- Q: {q}\n  A: {a}")
-                
-                self.context = "\n".join(context_lines)
-                print(f"✅ Berhasil memuat {len(data)} item FAQ ke konteks Groq.")
+                log.info("faq context loaded", extra={'faq_count': len(data)})
             else:
-                self.context = "Maaf, data FAQ kosong saat ini."
-                print("⚠️ Tabel 'faq' kosong!")
+                log.warning("faq table is empty")
                 
         except Exception as e:
-            print(f"❌ Error saat load data: {e}")
+            log.error("failed to load faq", extra={'error': str(e)})
             self.context = "Terjadi kesalahan saat memuat data laundry."
 
+    def build(self, data):
+        """Susun konteks LLM dari baris FAQ (tanpa query)"""
+        if data:
+            # Format data menjadi string konteks yang mudah dibaca LLM
+            context_lines = ["Berikut adalah informasi resmi tentang APIK Laundry:"]
+            for item in data:
+                q = item.get('pertanyaan', '')
+                a = item.get('jawaban', '')
+                context_lines.append(f"- Q: {q}\n  A: {a}")
+            
+            self.context = "\n".join(context_lines)
+            self.faq_count = len(data)
+        else:
+            self.context = "Maaf, data FAQ kosong saat ini."
+            self.faq_count = 0
+
+    def apply_change(self, op, new, old):
+        """Perubahan satu baris FAQ dari change feed: konteks disusun ulang di memori"""
+        self.rows.pop((old or new).get('id'), None)
+        if op != 'DELETE':
+            self.rows[new.get('id')] = new
+        self.build(list(self.rows.values()))
+
+    def reload_data(self):
+        """Reload FAQ data from Supabase"""
+        log.info("reloading faq data")
+        self.load_knowledge_base()
+        return self.faq_count
+
+    def build_messages(self, user_input):
+        """Susun system prompt + pertanyaan user untuk Groq"""
+        # System prompt untuk mengarahkan gaya bicara bot
+        system_prompt = (
+            "Anda adalah asisten CS 'APIK Laundry' yang ramah dan membantu. "
+            "Gunakan Bahasa Indonesia yang sopan. "
+            "Jawab pertanyaan pelanggan HANYA berdasarkan informasi berikut ini. "
+            "Jika informasi tidak ada di konteks, arahkan ke Admin WhatsApp 0816-1709-8435. "
+            "Jangan mengarang harga atau layanan yang tidak tertulis.\n\n"
+            f"{self.context}"
+        )
+
+        return [
+            {
+                "role": "system",
+                "content": system_prompt,
+            },
+            {
+                "role": "user",
+                "content": user_input,
+            }
+        ]
+
     def get_response(self, user_input):
         """Mengirim pertanyaan ke Groq Llama 3"""
-        if not GROQ_API_KEY:
+        if not GROQ_API_KEY and not self.is_fake:
             return "Maaf, API Key Groq belum dikonfigurasi."
 
         try:
-            # System prompt untuk mengarahkan gaya bicara bot
-            system_prompt = (
-                "Anda adalah asisten CS 'APIK Laundry' yang ramah dan membantu. "
-                "Gunakan Bahasa Indonesia yang sopan. "
-                "Jawab pertanyaan pelanggan HANYA berdasarkan informasi berikut ini. "
-                "Jika informasi tidak ada di konteks, arahkan ke Admin WhatsApp 0816-1709-8435. "
-                "Jangan mengarang harga atau layanan yang tidak tertulis.\n\n"
-                f"{self.context}"
-            )
-
             chat_completion = self.groq_client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt,
-                    },
-                    {
-                        "role": "user",
-                        "content": user_input,
-                    }
-                ],
+                messages=self.build_messages(user_input),
                 model="llama-3.1-8b-instant",  # Updated to production model
                 temperature=0.5,
                 max_tokens=500,  # Increased for more detailed responses
@@ -78,9 +109,34 @@ class LaundryChatbot:
             return chat_completion.choices[0].message.content
 
         except Exception as e:
-            print(f"Error Groq: {e}")
+            log.error("groq request failed", extra={'error': str(e)})
             return f"DEBUG ERROR: {str(e)}" # Temporary debug message
 
+    def stream_response(self, user_input):
+        """
+        Sama seperti get_response, tapi yield potongan teks begitu Groq mengirimnya
+        (stream=True), jadi token pertama bisa langsung diteruskan ke client.
+        Error dari Groq diteruskan sebagai exception ke pemanggil.
+        """
+        if not GROQ_API_KEY and not self.is_fake:
+            yield "Maaf, API Key Groq belum dikonfigurasi."
+            return
+
+        stream = self.groq_client.chat.completions.create(
+            messages=self.build_messages(user_input),
+            model="llama-3.1-8b-instant",
+            temperature=0.5,
+            max_tokens=500,
+            stream=True,
+        )
+
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
 # --- Blok Test Manual ---
 if __name__ == "__main__":
     bot = LaundryChatbot()
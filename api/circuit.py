@@ -0,0 +1,82 @@
+"""
+Circuit breaker sederhana untuk upstream (Supabase).
+
+    if not breaker.allow():
+        ...  # jangan panggil upstream, pakai data terakhir
+    try:
+        response = query.execute()
+        breaker.success()
+    except Exception:
+        breaker.failure()
+
+closed    -> semua panggilan jalan; `threshold` kegagalan berturut-turut -> open
+open      -> tidak ada panggilan selama `reset_seconds`
+half_open -> satu panggilan percobaan: sukses -> closed, gagal -> open lagi
+"""
+import threading
+import time
+from logger import get_logger
+
+log = get_logger(__name__)
+
+
+class CircuitBreaker:
+    def __init__(self, name, threshold, reset_seconds):
+        self.name = name
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return 'open'
+        return 'half_open'
+
+    def allow(self):
+        """True jika upstream boleh dipanggil sekarang"""
+        with self.lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                log.info("circuit closed", extra={'circuit': self.name})
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.threshold:
+                if self.opened_at is None or self.trial_running:
+                    log.warning("circuit opened", extra={'circuit': self.name, 'failures': self.failures})
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+    def reset(self):
+        """Kembali ke closed tanpa riwayat kegagalan (benchmark / test)"""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def info(self):
+        with self.lock:
+            return {'state': self._state(), 'failures': self.failures}
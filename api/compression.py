@@ -0,0 +1,42 @@
+"""
+Kompresi response sesuai header Accept-Encoding (brotli jika tersedia, lalu gzip).
+Response kecil tidak dikompres (overhead-nya lebih besar dari hematnya).
+"""
+import gzip
+import metrics
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+MIN_COMPRESS_SIZE = 1024  # bytes
+
+
+def accepted_encodings(accept_encoding):
+    """'gzip, deflate, br;q=0.9' -> {'gzip', 'deflate', 'br'} (q=0 diabaikan)"""
+    encodings = set()
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        if token:
+            encodings.add(token.strip().lower())
+    return encodings
+
+
+def compress(body, accept_encoding):
+    """
+    Returns: (body, content_encoding). content_encoding None jika tidak dikompres.
+    """
+    if len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+
+    encodings = accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in encodings:
+        with metrics.stage('compress'):
+            return brotli.compress(body, quality=5), 'br'
+    if 'gzip' in encodings or '*' in encodings:
+        with metrics.stage('compress'):
+            return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None
@@ -18,3 +18,71 @@ def get_env(key, default=None):
 SUPABASE_URL = get_env('SUPABASE_URL')
 SUPABASE_KEY = get_env('SUPABASE_KEY') or get_env('SUPABASE_ANON_KEY')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+
+# Chatbot backend:
+# 'groq' (LLM, default jika GROQ_API_KEY ada), 'faq' (TF-IDF FAQ matcher tanpa LLM)
+# atau 'fake' (LLM lokal, offline, tanpa API key)
+CHATBOT_BACKEND = os.getenv('CHATBOT_BACKEND', 'groq' if GROQ_API_KEY else 'faq').lower()
+
+# Async chat gateway: max concurrent upstream LLM calls & per-request timeout (seconds)
+CHAT_MAX_CONCURRENCY = int(os.getenv('CHAT_MAX_CONCURRENCY', '16'))
+CHAT_TIMEOUT_SECONDS = float(os.getenv('CHAT_TIMEOUT_SECONDS', '20'))
+
+# Logging: level (DEBUG/INFO/WARNING/ERROR) & sampling default untuk log di bawah WARNING
+# (1.0 = semua, 0.1 = ~10%). Warning/error tidak pernah di-sampling.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+
+# Profiling per request: ?profile=1 + header X-Admin-Key = PROFILE_ADMIN_KEY
+# (tanpa key, ?profile=1 diabaikan). PROFILE_REQUESTS=1 memprofile semua request
+# data (untuk lokal). PROFILE_DIR: simpan file .prof (buka dengan snakeviz/pstats).
+PROFILE_ADMIN_KEY = os.getenv('PROFILE_ADMIN_KEY')
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', '0') == '1'
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+
+# Data source: 'supabase' (default), 'memory' atau 'sqlite' (lokal, tanpa network;
+# untuk development offline & load testing). Lihat fake_supabase.py.
+# DATA_SOURCE_PATH: file JSON {tabel: [baris]} (memory) atau file database (sqlite);
+# jika kosong, data sintetis sebanyak DATA_SOURCE_SCALE baris dibuat otomatis.
+# DATA_SOURCE_LATENCY_MS / DATA_SOURCE_JITTER_MS: latency buatan per query.
+DATA_SOURCE = os.getenv('DATA_SOURCE', 'supabase').lower()
+DATA_SOURCE_PATH = os.getenv('DATA_SOURCE_PATH')
+DATA_SOURCE_SCALE = int(os.getenv('DATA_SOURCE_SCALE', '10000'))
+DATA_SOURCE_LATENCY_MS = float(os.getenv('DATA_SOURCE_LATENCY_MS', '0'))
+DATA_SOURCE_JITTER_MS = float(os.getenv('DATA_SOURCE_JITTER_MS', '0'))
+
+# Snapshot hasil precompute (precompute.py): forecast & inventory dihitung di luar
+# request lalu endpoint cukup membaca snapshot terbaru. Kosong = nonaktif.
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR')
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv('SNAPSHOT_MAX_AGE_SECONDS', '3600'))
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv('SNAPSHOT_INTERVAL_SECONDS', '900'))
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', '5'))
+
+# Artifact model revenue (.npz): cold start me-load koefisien alih-alih fit ulang
+# selama data training tidak berubah. Kosong = selalu fit (tanpa artifact).
+MODEL_ARTIFACT_PATH = os.getenv('MODEL_ARTIFACT_PATH')
+
+# Stale-while-revalidate data financials (fetch_data.py): tanpa change feed, snapshot
+# yang berumur < DATA_FRESH_SECONDS langsung disajikan tanpa refresh. Setelah itu request
+# memulai refresh dan hanya menunggunya DATA_FETCH_BUDGET_MS lalu memakai data lama
+# (refresh tetap jalan di background). Data lebih tua dari DATA_MAX_STALE_SECONDS tidak
+# disajikan bila refresh gagal. DATA_FETCH_BUDGET_MS <= 0 = selalu tunggu refresh selesai
+# (tanpa budget, mis. benchmark).
+DATA_FRESH_SECONDS = float(os.getenv('DATA_FRESH_SECONDS', '60'))
+DATA_FETCH_BUDGET_MS = float(os.getenv('DATA_FETCH_BUDGET_MS', '1500'))
+DATA_MAX_STALE_SECONDS = int(os.getenv('DATA_MAX_STALE_SECONDS', '86400'))
+
+# Circuit breaker Supabase: setelah CIRCUIT_FAILURE_THRESHOLD kegagalan berturut-turut,
+# upstream tidak dipanggil selama CIRCUIT_RESET_SECONDS (lalu dicoba satu request)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '30'))
+
+# Change feed (change_feed.py): perubahan baris diterapkan ke state in-process.
+# off (default) | local (DATA_SOURCE memory/sqlite) | postgres (LISTEN/NOTIFY, butuh psycopg)
+CHANGE_FEED = os.getenv('CHANGE_FEED', 'off').lower()
+CHANGE_FEED_DSN = os.getenv('CHANGE_FEED_DSN')
+CHANGE_FEED_CHANNEL = os.getenv('CHANGE_FEED_CHANNEL', 'apiklaundry_changes')
+
+# Zona waktu toko (date_parser.py): timestamp dengan offset (Z / +00:00) dikonversi
+# ke hari lokal toko; timestamp tanpa zona dianggap sudah jam lokal.
+SHOP_TIMEZONE = os.getenv('SHOP_TIMEZONE', 'Asia/Jakarta')
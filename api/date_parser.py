@@ -0,0 +1,164 @@
+"""
+Parser tanggal ISO massal (satu panggilan untuk seluruh kolom).
+
+    days, invalid = parse_local_days([row['tanggal'] for row in rows])
+    report_invalid('financials', 'tanggal', rows, 'id_transaksi', invalid)
+
+Format yang diterima (kolom date / timestamp / timestamptz Supabase):
+    2024-01-05
+    2024-01-05T08:00:00            (tanpa zona: sudah jam lokal toko)
+    2024-01-05 08:00:00.123456
+    2024-01-05T20:00:00+00:00      (dengan zona: dikonversi ke hari lokal toko)
+    2024-01-05T20:00:00Z
+
+Hari lokal mengikuti SHOP_TIMEZONE (default Asia/Jakarta), jadi transaksi
+23:30 WIB yang disimpan sebagai 16:30+00:00 tetap masuk hari yang sama.
+Semua pengecekan format dikerjakan numpy atas matriks byte, tanpa
+strptime per baris.
+"""
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+from config import SHOP_TIMEZONE
+from logger import get_logger
+
+log = get_logger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+INVALID_SAMPLE = 5  # Contoh baris tidak valid yang ikut di-log
+
+_ZERO, _NINE = ord('0'), ord('9')
+_DASH, _COLON, _PLUS, _T, _SPACE, _Z = (ord(c) for c in '-:+T Z')
+
+
+def parse_local_days(values, tz=SHOP_TIMEZONE):
+    """
+    Kolom string ISO -> hari lokal toko
+    Returns: (days, invalid) -> datetime64[D] array (NaT untuk baris tidak valid)
+    dan boolean mask baris yang tidak valid (None, bukan string, format/tanggal salah)
+    """
+    local_minutes, invalid = _parse(values, tz)
+    days = (local_minutes // MINUTES_PER_DAY).astype('datetime64[D]')
+    days[invalid] = np.datetime64('NaT')
+    return days, invalid
+
+
+def parse_local_minutes(values, tz=SHOP_TIMEZONE):
+    """
+    Seperti parse_local_days, dengan resolusi menit (jam lokal toko;
+    nilai tanpa jam dianggap 00:00)
+    Returns: (minutes datetime64[m], invalid)
+    """
+    local_minutes, invalid = _parse(values, tz)
+    minutes = local_minutes.astype('datetime64[m]')
+    minutes[invalid] = np.datetime64('NaT')
+    return minutes, invalid
+
+
+def _parse(values, tz):
+    """Returns: (menit lokal sejak epoch int64, invalid mask)"""
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    chars, lengths = _byte_matrix(values)
+    digits = chars.astype(np.int64) - _ZERO
+
+    # --- Tanggal: YYYY-MM-DD ---
+    ok = (lengths >= 10) & (chars[:, 4] == _DASH) & (chars[:, 7] == _DASH)
+    ok &= _all_digits(chars, (0, 1, 2, 3, 5, 6, 8, 9))
+    ok &= (lengths == 10) | (chars[:, 10] == _T) | (chars[:, 10] == _SPACE)
+
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 5] * 10 + digits[:, 6]
+    day = digits[:, 8] * 10 + digits[:, 9]
+    ok &= (month >= 1) & (month <= 12) & (day >= 1)
+
+    # Baris tidak valid diganti 1970-01-01 supaya aritmetika datetime aman
+    months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    month_start = months.astype('datetime64[D]')
+    days_in_month = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    ok &= day <= days_in_month
+    epoch_days = (month_start - np.datetime64('1970-01-01', 'D')).astype(np.int64) + np.where(ok, day - 1, 0)
+
+    # --- Jam + offset zona (hanya jika ada): HH:MM ... (Z | +HH:MM | -HH:MM) ---
+    has_time = ok & (lengths >= 16) & (chars[:, 13] == _COLON) & _all_digits(chars, (11, 12, 14, 15))
+    minutes = (digits[:, 11] * 10 + digits[:, 12]) * 60 + digits[:, 14] * 10 + digits[:, 15]
+
+    rows = np.arange(n)
+    tail = lambda back: chars[rows, np.maximum(lengths - back, 0)]
+    tail_digit = lambda back: tail(back).astype(np.int64) - _ZERO
+    is_utc = has_time & (tail(1) == _Z)
+    has_offset = has_time & (lengths >= 22) & ((tail(6) == _PLUS) | (tail(6) == _DASH)) & (tail(3) == _COLON)
+    for back in (5, 4, 2, 1):
+        has_offset &= (tail(back) >= _ZERO) & (tail(back) <= _NINE)
+    offset = (tail_digit(5) * 10 + tail_digit(4)) * 60 + tail_digit(2) * 10 + tail_digit(1)
+    offset = np.where(tail(6) == _DASH, -offset, offset)
+
+    local_minutes = epoch_days * MINUTES_PER_DAY + np.where(has_time, minutes, 0)
+
+    # Waktu dengan zona -> UTC -> jam lokal toko
+    aware = is_utc | has_offset
+    if aware.any():
+        utc_minutes = local_minutes - np.where(has_offset, offset, 0)
+        shifted = utc_minutes + _shop_offsets(utc_minutes // MINUTES_PER_DAY, tz)
+        local_minutes = np.where(aware, shifted, local_minutes)
+
+    return local_minutes, ~ok
+
+
+def parse_local_day(value, tz=SHOP_TIMEZONE):
+    """Satu nilai (mis. baris dari change feed); Returns: datetime.date atau None"""
+    days, invalid = parse_local_days([value], tz)
+    return None if invalid[0] else days[0].item()
+
+
+def local_today(tz=SHOP_TIMEZONE):
+    """Tanggal hari ini menurut jam lokal toko"""
+    return datetime.now(ZoneInfo(tz)).date()
+
+
+def report_invalid(table, column, rows, key, invalid):
+    """Satu log warning untuk semua baris dengan tanggal tidak valid"""
+    count = int(np.count_nonzero(invalid))
+    if not count:
+        return
+    examples = [
+        {'id': rows[i].get(key), 'value': rows[i].get(column)}
+        for i in np.flatnonzero(invalid)[:INVALID_SAMPLE].tolist()
+    ]
+    log.warning("invalid dates skipped", extra={
+        'table': table, 'column': column, 'count': count, 'total': len(rows), 'examples': examples
+    })
+
+
+def _byte_matrix(values):
+    """Returns: (matriks uint8 (n, lebar), panjang tiap string); non-string -> string kosong"""
+    strings = [value if isinstance(value, str) else '' for value in values]
+    try:
+        encoded = np.array(strings, dtype=bytes)
+    except UnicodeEncodeError:
+        encoded = np.array([value.encode('ascii', 'replace') for value in strings], dtype=bytes)
+
+    # Minimal 16 kolom agar indeks posisi tanggal/jam selalu ada (sisa diisi 0)
+    encoded = encoded.astype(f'S{max(encoded.dtype.itemsize, 16)}')
+    width = encoded.dtype.itemsize
+    chars = encoded.view(np.uint8).reshape(len(strings), width)
+    lengths = np.char.str_len(encoded)
+    return chars, lengths
+
+
+def _all_digits(chars, positions):
+    columns = chars[:, list(positions)]
+    return ((columns >= _ZERO) & (columns <= _NINE)).all(axis=1)
+
+
+def _shop_offsets(utc_days, tz):
+    """Offset UTC zona toko (menit) per hari UTC; dihitung sekali per hari unik (DST aman)"""
+    zone = ZoneInfo(tz)
+    unique, inverse = np.unique(utc_days, return_inverse=True)
+    offsets = np.array([
+        datetime.fromtimestamp(int(d) * 86400 + 43200, timezone.utc).astimezone(zone).utcoffset().total_seconds() // 60
+        for d in unique.tolist()
+    ], dtype=np.int64)
+    return offsets[inverse]
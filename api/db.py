@@ -0,0 +1,76 @@
+"""
+Satu client data per proses, dipakai bersama oleh semua modul
+(fetch_data, inventory, chatbot, health) alih-alih create_client per request.
+
+DATA_SOURCE memilih implementasinya: Supabase asli, atau data lokal
+(memory / sqlite, lihat fake_supabase.py) dengan query builder yang sama.
+"""
+import json
+import threading
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, DATA_SOURCE, DATA_SOURCE_PATH,
+    DATA_SOURCE_SCALE, DATA_SOURCE_LATENCY_MS, DATA_SOURCE_JITTER_MS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+)
+from circuit import CircuitBreaker
+
+DATA_SOURCES = ('supabase', 'memory', 'sqlite')
+
+_client = None
+_client_lock = threading.Lock()
+
+# Dipakai bersama semua pemanggil upstream (fetch_data, inventory, workload)
+breaker = CircuitBreaker('supabase', CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+
+def execute(query):
+    """Jalankan query upstream dan catat hasilnya di circuit breaker bersama"""
+    try:
+        response = query.execute()
+    except Exception:
+        breaker.failure()
+        raise
+    breaker.success()
+    return response
+
+def create_data_source(kind=DATA_SOURCE):
+    """Buat client sesuai DATA_SOURCE"""
+    if kind == 'supabase':
+        from supabase import create_client
+        return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+    from fake_supabase import FakeSupabase, SqliteSupabase
+    latency = {'latency_ms': DATA_SOURCE_LATENCY_MS, 'jitter_ms': DATA_SOURCE_JITTER_MS}
+
+    if kind == 'memory':
+        if DATA_SOURCE_PATH:
+            with open(DATA_SOURCE_PATH) as f:
+                return FakeSupabase(json.load(f), **latency)
+        return FakeSupabase(synthetic_tables(), **latency)
+
+    if kind == 'sqlite':
+        client = SqliteSupabase(DATA_SOURCE_PATH or ':memory:', **latency)
+        if not client.has_data():
+            client.load(synthetic_tables())
+        return client
+
+    raise ValueError(f"DATA_SOURCE must be one of: {', '.join(DATA_SOURCES)}")
+
+def synthetic_tables():
+    """Data sintetis deterministik sebanyak DATA_SOURCE_SCALE baris"""
+    import synthetic_data
+    return synthetic_data.generate(DATA_SOURCE_SCALE)
+
+def get_client():
+    """Client bersama (dibuat saat pertama dipakai, bukan saat import)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_data_source()
+    return _client
+
+def set_client(client):
+    """Ganti client bersama (mis. client lokal untuk testing), None = reset"""
+    global _client
+    with _client_lock:
+        _client = client
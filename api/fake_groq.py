@@ -0,0 +1,85 @@
+"""
+Client Groq palsu untuk development lokal dan testing.
+
+Meniru bagian SDK Groq yang dipakai LaundryChatbot:
+client.chat.completions.create(messages=..., stream=False|True)
+(plus AsyncFakeGroq untuk chat gateway async), sehingga chatbot
+(termasuk streaming SSE) bisa jalan tanpa akses jaringan.
+Aktifkan dengan CHATBOT_BACKEND=fake.
+"""
+import asyncio
+import time
+
+
+class _Obj:
+    """Wadah atribut sederhana agar response palsu terlihat seperti objek SDK"""
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class _FakeCompletions:
+    def __init__(self, reply, chunk_size, chunk_delay):
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+
+    def _answer(self, messages):
+        user_input = messages[-1]['content'] if messages else ''
+        return self.reply or f"[fake] Pertanyaan Anda: {user_input}"
+
+    def create(self, messages=None, stream=False, **kwargs):
+        text = self._answer(messages or [])
+
+        if not stream:
+            message = _Obj(role='assistant', content=text)
+            return _Obj(choices=[_Obj(index=0, message=message, finish_reason='stop')])
+
+        return self._stream(text)
+
+    def _stream(self, text):
+        """Yield chunk berbentuk ChatCompletionChunk Groq"""
+        for chunk in self._stream_chunks(text):
+            if self.chunk_delay and chunk.choices[0].delta.content:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+    def _stream_chunks(self, text):
+        for i in range(0, len(text), self.chunk_size):
+            delta = _Obj(role='assistant', content=text[i:i + self.chunk_size])
+            yield _Obj(choices=[_Obj(index=0, delta=delta, finish_reason=None)])
+
+        # Chunk terakhir tanpa content, hanya finish_reason (sama seperti Groq)
+        yield _Obj(choices=[_Obj(index=0, delta=_Obj(role=None, content=None), finish_reason='stop')])
+
+
+class FakeGroq:
+    """Pengganti groq.Groq"""
+    def __init__(self, reply=None, chunk_size=8, chunk_delay=0.0, **kwargs):
+        self.chat = _Obj(completions=_FakeCompletions(reply, chunk_size, chunk_delay))
+
+
+class _AsyncFakeCompletions(_FakeCompletions):
+    async def create(self, messages=None, stream=False, **kwargs):
+        text = self._answer(messages or [])
+        if stream:
+            return self._astream(text)
+
+        # Simulasi latency upstream tanpa memblokir event loop
+        if self.chunk_delay:
+            await asyncio.sleep(self.chunk_delay * max(1, len(text) // self.chunk_size))
+
+        message = _Obj(role='assistant', content=text)
+        return _Obj(choices=[_Obj(index=0, message=message, finish_reason='stop')])
+
+    async def _astream(self, text):
+        """Async iterator chunk, seperti AsyncStream Groq (async for chunk in stream)"""
+        for chunk in self._stream_chunks(text):
+            if self.chunk_delay and chunk.choices[0].delta.content:
+                await asyncio.sleep(self.chunk_delay)
+            yield chunk
+
+
+class AsyncFakeGroq:
+    """Pengganti groq.AsyncGroq (completions biasa & stream=True)"""
+    def __init__(self, reply=None, chunk_size=8, chunk_delay=0.0, **kwargs):
+        self.chat = _Obj(completions=_AsyncFakeCompletions(reply, chunk_size, chunk_delay))
@@ -0,0 +1,361 @@
+"""
+Pengganti lokal client Supabase (development offline, benchmark, load test).
+
+Keduanya mengimplementasikan bagian query builder supabase-py / PostgREST
+yang dipakai di api/: client.table(name).select(columns).eq(col, value)
+.order(col, desc=...).limit(n).execute() -> objek dengan .data (list of
+dicts), termasuk relasi embedded seperti
+'inventory_items(id_inventory_item, nama_barang)'.
+
+- FakeSupabase: tabel disimpan di memori sebagai list of dicts.
+- SqliteSupabase: tabel di SQLite (file atau database in-memory bersama),
+  query diterjemahkan ke SQL.
+
+Operasi tulis (insert / update(...).eq(...) / delete().eq(...)) juga
+didukung dan memberi tahu subscriber dengan payload yang sama seperti
+trigger database ({'type', 'table', 'record', 'old_record'}), yang menjadi
+sumber change_feed.py dengan CHANGE_FEED=local.
+
+Setiap execute() bisa sleep sesuai latency buatan (+ jitter acak) untuk
+meniru round trip jaringan ke Supabase. Pilih lewat DATA_SOURCE (lihat
+db.py) atau inject langsung:
+
+    import db
+    from fake_supabase import FakeSupabase
+    db.set_client(FakeSupabase({'financials': [...], 'faq': [...]}, latency_ms=30))
+"""
+import random
+import re
+import sqlite3
+import threading
+import time
+
+# Relasi embedded -> kolom foreign key yang dimiliki kedua tabel
+FOREIGN_KEYS = {
+    ('service_bom', 'inventory_items'): 'id_inventory_item',
+    ('transactions', 'services'): 'service_id',
+}
+
+_RELATION = re.compile(r'(\w+)\s*\(([^)]*)\)')
+_IDENTIFIER = re.compile(r'^\w+$')
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """Query builder; client yang menentukan cara menjalankannya"""
+    def __init__(self, client, table):
+        self.client = client
+        self.table_name = table
+        self.columns = None     # None = semua kolom ('*')
+        self.relations = {}     # {tabel relasi: [fields]}
+        self.filters = []       # [(column, value)] (eq)
+        self.ordering = None    # (column, desc)
+        self.row_limit = None
+        self.operation = 'select'
+        self.values = None      # insert: [row dicts], update: {kolom: nilai}
+
+    def select(self, columns='*', **kwargs):
+        # Embedded relations: "service_id, inventory_items(id_inventory_item, stok_sisa)"
+        for name, fields in _RELATION.findall(columns):
+            self.relations[name] = [f.strip() for f in fields.split(',') if f.strip()]
+        plain = _RELATION.sub('', columns)
+        fields = [f.strip() for f in plain.split(',') if f.strip()]
+        self.columns = None if '*' in fields else fields
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.operation = 'insert'
+        self.values = [rows] if isinstance(rows, dict) else list(rows)
+        return self
+
+    def update(self, values, **kwargs):
+        self.operation = 'update'
+        self.values = dict(values)
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self.ordering = (column, desc)
+        return self
+
+    def limit(self, count, **kwargs):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        self.client.wait()
+        return _Response(self.client.run(self))
+
+
+class _LocalClient:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.listeners = []
+        self.write_lock = threading.Lock()
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def subscribe(self, callback):
+        """callback(payload) setelah setiap baris ditulis, seperti trigger row-level"""
+        self.listeners.append(callback)
+
+    def emit(self, table, op, new=None, old=None):
+        payload = {'type': op, 'table': table, 'record': new, 'old_record': old}
+        for callback in self.listeners:
+            callback(payload)
+
+    def wait(self):
+        """Latency jaringan buatan per query"""
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def run(self, query):
+        raise NotImplementedError
+
+
+class FakeSupabase(_LocalClient):
+    """Pengganti supabase.Client dengan data di list in-memory"""
+    def __init__(self, tables=None, latency_ms=0.0, jitter_ms=0.0):
+        super().__init__(latency_ms, jitter_ms)
+        self.tables = tables or {}
+        self._indexes = {}
+
+    def run(self, query):
+        if query.operation != 'select':
+            return self._write(query)
+
+        rows = self.tables.get(query.table_name, [])
+        for column, value in query.filters:
+            rows = [row for row in rows if row.get(column) == value]
+        if query.ordering:
+            column, desc = query.ordering
+            rows = sorted(rows, key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if query.row_limit is not None:
+            rows = rows[:query.row_limit]
+
+        # Dict baru setiap panggilan, seperti baris hasil decode response HTTP asli
+        return [self._shape(query, row) for row in rows]
+
+    def _shape(self, query, row):
+        shaped = dict(row) if query.columns is None else {c: row.get(c) for c in query.columns}
+        for relation, fields in query.relations.items():
+            key = FOREIGN_KEYS.get((query.table_name, relation))
+            related = self.lookup(relation, key, row.get(key)) if key else None
+            shaped[relation] = {f: related.get(f) for f in fields} if related else None
+        return shaped
+
+    def _write(self, query):
+        """Copy-on-write: pembaca yang sedang iterasi list lama tidak terpengaruh"""
+        table = query.table_name
+        with self.write_lock:
+            rows = self.tables.get(table, [])
+            changes = []
+            if query.operation == 'insert':
+                inserted = [dict(row) for row in query.values]
+                self.tables[table] = rows + inserted
+                changes = [('INSERT', dict(row), None) for row in inserted]
+            else:
+                matches = lambda row: all(row.get(c) == v for c, v in query.filters)
+                kept = []
+                for row in rows:
+                    if not matches(row):
+                        kept.append(row)
+                    elif query.operation == 'update':
+                        updated = {**row, **query.values}
+                        kept.append(updated)
+                        changes.append(('UPDATE', dict(updated), dict(row)))
+                    else:
+                        changes.append(('DELETE', None, dict(row)))
+                self.tables[table] = kept
+            self._indexes = {key: index for key, index in self._indexes.items() if key[0] != table}
+
+        for op, new, old in changes:
+            self.emit(table, op, new, old)
+        return [new or old for _, new, old in changes]
+
+    def lookup(self, table, column, value):
+        """Baris `table` dengan `column` == value (di-index saat pertama dipakai)"""
+        index = self._indexes.get((table, column))
+        if index is None:
+            index = {row.get(column): row for row in self.tables.get(table, [])}
+            self._indexes[(table, column)] = index
+        return index.get(value)
+
+
+class SqliteSupabase(_LocalClient):
+    """
+    Pengganti supabase.Client dengan data di SQLite.
+    path=':memory:' memakai database in-memory bernama (shared cache) agar
+    semua thread (satu koneksi per thread) melihat data yang sama.
+    """
+    def __init__(self, path=':memory:', latency_ms=0.0, jitter_ms=0.0):
+        super().__init__(latency_ms, jitter_ms)
+        if path == ':memory:':
+            self.uri = f"file:apiklaundry-{id(self)}?mode=memory&cache=shared"
+        else:
+            self.uri = f"file:{path}"
+        self._local = threading.local()
+        self._columns = {}
+        # Menjaga database in-memory bersama tetap hidup selama client ada
+        self._keeper = self._connect()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def has_data(self):
+        return bool(self.connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1").fetchone())
+
+    def load(self, tables):
+        """Buat & isi tabel dari {name: [row dicts]} (tipe kolom dari baris pertama)"""
+        connection = self.connection
+        for name, rows in tables.items():
+            if not rows:
+                continue
+            columns = list(rows[0].keys())
+            types = {column: _sqlite_type(rows[0][column]) for column in columns}
+            definition = ', '.join(f'"{_ident(c)}" {types[c]}' for c in columns)
+            connection.execute(f'DROP TABLE IF EXISTS "{_ident(name)}"')
+            connection.execute(f'CREATE TABLE "{_ident(name)}" ({definition})')
+            placeholders = ', '.join('?' for _ in columns)
+            connection.executemany(
+                f'INSERT INTO "{name}" VALUES ({placeholders})',
+                ([row.get(c) for c in columns] for row in rows)
+            )
+            # Index foreign key yang dipakai select embedded
+            for (table, _), key in FOREIGN_KEYS.items():
+                if key in columns and table != name:
+                    connection.execute(f'CREATE INDEX IF NOT EXISTS "idx_{name}_{key}" ON "{name}" ("{key}")')
+        connection.commit()
+        self._columns.clear()
+
+    def columns(self, table):
+        if table not in self._columns:
+            info = self.connection.execute(f'PRAGMA table_info("{_ident(table)}")').fetchall()
+            self._columns[table] = [row['name'] for row in info]
+        return self._columns[table]
+
+    def run(self, query):
+        table = query.table_name
+        existing = self.columns(table)
+        if not existing:
+            return []
+        if query.operation != 'select':
+            return self._write(query, existing)
+
+        wanted = existing if query.columns is None else [c for c in query.columns if c in existing]
+        # Foreign key yang dibutuhkan untuk resolve relasi embedded
+        keys = [FOREIGN_KEYS.get((table, relation)) for relation in query.relations]
+        select = wanted + [k for k in keys if k and k in existing and k not in wanted]
+
+        sql = f'SELECT {", ".join(_quote(c) for c in select)} FROM "{_ident(table)}"'
+        params = []
+        if query.filters:
+            sql += ' WHERE ' + ' AND '.join(f'{_quote(column)} = ?' for column, _ in query.filters)
+            params = [value for _, value in query.filters]
+        if query.ordering:
+            column, desc = query.ordering
+            sql += f' ORDER BY {_quote(column)} {"DESC" if desc else "ASC"}'
+        if query.row_limit is not None:
+            sql += ' LIMIT ?'
+            params.append(int(query.row_limit))
+
+        rows = [dict(row) for row in self.connection.execute(sql, params).fetchall()]
+
+        for relation, fields in query.relations.items():
+            key = FOREIGN_KEYS.get((table, relation))
+            related = self._related(relation, key, fields, {row.get(key) for row in rows}) if key else {}
+            for row in rows:
+                match = related.get(row.get(key))
+                row[relation] = {f: match.get(f) for f in fields} if match else None
+
+        if len(select) > len(wanted):
+            for row in rows:
+                for extra in select[len(wanted):]:
+                    row.pop(extra, None)
+        return rows
+
+    def _write(self, query, existing):
+        table = f'"{_ident(query.table_name)}"'
+        where, params = '', []
+        if query.filters:
+            where = ' WHERE ' + ' AND '.join(f'{_quote(column)} = ?' for column, _ in query.filters)
+            params = [value for _, value in query.filters]
+
+        connection = self.connection
+        with self.write_lock:
+            changes = []
+            if query.operation == 'insert':
+                for row in query.values:
+                    columns = [c for c in row if c in existing]
+                    connection.execute(
+                        f'INSERT INTO {table} ({", ".join(_quote(c) for c in columns)}) VALUES ({", ".join("?" for _ in columns)})',
+                        [row[c] for c in columns]
+                    )
+                    changes.append(('INSERT', {c: row.get(c) for c in existing}, None))
+            else:
+                before = [dict(row) for row in connection.execute(f'SELECT * FROM {table}{where}', params).fetchall()]
+                if query.operation == 'update':
+                    values = {c: v for c, v in query.values.items() if c in existing}
+                    assignments = ', '.join(f'{_quote(c)} = ?' for c in values)
+                    connection.execute(f'UPDATE {table} SET {assignments}{where}', list(values.values()) + params)
+                    changes = [('UPDATE', {**row, **values}, row) for row in before]
+                else:
+                    connection.execute(f'DELETE FROM {table}{where}', params)
+                    changes = [('DELETE', None, row) for row in before]
+            connection.commit()
+
+        for op, new, old in changes:
+            self.emit(query.table_name, op, new, old)
+        return [new or old for _, new, old in changes]
+
+    def _related(self, table, key, fields, values):
+        """{nilai key: row} untuk relasi embedded (satu query IN)"""
+        existing = self.columns(table)
+        values = [v for v in values if v is not None]
+        if not existing or not values:
+            return {}
+        select = [c for c in dict.fromkeys(fields + [key]) if c in existing]
+        placeholders = ', '.join('?' for _ in values)
+        sql = f'SELECT {", ".join(_quote(c) for c in select)} FROM "{_ident(table)}" WHERE {_quote(key)} IN ({placeholders})'
+        return {row[key]: dict(row) for row in self.connection.execute(sql, values).fetchall()}
+
+
+def _ident(name):
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return name
+
+
+def _quote(column):
+    return f'"{_ident(column)}"'
+
+
+def _sqlite_type(value):
+    if isinstance(value, bool) or isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'REAL'
+    return 'TEXT'
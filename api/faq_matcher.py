@@ -0,0 +1,127 @@
+# Chatbot FAQ tanpa LLM (TF-IDF + cosine similarity), pindahan dari backend-ml/chatbot.py
+# Optimized: No Pandas dependency, cukup list + matrix sparse sklearn
+import re
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from db import get_client
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# Jika kemiripan di bawah 0.55 (55%), bot nyerah
+SIMILARITY_THRESHOLD = 0.55
+
+# Log "faq match" (satu per pesan chat) hanya dicatat ~10%
+MATCH_LOG_SAMPLE = 0.1
+
+FALLBACK_REPLY = (
+    "Maaf, saya tidak mengerti pertanyaan Anda. 🙏\n\n"
+    "Jika ada yang ingin ditanyakan lebih lanjut, silakan hubungi Admin via WhatsApp:\n"
+    "👉 0816-1709-8435"
+)
+
+class FaqMatcher:
+    def __init__(self):
+        self.vectorizer = TfidfVectorizer()
+        self.questions = []
+        self.answers = []
+        self.tfidf_matrix = None
+        self.rows = {}  # {id: baris faq}
+        # Muat data saat bot pertama kali dinyalakan
+        self.load_knowledge_base()
+
+    @property
+    def faq_count(self):
+        return len(self.questions)
+
+    def load_knowledge_base(self):
+        """Mengambil data dari tabel 'faq' di Supabase"""
+        log.debug("loading faq knowledge base")
+        try:
+            response = get_client().table('faq').select('*').execute()
+            data = response.data
+
+            if data:
+                self.rows = {item.get('id'): item for item in data}
+                self.build(data)
+                log.info("faq knowledge base loaded", extra={'faq_count': len(data)})
+            else:
+                log.warning("faq table is empty")
+
+        except Exception as e:
+            log.error("failed to load faq", extra={'error': str(e)})
+
+    def build(self, data):
+        """Bangun index TF-IDF dari baris FAQ (tanpa query)"""
+        questions = [item.get('pertanyaan', '') for item in data]
+        answers = [item.get('jawaban', '') for item in data]
+
+        # TRAINING: Ubah teks pertanyaan jadi Vektor Angka (TF-IDF)
+        vectorizer = TfidfVectorizer()
+        tfidf_matrix = vectorizer.fit_transform([self.preprocess(q) for q in questions]) if questions else None
+
+        # Tukar sekaligus agar request yang sedang berjalan tidak melihat state setengah jadi
+        self.vectorizer, self.tfidf_matrix = vectorizer, tfidf_matrix
+        self.questions, self.answers = questions, answers
+
+    def apply_change(self, op, new, old):
+        """Perubahan satu baris FAQ dari change feed: index dibangun ulang di memori"""
+        self.rows.pop((old or new).get('id'), None)
+        if op != 'DELETE':
+            self.rows[new.get('id')] = new
+        self.build(list(self.rows.values()))
+
+    def preprocess(self, text):
+        """Membersihkan teks (huruf kecil, hapus tanda baca)"""
+        if not isinstance(text, str):
+            return ""
+        text = text.lower()
+        text = re.sub(r'[^\w\s]', '', text) # Hapus simbol aneh
+        return text
+
+    def reload_data(self):
+        """Reload FAQ data from Supabase"""
+        log.info("reloading faq data")
+        self.load_knowledge_base()
+        return self.faq_count
+
+    def get_response(self, user_input):
+        """Mencari jawaban terbaik berdasarkan kemiripan"""
+        if not self.questions:
+            return "Maaf, sistem sedang offline."
+
+        # 1. Bersihkan input user & ubah jadi Vektor (pakai rumus yang sama dengan database)
+        input_vector = self.vectorizer.transform([self.preprocess(user_input)])
+
+        # 2. Hitung Jarak Kemiripan (Cosine Similarity), ambil skor tertinggi
+        similarity_scores = cosine_similarity(input_vector, self.tfidf_matrix)
+        best_score_index = int(similarity_scores.argmax())
+        best_score = similarity_scores[0, best_score_index]
+
+        # Debugging: bot nebak apa (di-sampling, satu baris per pesan chat)
+        log.debug("faq match", extra={
+            'input': user_input,
+            'matched': self.questions[best_score_index],
+            'score': round(float(best_score), 2),
+            'sample': MATCH_LOG_SAMPLE
+        })
+
+        # 3. Logika Threshold (Batas Minimal Kemiripan)
+        if best_score < SIMILARITY_THRESHOLD:
+            return FALLBACK_REPLY
+
+        # 4. Jika paham, kembalikan isi kolom 'jawaban'
+        return self.answers[best_score_index]
+
+    def stream_response(self, user_input):
+        """Jawaban FAQ sudah langsung jadi, jadi 'stream' cukup satu potongan"""
+        yield self.get_response(user_input)
+
+# --- Blok Test Manual (Bisa dijalankan langsung untuk ngetes) ---
+if __name__ == "__main__":
+    bot = FaqMatcher()
+
+    print("\n--- Test Chat ---")
+    for question in ["harganya brp?", "lokasi dimana?", "resep nasi goreng"]:
+        print(f"\nUser: {question}")
+        print("Bot :", bot.get_response(question))
@@ -1,51 +1,297 @@
-from supabase import create_client, Client
-from datetime import datetime
-from config import SUPABASE_URL, SUPABASE_KEY
+import contextvars
+import threading
+import time
+import numpy as np
+from datetime import datetime, timezone
+from config import DATA_FETCH_BUDGET_MS, DATA_FRESH_SECONDS, DATA_MAX_STALE_SECONDS
+from date_parser import parse_local_day, parse_local_days, report_invalid
+from db import get_client, breaker
+import change_feed
+import metrics
+import profiling
+from rollups import RollupStore
+from logger import get_logger
+
+log = get_logger(__name__)
+
+# --- LAST GOOD SNAPSHOT (stale-while-revalidate) ---
+# Data financials terakhir yang berhasil di-fetch. Refresh berjalan di thread
+# background dan dibagi semua request bersamaan (satu query in-flight).
+# Dengan change feed aktif, snapshot ini di-update per baris (lihat
+# _apply_financials_change) dan tidak perlu di-refresh selama feed terhubung.
+def _empty_financials():
+    return {
+        'data': None,
+        'fetched_at': None,   # time.time() fetch sukses terakhir
+        'stale': False,       # True jika refresh terakhir gagal / lewat budget / circuit open
+        'error': None,
+        'rows': {},           # {id_transaksi: row} untuk update per baris
+        'revenue': {},        # {date: [total Pemasukan, jumlah baris]} revenue harian
+        'rollups': None,      # RollupStore revenue harian (/api/historical), ikut di-update per hari
+        'dirty': False,       # 'data' perlu diurutkan ulang dari 'rows'
+        'generation': None,   # change_feed.generation() saat snapshot di-seed
+        'pending': [],        # event yang datang selama refresh berjalan (diputar ulang)
+        'last_change_at': None
+    }
+
+_financials = _empty_financials()
+_financials_lock = threading.Lock()
+_refresh_done = None  # threading.Event refresh yang sedang berjalan
 
 def fetch_financial_data():
     """
     Fetch financial data from Supabase
-    Returns: list of dicts with financial data
+    Change feed terhubung & snapshot sudah di-seed, atau snapshot berumur
+    < DATA_FRESH_SECONDS: langsung sajikan snapshot. Jika sudah ada data
+    sebelumnya: tunggu refresh paling lama DATA_FETCH_BUDGET_MS, selebihnya
+    sajikan data terakhir (refresh lanjut di background). Circuit open ->
+    upstream tidak dipanggil sama sekali. Data lebih tua dari
+    DATA_MAX_STALE_SECONDS tidak disajikan jika refresh gagal.
+    Returns: list of dicts with financial data (dibagi antar request: jangan di-mutate)
+    or None jika belum pernah ada data yang berhasil di-fetch
+    """
+    return _last_good() if _ensure_financials() else None
+
+def _ensure_financials():
     """
+    Refresh snapshot financials bila perlu (lihat fetch_financial_data)
+    Returns: False jika snapshot tidak boleh disajikan (circuit open, data terlalu lama)
+    """
+    with _financials_lock:
+        fetched_at = _financials['fetched_at']
+        age = time.time() - fetched_at if fetched_at is not None else None
+        has_fallback = age is not None and age <= DATA_MAX_STALE_SECONDS
+        live = fetched_at is not None and _financials['generation'] == change_feed.generation()
+
+    feed_live = change_feed.is_live()
+    if live and feed_live:
+        return True
+    # Tanpa change feed: snapshot yang masih segar disajikan tanpa menyentuh upstream
+    if not feed_live and age is not None and age < DATA_FRESH_SECONDS:
+        return True
+
+    if not breaker.allow():
+        _mark_stale('circuit open')
+        return has_fallback
+
+    done, started = _start_refresh()
+    # Tanpa data cadangan / tanpa budget: tunggu sampai fetch selesai (perilaku lama)
+    budget = DATA_FETCH_BUDGET_MS / 1000 if has_fallback and DATA_FETCH_BUDGET_MS > 0 else None
+    if started:
+        finished = done.wait(budget)  # Stage fetch/parse dicatat oleh thread refresh
+    else:
+        with metrics.stage('coalesced'):
+            finished = done.wait(budget)
+
+    if not finished:
+        _mark_stale('fetch exceeded budget')
+        log.warning("serving stale financials", extra={'budget_ms': DATA_FETCH_BUDGET_MS})
+        return True
+
+    with _financials_lock:
+        failed = _financials['stale']
+    # Refresh gagal: data lama hanya boleh dipakai selama belum lewat DATA_MAX_STALE_SECONDS
+    return has_fallback if failed else True
+
+def _last_good():
+    with _financials_lock:
+        if _financials['dirty']:
+            # Urutan stabil: baris baru di belakang baris lain pada tanggal yang sama
+            _financials['data'] = sorted(_financials['rows'].values(), key=lambda x: x['tanggal_obj'])
+            _financials['dirty'] = False
+        return _financials['data']
+
+def _mark_stale(reason):
+    with _financials_lock:
+        _financials['stale'] = True
+        _financials['error'] = reason
+
+def _start_refresh():
+    """Returns: (Event refresh yang sedang berjalan, True jika baru dimulai oleh pemanggil ini)"""
+    global _refresh_done
+    with _financials_lock:
+        if _refresh_done is not None:
+            return _refresh_done, False
+        done = _refresh_done = threading.Event()
+        _financials['pending'] = []
+
+    if profiling.active():
+        # cProfile hanya melihat thread ini: fetch & parse dijalankan langsung
+        _refresh(done)
+        return done, True
+
+    # Context request ikut ke thread refresh: stage fetch/parse tetap masuk Server-Timing
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(_refresh, done), name='financials-refresh', daemon=True).start()
+    return done, True
+
+def _refresh(done):
+    global _refresh_done
+    generation = change_feed.generation()
     try:
-        # Initialize Supabase client
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        
-        # Fetch financial data
-        response = supabase.table('financials').select('*').execute()
-        data = response.data
-        
-        if not data:
-            print("No data found in financials table")
-            return None
-        
-        # Process data: Convert strings to datetime objects for sorting
-        for item in data:
-            try:
-                # Assuming 'tanggal' is in ISO format or YYYY-MM-DD
-                if isinstance(item['tanggal'], str):
-                    # Handle typically date string formats if needed, or rely on isoformat
-                    # Truncate time part if it exists for date-only grouping logic later
-                    date_str = item['tanggal'].split('T')[0]
-                    item['tanggal_obj'] = datetime.strptime(date_str, '%Y-%m-%d').date()
-                else:
-                    item['tanggal_obj'] = None
-            except Exception as e:
-                print(f"Error parsing date for item {item}: {e}")
-                item['tanggal_obj'] = None
-
-        # Filter out items with invalid dates if necessary
-        data = [x for x in data if x['tanggal_obj'] is not None]
-
-        # Sort by date
-        data.sort(key=lambda x: x['tanggal_obj'])
-        
-        return data
-    
+        data = _fetch_financial_data()
+        breaker.success()
+        with _financials_lock:
+            if data is not None:
+                _financials['data'] = data
+                _financials['rows'] = {row.get('id_transaksi'): row for row in data}
+                _financials['revenue'] = _revenue_index(data)
+                _sync_rollups()
+                _financials['dirty'] = False
+                _financials['fetched_at'] = time.time()
+                _financials['generation'] = generation
+                # Event selama fetch berjalan mungkin belum ada di hasil fetch
+                for op, new, old in _financials['pending']:
+                    _apply_row_change(op, new, old)
+            _financials['stale'] = False
+            _financials['error'] = None
     except Exception as e:
-        print(f"Error fetching data: {e}")
+        breaker.failure()
+        log.error("failed to fetch financials", extra={'error': str(e), 'circuit': breaker.state})
+        _mark_stale(str(e))
+    finally:
+        with _financials_lock:
+            _financials['pending'] = []
+            _refresh_done = None
+        done.set()
+
+def reset():
+    """
+    Lupakan snapshot financials, rollup dan status circuit breaker, mis. saat
+    benchmark mengganti data source; refresh yang sedang berjalan ditunggu dulu.
+    """
+    with _financials_lock:
+        done = _refresh_done
+    if done is not None:
+        done.wait()
+    with _financials_lock:
+        _financials.clear()
+        _financials.update(_empty_financials())
+    breaker.reset()
+
+def financials_freshness():
+    """
+    Indikator staleness data financials yang disajikan proses ini
+    Returns: {'fetched_at', 'age_seconds', 'stale', 'reason', 'circuit', 'live', 'last_change_at'}
+    """
+    with _financials_lock:
+        fetched_at = _financials['fetched_at']
+        stale = _financials['stale']
+        reason = _financials['error']
+        last_change = _financials['last_change_at']
+        live = fetched_at is not None and _financials['generation'] == change_feed.generation() and change_feed.is_live()
+    return {
+        'fetched_at': datetime.fromtimestamp(fetched_at, timezone.utc).isoformat() if fetched_at else None,
+        'age_seconds': round(time.time() - fetched_at, 1) if fetched_at else None,
+        'stale': stale and not live,
+        'reason': reason if stale and not live else None,
+        'circuit': breaker.state,
+        'live': live,
+        'last_change_at': datetime.fromtimestamp(last_change, timezone.utc).isoformat() if last_change else None
+    }
+
+def _parse_tanggal(item):
+    """Set item['tanggal_obj'] (date, hari lokal toko) dari kolom 'tanggal'; None jika tidak valid"""
+    item['tanggal_obj'] = parse_local_day(item.get('tanggal'))
+    if item['tanggal_obj'] is None:
+        log.warning("invalid tanggal in financials row", extra={'row_id': item.get('id_transaksi'), 'value': item.get('tanggal')})
+    return item['tanggal_obj']
+
+def _fetch_financial_data():
+    """Satu query financials (exception diteruskan ke _refresh untuk circuit breaker)"""
+    # Shared Supabase client
+    supabase = get_client()
+
+    # Fetch financial data
+    with metrics.stage('fetch'):
+        response = supabase.table('financials').select('*').execute()
+    data = response.data
+
+    if not data:
+        log.warning("no data found in financials table")
         return None
 
+    with metrics.stage('parse'):
+        # Satu kali parse untuk seluruh kolom tanggal; baris tidak valid dilaporkan sekaligus
+        days, invalid = parse_local_days([item.get('tanggal') for item in data])
+        report_invalid('financials', 'tanggal', data, 'id_transaksi', invalid)
+
+        # Sort by date (stabil, urutan asli dipertahankan dalam satu tanggal)
+        valid = np.flatnonzero(~invalid)
+        order = valid[np.argsort(days[valid], kind='stable')]
+        data = [data[i] for i in order.tolist()]
+        for item, day in zip(data, days[order].tolist()):
+            item['tanggal_obj'] = day
+
+    return data
+
+def _revenue_index(data):
+    """Group Pemasukan by date: {date: [total, jumlah baris]}"""
+    revenue_by_date = {}
+    for item in data:
+        if item.get('tipe') != 'Pemasukan':
+            continue
+        entry = revenue_by_date.get(item['tanggal_obj'])
+        if entry is None:
+            entry = revenue_by_date[item['tanggal_obj']] = [0.0, 0]
+        entry[0] += float(item.get('jumlah', 0))
+        entry[1] += 1
+    return revenue_by_date
+
+def _sync_rollups():
+    """Samakan rollup store dengan revenue harian setelah fetch penuh (dipanggil dengan _financials_lock)"""
+    revenue = _financials['revenue']
+    dates = np.array(sorted(revenue), dtype='datetime64[D]')
+    totals = np.array([revenue[day][0] for day in dates.tolist()], dtype=np.float64)
+    with metrics.stage('rollup'):
+        if _financials['rollups'] is None:
+            _financials['rollups'] = RollupStore.from_series(dates, totals)
+        else:
+            # Hanya hari yang baru / berubah sejak fetch sebelumnya yang diproses
+            _financials['rollups'].sync(dates, totals)
+
+def _revenue_delta(row, sign):
+    """Tambah (sign=1) / kurangi (sign=-1) kontribusi satu baris ke revenue harian"""
+    if row is None or row.get('tipe') != 'Pemasukan':
+        return
+    revenue = _financials['revenue']
+    day = row['tanggal_obj']
+    entry = revenue.setdefault(day, [0.0, 0])
+    entry[0] += sign * float(row.get('jumlah', 0))
+    entry[1] += sign
+    rollups = _financials['rollups']
+    if entry[1] <= 0:
+        del revenue[day]  # Tidak ada transaksi lagi di hari itu
+        if rollups is not None:
+            rollups.remove_day(day)
+    elif rollups is not None:
+        rollups.set_day(day, entry[0])
+
+def _apply_row_change(op, new, old):
+    """Upsert / delete satu baris di snapshot (dipanggil dengan _financials_lock)"""
+    key = (new or old).get('id_transaksi')
+    previous = _financials['rows'].pop(key, None)
+    _revenue_delta(previous, -1)
+
+    if op != 'DELETE':
+        row = dict(new)
+        if _parse_tanggal(row) is not None:
+            _financials['rows'][key] = row
+            _revenue_delta(row, 1)
+
+    _financials['dirty'] = True
+    _financials['last_change_at'] = time.time()
+
+def _apply_financials_change(op, new, old):
+    """Handler change feed tabel financials"""
+    with _financials_lock:
+        if _refresh_done is not None:
+            _financials['pending'].append((op, new, old))
+        if _financials['fetched_at'] is not None:
+            _apply_row_change(op, new, old)
+
+change_feed.subscribe('financials', _apply_financials_change)
+
 def get_revenue_data():
     """
     Get only Pemasukan (revenue) data
@@ -57,32 +303,79 @@ def get_revenue_data():
     if data is None:
         return None
     
-    # Filter only Pemasukan (revenue)
-    revenue_data = [x for x in data if x.get('tipe') == 'Pemasukan']
+    with metrics.stage('aggregate'):
+        # Revenue harian sudah di-group saat fetch (dan di-update per baris oleh change feed)
+        with _financials_lock:
+            revenue_by_date = [(date_key, entry[0]) for date_key, entry in _financials['revenue'].items()]
     
-    # Group by date and sum the revenue
-    revenue_by_date = {}
-    for item in revenue_data:
-        date_key = item['tanggal_obj']
-        amount = float(item.get('jumlah', 0))
-        
-        if date_key in revenue_by_date:
-            revenue_by_date[date_key] += amount
-        else:
-            revenue_by_date[date_key] = amount
+        # Convert to list of dicts and sort
+        result = []
+        for date_key, total in revenue_by_date:
+            result.append({
+                'date': date_key,
+                'revenue': total
+            })
     
-    # Convert to list of dicts and sort
-    result = []
-    for date_key, total in revenue_by_date.items():
-        result.append({
-            'date': date_key,
-            'revenue': total
-        })
-    
-    result.sort(key=lambda x: x['date'])
+        result.sort(key=lambda x: x['date'])
     
     return result
 
+def get_revenue_series():
+    """
+    Columnar version of get_revenue_data (for fast serialization)
+    Returns: (dates, revenue) -> numpy datetime64[D] array & float64 array, sorted by date
+    or (None, None) if data could not be fetched
+    """
+    data = get_revenue_data()
+
+    if data is None:
+        return None, None
+
+    with metrics.stage('aggregate'):
+        dates = np.array([item['date'] for item in data], dtype='datetime64[D]')
+        revenue = np.array([item['revenue'] for item in data], dtype=np.float64)
+    return dates, revenue
+
+def get_financial_series():
+    """
+    Pemasukan & Pengeluaran per hari pada sumbu tanggal yang sama (satu kali fetch)
+    Hari tanpa transaksi salah satu tipe diisi 0.
+    Returns: (dates, revenue, expense) -> datetime64[D], float64, float64 (sorted by date)
+    or (None, None, None) if data could not be fetched
+    """
+    data = fetch_financial_data()
+
+    if data is None:
+        return None, None, None
+
+    with metrics.stage('aggregate'):
+        rows = [x for x in data if x.get('tipe') in ('Pemasukan', 'Pengeluaran')]
+        if not rows:
+            return None, None, None
+
+        days = np.array([x['tanggal_obj'] for x in rows], dtype='datetime64[D]')
+        amounts = np.array([float(x.get('jumlah', 0)) for x in rows], dtype=np.float64)
+        is_expense = np.array([x['tipe'] == 'Pengeluaran' for x in rows])
+
+        # Sumbu tanggal gabungan, lalu jumlahkan tiap tipe ke posisi tanggalnya
+        dates, position = np.unique(days, return_inverse=True)
+        totals = np.zeros((2, len(dates)), dtype=np.float64)
+        np.add.at(totals, (is_expense.astype(np.int64), position), amounts)
+
+    return dates, totals[0], totals[1]
+
+def get_revenue_rollups():
+    """
+    Rollup revenue (harian/mingguan/bulanan/tahunan) milik proses ini.
+    Store di-update per hari oleh refresh dan change feed, jadi request
+    tidak men-scan series harian.
+    Returns: RollupStore atau None jika data tidak bisa diambil
+    """
+    if not _ensure_financials():
+        return None
+    with _financials_lock:
+        return _financials['rollups']
+
 if __name__ == "__main__":
     # Test the functions
     print("Testing data fetch from Supabase...\n")
@@ -0,0 +1,70 @@
+"""
+Adapter BaseHTTPRequestHandler untuk file fungsi serverless per endpoint
+(predict.py, historical.py, inventory-prediction.py, workload-prediction.py,
+order-eta.py, anomalies.py, inventory-reconciliation.py, health.py).
+
+    handler = make_handler(service.predict)
+
+Endpoint menerima dict query parameter dan mengembalikan
+(payload, status_code) atau (payload, status_code, headers) -- sama dengan
+yang dipakai adapter Flask di index.py.
+"""
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+import serialize
+import compression
+import metrics
+import profiling
+from logger import get_logger
+
+log = get_logger(__name__)
+
+
+def make_handler(endpoint):
+    class handler(BaseHTTPRequestHandler):
+        def send_json(self, payload, status_code=200, headers=None):
+            body, encoding = compression.compress(serialize.dumps(payload), self.headers.get('Accept-Encoding'))
+            server_timing = metrics.end_request(endpoint.__name__, status_code, self.started)
+
+            self.send_response(status_code)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Vary', 'Accept-Encoding')
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Server-Timing', server_timing)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.started = metrics.begin_request()
+            try:
+                # Parse query parameters ({'days': ['30']} -> {'days': '30'})
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+                if profiling.requested(params, self.headers):
+                    self.send_json(*profiling.profile_call(endpoint, params))
+                else:
+                    self.send_json(*endpoint(params))
+
+            except Exception as error:
+                log.exception("unhandled error", extra={'endpoint': endpoint.__name__})
+
+                self.send_json({
+                    'success': False,
+                    'error': f'Server error: {str(error)}'
+                }, 500)
+
+        def do_OPTIONS(self):
+            """Handle CORS preflight requests"""
+            self.send_response(200)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Admin-Key')
+            self.end_headers()
+
+    return handler
@@ -1,98 +1,162 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, Response, g, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 import sys
 import os
 
 # Menambahkan direktori saat ini ke path agar import berfungsi
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from chatbot import LaundryChatbot
-from predict import train_and_predict
-from fetch_data import get_revenue_data
-from inventory import InventoryPredictor
+import service
+import serialize
+import compression
+import metrics
+import profiling
+from logger import get_logger
+
+log = get_logger(__name__)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Encode response JSON lewat serialize.dumps (orjson + numpy array)"""
+    def dumps(self, obj, **kwargs):
+        return serialize.dumps(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serialize.dumps(obj), mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 # Enable CORS for all domains to allow frontend access (Explicitly set resources)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
-# Initialize Chatbot global variable
-chatbot = None
+# Semua logika endpoint ada di service.py; file ini hanya adapter Flask.
+# Flask otomatis mengubah (dict, status[, headers]) menjadi response JSON.
 
-def get_chatbot():
-    global chatbot
-    if chatbot is None:
-        try:
-            chatbot = LaundryChatbot()
-        except Exception as e:
-            print(f"Error initializing chatbot: {e}")
-            return None
-    return chatbot
+def call(endpoint):
+    """Panggil endpoint service; dengan ?profile=1 (+ admin key) lewat cProfile"""
+    if profiling.requested(request.args, request.headers):
+        return profiling.profile_call(endpoint, request.args)
+    return endpoint(request.args)
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "message": "API is running correctly"})
+    return service.health(request.args)
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    return service.readiness(request.args)
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Histogram latency per stage & per endpoint (format Prometheus)"""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
+@app.route('/api/chatbot', methods=['GET'])
+def chat_info():
+    return service.chat_info(request.args)
 
 @app.route('/api/chatbot', methods=['POST'])
-def chat():
-    bot = get_chatbot()
-    if not bot:
-        return jsonify({"error": "Chatbot failed to initialize"}), 500
-    
-    data = request.json
-    if not data or 'message' not in data:
-        return jsonify({"error": "No message provided"}), 400
-        
-    user_message = data['message']
-    response = bot.get_response(user_message)
-    return jsonify({"response": response})
+async def chat():
+    data = request.get_json(silent=True)
+    body_error = service.chat_body_error(data)
+    if body_error:
+        return body_error
+
+    # Streaming mode: POST {"message": ..., "stream": true} atau header Accept: text/event-stream
+    if service.wants_stream(data, request.headers.get('Accept')):
+        message, error_result = service.validate_chat_body(data)
+        if error_result:
+            return error_result
+        bot = service.get_chatbot()
+        if bot is None:
+            return service.chatbot_not_ready()
+        return Response(
+            stream_with_context(service.chat_stream(bot, message)),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no',  # Jangan di-buffer oleh proxy
+            }
+        )
+
+    return await service.chat_async(data)
+
+@app.route('/api/chatbot/reload', methods=['GET', 'POST'])
+def reload_chatbot():
+    return service.reload_chatbot(request.args)
+
+@app.route('/api/train', methods=['GET', 'POST'])
+def train():
+    return call(service.train)
 
 @app.route('/api/predict', methods=['GET'])
 def predict():
-    try:
-        # Get 'days' parameter from query string, default to 30
-        days = int(request.args.get('days', 30))
-        result = train_and_predict(days)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    return call(service.predict)
 
 @app.route('/api/historical', methods=['GET'])
 @app.route('/historical', methods=['GET']) # Fallback for proxy stripping
 def historical():
-    print(f"Incoming request: {request.path}")
-    try:
-        data = get_revenue_data()
-        if data:
-            # Convert date objects to strings for JSON serialization
-            for item in data:
-                if 'date' in item:
-                    item['date'] = item['date'].isoformat()
-            return jsonify({"success": True, "data": data})
-        return jsonify({"success": False, "data": []})
-    except Exception as e:
-        print(f"Error in historical endpoint: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"success": False, "error": str(e)}), 500
+    return call(service.historical)
 
 @app.route('/api/inventory-prediction', methods=['GET'])
 @app.route('/inventory-prediction', methods=['GET']) # Fallback
 def inventory_prediction():
-    print(f"Incoming request: {request.path}")
-    try:
-        predictor = InventoryPredictor()
-        result = predictor.get_prediction()
-        # Handle case where result might be an error dict
-        if isinstance(result, dict) and "error" in result:
-             print(f"Inventory prediction returned error: {result['error']}")
-             return jsonify({"success": False, "error": result["error"]}), 500
-            
-        return jsonify({"success": True, "predictions": result})
-    except Exception as e:
-        print(f"Error in inventory_prediction endpoint: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"success": False, "error": str(e)}), 500
+    return call(service.inventory_prediction)
+
+@app.route('/api/workload-prediction', methods=['GET'])
+@app.route('/workload-prediction', methods=['GET']) # Fallback
+def workload_prediction():
+    return call(service.workload_prediction)
+
+@app.route('/api/order-eta', methods=['GET'])
+@app.route('/order-eta', methods=['GET']) # Fallback
+def order_eta():
+    return call(service.order_eta)
+
+@app.route('/api/anomalies', methods=['GET'])
+@app.route('/anomalies', methods=['GET']) # Fallback
+def anomalies():
+    return call(service.anomalies)
+
+@app.route('/api/inventory-reconciliation', methods=['GET'])
+@app.route('/inventory-reconciliation', methods=['GET']) # Fallback
+def inventory_reconciliation():
+    return call(service.inventory_reconciliation)
+
+@app.before_request
+def start_timer():
+    g.started = metrics.begin_request()
+
+# Didaftarkan sebelum compress_response supaya dijalankan setelahnya
+# (after_request berjalan terbalik), jadi stage 'compress' ikut tercatat
+@app.after_request
+def add_server_timing(response):
+    if 'started' in g:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        response.headers['Server-Timing'] = metrics.end_request(endpoint, response.status_code, g.started)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """gzip/brotli sesuai Accept-Encoding (SSE & response kecil dilewati)"""
+    if response.is_streamed or response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body, encoding = compression.compress(response.get_data(), request.headers.get('Accept-Encoding'))
+    if encoding:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.errorhandler(Exception)
+def handle_error(error):
+    if isinstance(error, HTTPException):
+        return error  # 404/405 dst. tetap apa adanya
+    log.exception("unhandled error", extra={'path': request.path})
+    return {"success": False, "error": f"Server error: {str(error)}"}, 500
 
 # Handler for Vercel Serverless Function
 # Vercel looks for 'app' object in this file
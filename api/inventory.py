@@ -1,45 +1,171 @@
 # Optimized: No Pandas dependency for faster Vercel cold starts
 import os
 import json
-from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_KEY
+import threading
+from db import get_client, breaker, execute
+from date_parser import parse_local_days, report_invalid
+import change_feed
+import metrics
+from logger import get_logger
 
-# 1. Load Environment Variables (Handled by config.py)
-URL = SUPABASE_URL
-KEY = SUPABASE_KEY
+log = get_logger(__name__)
 
-# Inisialisasi Client Supabase
-supabase: Client = create_client(URL, KEY)
+TRANSACTION_WINDOW = 100   # Transaksi terakhir yang dianalisis
+INDEX_TRANSACTIONS = 500   # Disimpan di usage index (cadangan jika ada yang dihapus)
+
+def _index_key(table, row):
+    """Primary key sebagai key dict: nilai tunggal, atau tuple untuk key gabungan"""
+    key = change_feed.row_key(table, row)
+    return key[0] if len(key) == 1 else key
+
+class UsageIndex:
+    """
+    Transaksi terbaru, BOM dan stok barang di memori, dijaga terkini oleh
+    change feed (transactions, service_bom, inventory_items), sehingga
+    prediksi inventory tidak perlu query ke Supabase selama feed terhubung.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.transactions = None  # {id_transaction: row}
+        self.bom = None           # {(service_id, id_inventory_item): row}
+        self.items = None         # {id_inventory_item: row}
+        self.complete = False     # Semua transaksi tabel muat di index
+        self.generation = None
+        self.pending = None       # Event selama seed berjalan (diputar ulang)
+
+    def seed(self, supabase):
+        """Isi index dari Supabase (sekali per koneksi change feed)"""
+        generation = change_feed.generation()
+        with self.lock:
+            self.pending = []
+        try:
+            with metrics.stage('fetch'):
+                transactions = execute(supabase.table('transactions') \
+                    .select('id_transaction, tanggal_masuk, service_id, jumlah_unit') \
+                    .order('tanggal_masuk', desc=True) \
+                    .limit(INDEX_TRANSACTIONS)).data
+                bom = execute(supabase.table('service_bom') \
+                    .select('service_id, id_inventory_item, jumlah_dipakai_per_unit')).data
+                items = execute(supabase.table('inventory_items') \
+                    .select('id_inventory_item, nama_barang, stok_sisa, unit')).data
+        except Exception:
+            with self.lock:
+                self.pending = None
+            raise
+
+        with self.lock:
+            self.transactions = {row['id_transaction']: row for row in transactions}
+            self.bom = {_index_key('service_bom', row): row for row in bom}
+            self.items = {row['id_inventory_item']: row for row in items}
+            self.complete = len(transactions) < INDEX_TRANSACTIONS
+            self.generation = generation
+            for table, op, new, old in self.pending:
+                self._apply(table, op, new, old)
+            self.pending = None
+
+    def ready(self):
+        with self.lock:
+            return self._ready()
+
+    def _ready(self):
+        return (
+            self.transactions is not None
+            and self.generation == change_feed.generation()
+            and change_feed.is_live()
+            and (self.complete or len(self.transactions) >= TRANSACTION_WINDOW)
+        )
+
+    def snapshot(self):
+        """
+        Returns: (transactions, bom_data) dalam bentuk yang sama dengan hasil query
+        get_prediction, atau None jika index belum siap
+        """
+        with self.lock:
+            if not self._ready():
+                return None
+            transactions = sorted(self.transactions.values(), key=lambda row: row['tanggal_masuk'], reverse=True)
+            bom_data = []
+            for row in self.bom.values():
+                item = self.items.get(row['id_inventory_item'])
+                bom_data.append({
+                    'service_id': row['service_id'],
+                    'jumlah_dipakai_per_unit': row['jumlah_dipakai_per_unit'],
+                    'inventory_items': dict(item) if item else None
+                })
+        return transactions[:TRANSACTION_WINDOW], bom_data
+
+    def on_change(self, table):
+        """Handler change feed untuk satu tabel"""
+        def handler(op, new, old):
+            with self.lock:
+                if self.pending is not None:
+                    self.pending.append((table, op, new, old))
+                if self.transactions is not None:
+                    self._apply(table, op, new, old)
+        return handler
+
+    def _apply(self, table, op, new, old):
+        rows = {'transactions': self.transactions, 'service_bom': self.bom, 'inventory_items': self.items}[table]
+        rows.pop(_index_key(table, old or new), None)
+        if op != 'DELETE':
+            rows[_index_key(table, new)] = dict(new)
+
+        if table == 'transactions' and len(rows) > INDEX_TRANSACTIONS:
+            # Buang transaksi terlama, index hanya menyimpan yang terbaru
+            newest = sorted(rows.values(), key=lambda row: row['tanggal_masuk'], reverse=True)[:INDEX_TRANSACTIONS]
+            self.transactions = {row['id_transaction']: row for row in newest}
+            self.complete = False
+
+usage_index = UsageIndex()
+for _table in ('transactions', 'service_bom', 'inventory_items'):
+    change_feed.subscribe(_table, usage_index.on_change(_table))
 
 class InventoryPredictor:
     def get_prediction(self):
         """Generate inventory stock predictions based on usage patterns"""
         
+        # Usage index dari change feed: tanpa query ke Supabase
+        indexed = usage_index.snapshot()
+        
+        # Supabase sedang gagal berulang: jangan ikut membebani, langsung gagal cepat
+        if indexed is None and not breaker.allow():
+            return {"error": "Supabase sedang tidak tersedia (circuit open), coba lagi sebentar."}
+        
         try:
+            supabase = get_client()
+            
+            if indexed is None and change_feed.is_live():
+                usage_index.seed(supabase)
+                indexed = usage_index.snapshot()
+
             # --- TAHAP 1: AMBIL DATA TRANSAKSI ---
             # Mengambil 100 transaksi terakhir untuk analisis beban kerja
-            trx_res = supabase.table('transactions') \
-                .select('tanggal_masuk, service_id, jumlah_unit') \
-                .order('tanggal_masuk', desc=True) \
-                .limit(100) \
-                .execute()
+            if indexed is not None:
+                transactions = indexed[0]
+            else:
+                with metrics.stage('fetch'):
+                    trx_res = execute(supabase.table('transactions') \
+                        .select('id_transaction, tanggal_masuk, service_id, jumlah_unit') \
+                        .order('tanggal_masuk', desc=True) \
+                        .limit(TRANSACTION_WINDOW))
+                transactions = trx_res.data
                 
-            if not trx_res.data:
+            if not transactions:
                 return {"error": "Data transaksi kosong. Belum bisa prediksi."}
 
             # --- TAHAP 2: HITUNG BEBAN KERJA (NATIVE PYTHON) ---
             # Data transaksi: list of dicts [{'tanggal_masuk': '...', 'service_id': ..., 'jumlah_unit': ...}]
-            transactions = trx_res.data
             
             # Group by Date & Service ID
             # Structure: {(date, service_id): total_qty}
             daily_service_load = {}
             
-            from datetime import datetime
+            # Parse semua tanggal_masuk sekaligus ke hari lokal toko (baris tidak valid dilewati)
+            days, invalid = parse_local_days([trx.get('tanggal_masuk') for trx in transactions])
+            report_invalid('transactions', 'tanggal_masuk', transactions, 'id_transaction', invalid)
             
-            for trx in transactions:
-                # Parse date string "YYYY-MM-DD..." to date object
-                t_date = trx['tanggal_masuk'].split('T')[0] # Ambil tanggal saja
+            for trx, t_date, bad in zip(transactions, days.tolist(), invalid.tolist()):
+                if bad: continue
                 svc_id = trx['service_id']
                 qty = float(trx['jumlah_unit'] or 0)
                 
@@ -65,11 +191,13 @@ class InventoryPredictor:
                 avg_load_per_service[svc_id] = stats['total_qty'] / stats['data_points'] if stats['data_points'] > 0 else 0
             
             # --- TAHAP 3: AMBIL DATA BOM & INVENTORY ---
-            bom_res = supabase.table('service_bom') \
-                .select('service_id, jumlah_dipakai_per_unit, inventory_items(id_inventory_item, nama_barang, stok_sisa, unit)') \
-                .execute()
-            
-            bom_data = bom_res.data
+            if indexed is not None:
+                bom_data = indexed[1]
+            else:
+                with metrics.stage('fetch'):
+                    bom_res = execute(supabase.table('service_bom') \
+                        .select('service_id, jumlah_dipakai_per_unit, inventory_items(id_inventory_item, nama_barang, stok_sisa, unit)'))
+                bom_data = bom_res.data
             
             # --- TAHAP 4: KALKULASI PENGGUNAAN BAHAN ---
             inventory_report = {} 
@@ -151,10 +279,7 @@ class InventoryPredictor:
             return final_results
 
         except Exception as error:
-            # Force fresh deploy
-            import traceback
-            error_trace = traceback.format_exc()
-            print(f"❌ Inventory Prediction Error: {error}\n{error_trace}")
+            log.exception("inventory prediction failed")
             return {"error": f"Inventory prediction failed: {str(error)}"}
 
 # --- BLOCK TEST MANUAL (Bisa dijalankan langsung di terminal) ---
@@ -0,0 +1,102 @@
+"""
+Structured logging: JSON lines ke stdout lewat queue (non-blocking).
+
+    from logger import get_logger
+    log = get_logger(__name__)
+
+    log.info("faq loaded", extra={'faq_count': 12})
+    log.debug("faq match", extra={'score': 0.82, 'sample': 0.1})  # ~10% dicatat
+
+Field di `extra` menjadi key JSON. `sample` adalah rate sampling per pesan
+(0-1); tanpa `sample`, log di bawah WARNING memakai LOG_SAMPLE_RATE.
+Handler hanya memasukkan record ke queue; penulisan ke stdout dilakukan
+thread QueueListener, jadi request tidak menunggu I/O stdout.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from config import LOG_LEVEL, LOG_SAMPLE_RATE
+
+ROOT_LOGGER = 'apiklaundry'
+
+# Atribut bawaan LogRecord (selain ini dianggap field dari `extra`)
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'sample'}
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Buang sebagian log (rate dari extra 'sample' atau LOG_SAMPLE_RATE)"""
+    def __init__(self, default_rate=1.0):
+        super().__init__()
+        self.default_rate = default_rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = getattr(record, 'sample', self.default_rate)
+        return rate >= 1.0 or random.random() < rate
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record):
+        """Simpan message & traceback sebagai teks, field `extra` tetap terpisah"""
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure():
+    """Pasang handler queue -> stdout sekali per proses"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter())
+
+        log_queue = queue.SimpleQueue()
+        handler = _QueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+        root.addHandler(handler)
+        root.propagate = False  # Jangan dobel dengan handler gunicorn/root
+
+        _listener = QueueListener(log_queue, stream)
+        _listener.start()
+        atexit.register(_listener.stop)  # Flush sisa queue saat proses selesai
+
+
+def get_logger(name):
+    configure()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,114 @@
+"""
+Instrumentasi latency ringan (tanpa dependency tambahan).
+
+    with metrics.stage('fetch'):
+        response = supabase.table('financials').select('*').execute()
+
+Setiap stage dicatat ke histogram in-process (per proses / worker) dan ke
+daftar timing request yang sedang berjalan, yang dikirim sebagai header
+Server-Timing. Histogram dibaca dalam format Prometheus di /api/metrics.
+
+Stage: fetch (Supabase), parse, aggregate, fit, load_model, predict, interval,
+serialize, compress, llm, change_feed, coalesced.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Bucket histogram (detik), budget serverless 10 detik
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Timing stage milik request saat ini (contextvar: aman untuk thread & async).
+# Isinya list yang di-mutate, jadi stage di dalam async view tetap terlihat.
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}  # {label values: [bucket counts..., sum, count]}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            data = self.series.get(label_values)
+            if data is None:
+                data = self.series[label_values] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted(self.series.items())
+        for label_values, data in items:
+            labels = ','.join(f'{key}="{value}"' for key, value in zip(self.labels, label_values))
+            prefix = labels + ',' if labels else ''
+            for bound, count in zip(BUCKETS, data):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {data[-1]}')
+            lines.append(f'{self.name}_sum{{{labels}}} {data[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {data[-1]}')
+        return '\n'.join(lines)
+
+
+stage_seconds = Histogram('apiklaundry_stage_seconds', 'Durasi per stage request', ('stage',))
+request_seconds = Histogram('apiklaundry_request_seconds', 'Durasi total request', ('endpoint', 'status'))
+
+
+@contextmanager
+def stage(name):
+    """Ukur satu stage: masuk histogram + Server-Timing request saat ini"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def record(name, seconds):
+    stage_seconds.observe(seconds, name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def begin_request():
+    """Mulai request baru; Returns: waktu mulai (perf_counter)"""
+    _request_timings.set([])
+    return time.perf_counter()
+
+
+def end_request(endpoint, status_code, started):
+    """Catat durasi total request; Returns: nilai header Server-Timing"""
+    total = time.perf_counter() - started
+    request_seconds.observe(total, endpoint, str(status_code))
+    header = server_timing(total)
+    _request_timings.set(None)
+    return header
+
+
+def server_timing(total=None):
+    """Header Server-Timing: stage yang sama dijumlahkan, durasi dalam ms"""
+    merged = {}
+    for name, seconds in _request_timings.get() or []:
+        merged[name] = merged.get(name, 0.0) + seconds
+
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in merged.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ', '.join(parts)
+
+
+def render():
+    """Semua histogram dalam Prometheus text exposition format"""
+    return '\n'.join([stage_seconds.render(), request_seconds.render()]) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
@@ -1,16 +1,155 @@
+import hashlib
+import json
+import os
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from datetime import datetime, timedelta
 from fetch_data import get_revenue_data
+import metrics
+from logger import get_logger
+
+log = get_logger(__name__)
+
+SERIES = ('revenue', 'expense')
+FEATURES = ('day_of_week', 'day_of_month', 'month', 'day_number')
+
+# sklearn di-import saat fit saja: model yang di-load dari artifact
+# (RevenuePredictionModel.load) tidak butuh sklearn sama sekali
+def _sklearn():
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+    return LinearRegression, train_test_split, mean_absolute_error, mean_squared_error, r2_score
+
+def date_features(dates, start):
+    """
+    Feature matrix yang sama dengan RevenuePredictionModel.prepare_features,
+    dihitung vectorized dari array datetime64[D]
+    Returns: array (n, 4) -> day_of_week, day_of_month, month, day_number
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    days = dates.astype(np.int64)
+    months = dates.astype('datetime64[M]')
+
+    day_of_week = (days + 3) % 7  # 1970-01-01 = Kamis, 0=Monday
+    day_of_month = (dates - months.astype('datetime64[D]')).astype(np.int64) + 1
+    month = months.astype(np.int64) % 12 + 1
+    day_number = (dates - np.datetime64(start, 'D')).astype(np.int64)
+
+    return np.column_stack([day_of_week, day_of_month, month, day_number])
+
+# Prediction interval: residual bootstrap (vectorized lintas resample)
+INTERVAL_LEVEL = 0.95
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_SEED = 42
+MIN_WEEKDAY_RESIDUALS = 5
+
+def bootstrap_paths(X_train, Y_train, fitted_train, X_future, n_boot=BOOTSTRAP_RESAMPLES, seed=BOOTSTRAP_SEED):
+    """
+    Simulasi forecast dengan residual bootstrap, semua resample sekaligus:
+    1. Y* = fitted + residual yang di-resample (n, B, k) -> refit OLS semua
+       resample dengan satu perkalian pinv(X) (ketidakpastian koefisien,
+       makin lebar untuk horizon jauh karena fitur day_number)
+    2. tambahkan noise residual dari hari dengan weekday yang sama
+       (variansi per hari berbeda, mis. akhir pekan)
+    Kolom 0 X adalah day_of_week. Baris residual di-resample utuh sehingga
+    korelasi antar series (k) tetap terjaga.
+    Undian untuk hari ke-i tidak bergantung panjang horizon: simulasi h hari
+    sama persis dengan h baris pertama simulasi horizon yang lebih panjang
+    (cache interval boleh di-slice tanpa mengubah hasil).
+    Returns: array (h, B, k) simulasi nilai masa depan
+    """
+    with metrics.stage('interval'):
+        return _bootstrap_paths(X_train, Y_train, fitted_train, X_future, n_boot, seed)
+
+def _bootstrap_paths(X_train, Y_train, fitted_train, X_future, n_boot, seed):
+    rng = np.random.default_rng(seed)
+    Y_train = np.asarray(Y_train, dtype=np.float64).reshape(len(X_train), -1)
+    fitted_train = np.asarray(fitted_train, dtype=np.float64).reshape(Y_train.shape)
+    n, k = Y_train.shape
+
+    X1 = np.column_stack([np.ones(n), X_train])
+    X1_future = np.column_stack([np.ones(len(X_future)), X_future])
+
+    # Residual di-inflate supaya tidak underestimate variansi (derajat bebas)
+    residuals = (Y_train - fitted_train) * np.sqrt(n / max(n - X1.shape[1], 1))
+
+    # 1. Refit vectorized: beta (p, B, k)
+    picks = rng.integers(0, n, size=(n, n_boot))
+    Y_star = fitted_train[:, None, :] + residuals[picks]
+    beta = np.einsum('pn,nbk->pbk', np.linalg.pinv(X1), Y_star)
+    paths = np.einsum('hp,pbk->hbk', X1_future, beta)
+
+    # 2. Noise observasi per weekday. Uniform (h, B) diambil baris demi baris
+    # dari stream yang sama, jadi baris ke-i identik untuk horizon berapa pun
+    uniforms = rng.random((len(X_future), n_boot))
+    weekdays_train = X_train[:, 0]
+    weekdays_future = X_future[:, 0]
+    for weekday in np.unique(weekdays_future):
+        rows = np.flatnonzero(weekdays_future == weekday)
+        pool = np.flatnonzero(weekdays_train == weekday)
+        if len(pool) < MIN_WEEKDAY_RESIDUALS:
+            pool = np.arange(n)
+        draws = pool[(uniforms[rows] * len(pool)).astype(np.int64)]
+        paths[rows] += residuals[draws]
+
+    return paths
+
+def interval_bounds(paths, level=INTERVAL_LEVEL):
+    """Quantile bawah/atas simulasi sepanjang axis resample"""
+    alpha = (1 - level) / 2
+    lower, upper = np.quantile(paths, [alpha, 1 - alpha], axis=1)
+    return lower, upper
+
+# --- MODEL ARTIFACT ---
+# Versi format artifact; naikkan jika isi/arti array berubah
+ARTIFACT_SCHEMA = 1
+ARTIFACT_ARRAYS = ('coef', 'intercept', 'dates', 'revenue', 'train_index')
+
+class LinearCoefficients:
+    """predict() LinearRegression dari koefisien tersimpan (tanpa sklearn)"""
+    def __init__(self, coef, intercept):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+def data_fingerprint(data):
+    """
+    Sidik data training [{'date', 'revenue'}]: model yang di-fit dari data
+    dengan fingerprint sama identik (split & fit deterministik)
+    """
+    sorted_data = sorted(data, key=lambda x: x['date'])
+    dates = np.array([item['date'] for item in sorted_data], dtype='datetime64[D]').astype(np.int64)
+    revenue = np.array([item['revenue'] for item in sorted_data], dtype=np.float64)
+    return hashlib.sha256(dates.tobytes() + revenue.tobytes()).hexdigest()
+
+def series_fingerprint(*arrays):
+    """Sidik series numpy (profit & workload): fit dari series yang sama identik"""
+    digest = hashlib.sha256()
+    for value in arrays:
+        value = np.ascontiguousarray(value)
+        digest.update(str(value.dtype).encode() + str(value.shape).encode() + value.tobytes())
+    return digest.hexdigest()
+
+def _checksum(arrays):
+    digest = hashlib.sha256()
+    for name in ARTIFACT_ARRAYS:
+        value = np.ascontiguousarray(arrays[name])
+        digest.update(name.encode() + str(value.dtype).encode() + value.tobytes())
+    return digest.hexdigest()
 
 class RevenuePredictionModel:
     def __init__(self):
-        self.model = LinearRegression()
+        self.model = None
         self.is_trained = False
         self.training_data = None
         self.start_date = None
+        self.train_split = None
+        self.train_index = None
+        self.metrics = None
+        self.trained_at = None
+        self.interval_cache = None  # (horizon, level, lower, upper), dihitung sekali per fit
         
     def prepare_features(self, data):
         """
@@ -67,14 +206,21 @@ class RevenuePredictionModel:
         if X is None or len(X) < 10:
             return {'error': 'Insufficient data for training. Need at least 10 days.'}
         
-        # Split data for validation
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
+        LinearRegression, train_test_split, mean_absolute_error, mean_squared_error, r2_score = _sklearn()
+        
+        # Split data for validation (index baris train disimpan untuk artifact)
+        X_train, X_test, y_train, y_test, index_train, _ = train_test_split(
+            X, y, np.arange(len(X)), test_size=0.2, random_state=42
         )
         
         # Train model
-        self.model.fit(X_train, y_train)
+        with metrics.stage('fit'):
+            self.model = LinearRegression().fit(X_train, y_train)
         self.is_trained = True
+        self.train_split = (X_train, y_train)
+        self.train_index = index_train
+        self.interval_cache = None
+        self.trained_at = datetime.now()
         
         # Evaluate on test set
         y_pred = self.model.predict(X_test)
@@ -83,59 +229,144 @@ class RevenuePredictionModel:
         r2 = r2_score(y_test, y_pred)
         mape = self.calculate_mape(y_test, y_pred)
         
-        print("\n" + "="*50)
-        print("Model Training Results (sklearn LinearRegression):")
-        print(f"Features: 4 basic (day_of_week, day_of_month, month, day_number)")
-        print(f"Training samples: {len(X_train)}, Test samples: {len(X_test)}")
-        print(f"Mean Absolute Error: Rp {mae:,.0f}")
-        print(f"Root Mean Squared Error: Rp {rmse:,.0f}")
-        print(f"R² Score: {r2:.4f}")
-        print(f"MAPE: {mape:.2f}%")
-        print("="*50)
+        log.debug("model trained", extra={
+            'algorithm': 'sklearn LinearRegression',
+            'features': 'day_of_week, day_of_month, month, day_number',
+            'train_samples': len(X_train),
+            'test_samples': len(X_test),
+            'mae': round(float(mae)),
+            'rmse': round(float(rmse)),
+            'r2': round(float(r2), 4),
+            'mape': round(float(mape), 2)
+        })
         
-        return {
+        self.metrics = {
             'mae': mae,
             'rmse': rmse,
             'r2': r2,
             'mape': mape
         }
+        return self.metrics
     
-    def get_fitted_values(self):
+    def save(self, path):
         """
-        Get fitted values (predictions on training data) for visualization
-        Returns: list of dicts [{'date': date_obj, 'actual_revenue': float, 'fitted_revenue': float}]
+        Simpan artifact ringkas (.npz): koefisien, series training, index split,
+        metadata (schema, fitur, start_date, metrics, fingerprint) + checksum.
+        Ditulis atomik (file sementara lalu os.replace).
+        """
+        if not self.is_trained:
+            raise Exception("Model must be trained first!")
+        
+        sorted_data = sorted(self.training_data, key=lambda x: x['date'])
+        arrays = {
+            'coef': np.asarray(self.model.coef_, dtype=np.float64),
+            'intercept': np.array([self.model.intercept_], dtype=np.float64),
+            'dates': np.array([item['date'] for item in sorted_data], dtype='datetime64[D]').astype(np.int64),
+            'revenue': np.array([item['revenue'] for item in sorted_data], dtype=np.float64),
+            'train_index': np.asarray(self.train_index, dtype=np.int64)
+        }
+        meta = {
+            'schema': ARTIFACT_SCHEMA,
+            'algorithm': 'LinearRegression',
+            'features': list(FEATURES),
+            'start_date': self.start_date.isoformat(),
+            'metrics': {key: float(value) for key, value in self.metrics.items()},
+            'fingerprint': data_fingerprint(self.training_data),
+            'trained_at': self.trained_at.isoformat(),
+            'checksum': _checksum(arrays)
+        }
+        
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, path)
+        return meta
+    
+    @classmethod
+    def load(cls, path, fingerprint=None):
+        """
+        Load artifact dari save() tanpa fit ulang (dan tanpa sklearn)
+        fingerprint: jika diisi, artifact harus dilatih dari data yang sama
+        Raises: ValueError jika artifact rusak, beda schema, atau basi
+        """
+        with metrics.stage('load_model'):
+            try:
+                with np.load(path, allow_pickle=False) as npz:
+                    meta = json.loads(str(npz['meta']))
+                    arrays = {name: npz[name] for name in ARTIFACT_ARRAYS}
+            except (OSError, KeyError, ValueError) as error:
+                raise ValueError(f"Unreadable model artifact: {error}")
+            
+            if meta.get('schema') != ARTIFACT_SCHEMA or tuple(meta.get('features', ())) != FEATURES:
+                raise ValueError(f"Model artifact schema mismatch: {meta.get('schema')}")
+            if meta.get('checksum') != _checksum(arrays):
+                raise ValueError("Model artifact checksum mismatch")
+            if fingerprint is not None and meta.get('fingerprint') != fingerprint:
+                raise ValueError("Model artifact trained on different data")
+            
+            model = cls()
+            dates = arrays['dates'].astype('datetime64[D]')
+            model.training_data = [
+                {'date': day, 'revenue': value}
+                for day, value in zip(dates.tolist(), arrays['revenue'].tolist())
+            ]
+            model.start_date = datetime.fromisoformat(meta['start_date']).date()
+            model.model = LinearCoefficients(arrays['coef'], arrays['intercept'][0])
+            model.train_index = arrays['train_index']
+            X = date_features(dates, model.start_date)
+            model.train_split = (X[model.train_index], arrays['revenue'][model.train_index])
+            model.metrics = meta['metrics']
+            model.trained_at = datetime.fromisoformat(meta['trained_at'])
+            model.is_trained = True
+        return model
+    
+    def fitted_arrays(self):
+        """
+        Fitted values as columns (no per-row dicts)
+        Returns: (dates datetime64[D], actual_revenue, fitted_revenue) numpy arrays
         """
         if not self.is_trained or self.training_data is None:
             raise Exception("Model must be trained first!")
         
         X, y = self.prepare_features(self.training_data)
-        fitted_values = self.model.predict(X)
+        fitted_values = np.maximum(self.model.predict(X), 0)  # No negative predictions
         
-        # Create result list
-        result = []
         sorted_data = sorted(self.training_data, key=lambda x: x['date'])
+        dates = np.array([item['date'] for item in sorted_data], dtype='datetime64[D]')
+        
+        return dates, y.astype(np.float64), fitted_values
+    
+    def get_fitted_values(self):
+        """
+        Get fitted values (predictions on training data) for visualization
+        Returns: list of dicts [{'date': date_obj, 'actual_revenue': float, 'fitted_revenue': float}]
+        """
+        dates, actual, fitted = self.fitted_arrays()
         
-        for i, item in enumerate(sorted_data):
+        # Create result list
+        result = []
+        for i, date in enumerate(dates.tolist()):
             result.append({
-                'date': item['date'],  # Keep as date object
-                'actual_revenue': y[i],
-                'fitted_revenue': max(0, fitted_values[i])  # No negative predictions
+                'date': date,  # Keep as date object
+                'actual_revenue': actual[i],
+                'fitted_revenue': fitted[i]
             })
         
         return result
     
-    def predict_future(self, days=30):
+    def forecast_arrays(self, days=30):
         """
         Predict revenue for the next N days starting from the last training data date
-        Returns: dict with 'predictions', 'total_predicted', 'average_daily'
+        Returns: (dates datetime64[D], predicted_revenue) numpy arrays
         """
         if not self.is_trained:
             raise Exception("Model must be trained first!")
         
         # Get the last date from training data
         if self.training_data is not None and len(self.training_data) > 0:
-            sorted_data = sorted(self.training_data, key=lambda x: x['date'])
-            last_date = sorted_data[-1]['date']
+            last_date = max(item['date'] for item in self.training_data)
         else:
             last_date = datetime.now().date()
         
@@ -154,18 +385,48 @@ class RevenuePredictionModel:
         
         X_future = np.array(X_future)
         
-        # Predict
-        predictions = self.model.predict(X_future)
+        # Predict & ensure no negative predictions
+        with metrics.stage('predict'):
+            predictions = np.maximum(self.model.predict(X_future), 0)
         
-        # Ensure no negative predictions
-        predictions = np.maximum(predictions, 0)
+        return np.array(future_dates, dtype='datetime64[D]'), predictions
+    
+    def forecast_intervals(self, days=30, level=INTERVAL_LEVEL):
+        """
+        Forecast + prediction interval (residual bootstrap) untuk N hari ke depan.
+        Simulasi dijalankan sekali per fit untuk horizon terpanjang yang pernah
+        diminta; request dengan horizon lebih pendek cukup di-slice dari cache.
+        Returns: (dates, predicted, lower, upper) numpy arrays
+        """
+        future_dates, predictions = self.forecast_arrays(days)
+
+        cache = self.interval_cache
+        if cache is None or cache[0] < days or cache[1] != level:
+            horizon = max(days, cache[0] if cache else 0)
+            horizon_dates, _ = self.forecast_arrays(horizon)
+            X_train, y_train = self.train_split
+            paths = bootstrap_paths(
+                X_train, y_train, self.model.predict(X_train),
+                date_features(horizon_dates, self.start_date)
+            )
+            lower, upper = interval_bounds(np.maximum(paths, 0), level)  # No negative revenue
+            cache = self.interval_cache = (horizon, level, lower[:, 0], upper[:, 0])
+
+        return future_dates, predictions, cache[2][:days], cache[3][:days]
+    
+    def predict_future(self, days=30):
+        """
+        Predict revenue for the next N days starting from the last training data date
+        Returns: dict with 'predictions', 'total_predicted', 'average_daily'
+        """
+        future_dates, predictions = self.forecast_arrays(days)
         
         # Create result
         future_predictions = []
-        for i, date in enumerate(future_dates):
+        for date, value in zip(future_dates.astype(str).tolist(), predictions.tolist()):
             future_predictions.append({
-                'date': date.isoformat(),  # ISO format for JSON serialization
-                'predicted_revenue': float(predictions[i])
+                'date': date,  # ISO format for JSON serialization
+                'predicted_revenue': value
             })
         
         total_predicted = float(np.sum(predictions))
@@ -177,6 +438,231 @@ class RevenuePredictionModel:
             'average_daily': average_daily
         }
 
+class ProfitPredictionModel:
+    """
+    Forecast Pemasukan & Pengeluaran sekaligus (multi-output LinearRegression:
+    satu fit untuk kedua series di atas sumbu tanggal yang sama),
+    net profit = revenue - expense
+    """
+    def __init__(self):
+        self.model = None
+        self.is_trained = False
+        self.dates = None
+        self.targets = None  # array (n, 2): kolom revenue, expense
+        self.start_date = None
+        self.metrics = None
+        self.train_split = None
+        self.interval_cache = None
+
+    def train(self, dates, revenue, expense):
+        """
+        Train dengan series harian pada sumbu tanggal yang sama
+        Returns: dict metrics per series + net profit
+        """
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.targets = np.column_stack([revenue, expense]).astype(np.float64)
+
+        if len(self.dates) < 10:
+            return {'error': 'Insufficient data for training. Need at least 10 days.'}
+
+        self.start_date = self.dates[0]
+        X = date_features(self.dates, self.start_date)
+
+        LinearRegression, train_test_split, mean_absolute_error, mean_squared_error, r2_score = _sklearn()
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, self.targets, test_size=0.2, random_state=42
+        )
+
+        with metrics.stage('fit'):
+            self.model = LinearRegression().fit(X_train, y_train)
+        self.is_trained = True
+        self.train_split = (X_train, y_train)
+        self.interval_cache = None
+
+        y_pred = np.maximum(self.model.predict(X_test), 0)
+
+        scores = {}
+        for i, name in enumerate(SERIES):
+            scores[name] = {
+                'mae': float(mean_absolute_error(y_test[:, i], y_pred[:, i])),
+                'rmse': float(np.sqrt(mean_squared_error(y_test[:, i], y_pred[:, i]))),
+                'r2': float(r2_score(y_test[:, i], y_pred[:, i]))
+            }
+
+        # Error profit dihitung dari residual gabungan (korelasi revenue/expense ikut terhitung)
+        profit_true = y_test[:, 0] - y_test[:, 1]
+        profit_pred = y_pred[:, 0] - y_pred[:, 1]
+        scores['profit'] = {
+            'mae': float(mean_absolute_error(profit_true, profit_pred)),
+            'rmse': float(np.sqrt(mean_squared_error(profit_true, profit_pred)))
+        }
+
+        self.metrics = scores
+        return scores
+
+    def forecast_arrays(self, days=30):
+        """
+        Forecast N hari setelah tanggal terakhir data
+        Returns: (dates datetime64[D], revenue, expense, profit) numpy arrays
+        """
+        if not self.is_trained:
+            raise Exception("Model must be trained first!")
+
+        future_dates = self.dates[-1] + np.arange(1, days + 1)
+        with metrics.stage('predict'):
+            predicted = np.maximum(self.model.predict(date_features(future_dates, self.start_date)), 0)
+
+        revenue, expense = predicted[:, 0], predicted[:, 1]
+        return future_dates, revenue, expense, revenue - expense
+
+    def forecast_intervals(self, days=30, level=INTERVAL_LEVEL):
+        """
+        Forecast + prediction interval (residual bootstrap bersama, sehingga
+        interval profit memperhitungkan korelasi revenue/expense).
+        Disimpan per fit seperti RevenuePredictionModel.forecast_intervals.
+        Returns: (dates, revenue, expense, profit, bounds)
+        bounds = {'revenue'|'expense'|'profit': (lower, upper)}
+        """
+        future_dates, revenue, expense, profit = self.forecast_arrays(days)
+
+        cache = self.interval_cache
+        if cache is None or cache[0] < days or cache[1] != level:
+            horizon = max(days, cache[0] if cache else 0)
+            horizon_dates = self.dates[-1] + np.arange(1, horizon + 1)
+            X_train, y_train = self.train_split
+            paths = np.maximum(bootstrap_paths(
+                X_train, y_train, self.model.predict(X_train),
+                date_features(horizon_dates, self.start_date)
+            ), 0)
+            lower, upper = interval_bounds(paths, level)
+            profit_lower, profit_upper = interval_bounds(paths[:, :, 0] - paths[:, :, 1], level)
+            bounds = {
+                'revenue': (lower[:, 0], upper[:, 0]),
+                'expense': (lower[:, 1], upper[:, 1]),
+                'profit': (profit_lower, profit_upper)
+            }
+            cache = self.interval_cache = (horizon, level, bounds)
+
+        bounds = {name: (low[:days], high[:days]) for name, (low, high) in cache[2].items()}
+        return future_dates, revenue, expense, profit, bounds
+
+    def fitted_arrays(self):
+        """
+        Returns: (dates, actual (n, 2), fitted (n, 2)) -> kolom revenue, expense
+        """
+        if not self.is_trained:
+            raise Exception("Model must be trained first!")
+
+        fitted = np.maximum(self.model.predict(date_features(self.dates, self.start_date)), 0)
+        return self.dates, self.targets, fitted
+
+class WorkloadPredictionModel:
+    """
+    Forecast unit harian (kg / pcs) per layanan: satu multi-output
+    LinearRegression untuk semua service_id sekaligus, dengan fitur tanggal
+    yang sama seperti model revenue (date_features)
+    """
+    def __init__(self):
+        self.model = None
+        self.is_trained = False
+        self.dates = None
+        self.service_ids = None
+        self.targets = None  # array (n, k): satu kolom per service_id
+        self.start_date = None
+        self.metrics = None
+        self.train_split = None
+        self.interval_cache = None
+
+    def train(self, dates, service_ids, units):
+        """
+        Train dengan matriks unit harian (n hari x k layanan)
+        Returns: dict metrics per service_id + total
+        """
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.service_ids = np.asarray(service_ids)
+        self.targets = np.asarray(units, dtype=np.float64).reshape(len(self.dates), -1)
+
+        if len(self.dates) < 10:
+            return {'error': 'Insufficient data for training. Need at least 10 days.'}
+
+        self.start_date = self.dates[0]
+        X = date_features(self.dates, self.start_date)
+
+        LinearRegression, train_test_split, mean_absolute_error, mean_squared_error, r2_score = _sklearn()
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, self.targets, test_size=0.2, random_state=42
+        )
+
+        with metrics.stage('fit'):
+            self.model = LinearRegression().fit(X_train, y_train)
+        self.is_trained = True
+        self.train_split = (X_train, y_train)
+        self.interval_cache = None
+
+        y_pred = np.maximum(self.model.predict(X_test), 0)
+        # Kolom terakhir: total semua layanan (kapasitas mesin / shift)
+        y_test = np.column_stack([y_test, y_test.sum(axis=1)])
+        y_pred = np.column_stack([y_pred, y_pred.sum(axis=1)])
+
+        scores = {}
+        for i, name in enumerate([str(sid) for sid in self.service_ids.tolist()] + ['total']):
+            scores[name] = {
+                'mae': float(mean_absolute_error(y_test[:, i], y_pred[:, i])),
+                'rmse': float(np.sqrt(mean_squared_error(y_test[:, i], y_pred[:, i]))),
+                'r2': float(r2_score(y_test[:, i], y_pred[:, i]))
+            }
+
+        self.metrics = scores
+        return scores
+
+    def forecast_arrays(self, days=30):
+        """
+        Forecast N hari setelah tanggal terakhir data
+        Returns: (dates datetime64[D], predicted (days, k)) numpy arrays
+        """
+        if not self.is_trained:
+            raise Exception("Model must be trained first!")
+
+        future_dates = self.dates[-1] + np.arange(1, days + 1)
+        with metrics.stage('predict'):
+            predicted = np.maximum(self.model.predict(date_features(future_dates, self.start_date)), 0)
+        return future_dates, predicted.reshape(days, -1)
+
+    def forecast_intervals(self, days=30, level=INTERVAL_LEVEL):
+        """
+        Forecast + prediction interval per layanan dan untuk total
+        (residual bootstrap bersama, korelasi antar layanan ikut terhitung).
+        Disimpan per fit seperti RevenuePredictionModel.forecast_intervals.
+        Returns: (dates, predicted (days, k), lower (days, k), upper (days, k), total_lower, total_upper)
+        """
+        future_dates, predicted = self.forecast_arrays(days)
+
+        cache = self.interval_cache
+        if cache is None or cache[0] < days or cache[1] != level:
+            horizon = max(days, cache[0] if cache else 0)
+            horizon_dates = self.dates[-1] + np.arange(1, horizon + 1)
+            X_train, y_train = self.train_split
+            paths = np.maximum(bootstrap_paths(
+                X_train, y_train, self.model.predict(X_train),
+                date_features(horizon_dates, self.start_date)
+            ), 0)
+            lower, upper = interval_bounds(paths, level)
+            total_lower, total_upper = interval_bounds(paths.sum(axis=2), level)
+            cache = self.interval_cache = (horizon, level, lower, upper, total_lower, total_upper)
+
+        return (future_dates, predicted,
+                cache[2][:days], cache[3][:days], cache[4][:days], cache[5][:days])
+
+    def fitted_arrays(self):
+        """
+        Returns: (dates, actual (n, k), fitted (n, k))
+        """
+        if not self.is_trained:
+            raise Exception("Model must be trained first!")
+
+        fitted = np.maximum(self.model.predict(date_features(self.dates, self.start_date)), 0)
+        return self.dates, self.targets, fitted.reshape(self.targets.shape)
+
 def main():
     """
     Main function to train and test the model
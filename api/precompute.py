@@ -0,0 +1,103 @@
+"""
+Precompute job: hitung forecast & laporan inventory di luar request lalu
+simpan sebagai snapshot berversi (snapshots.py). /api/predict dan
+/api/inventory-prediction menyajikan snapshot terbaru selama umurnya
+<= SNAPSHOT_MAX_AGE_SECONDS, selain itu kembali menghitung live.
+
+    # Sekali jalan (cron), mis. setiap 15 menit:
+    #   */15 * * * * cd /app/api && SNAPSHOT_DIR=/var/lib/apiklaundry python precompute.py
+    python precompute.py
+
+    # Worker loop (container / systemd)
+    python precompute.py --loop --interval 900
+
+    # Hanya satu job
+    python precompute.py --only forecast
+"""
+import argparse
+import sys
+import time
+from config import SNAPSHOT_DIR, SNAPSHOT_INTERVAL_SECONDS
+from inventory import InventoryPredictor
+from logger import get_logger
+import service
+import snapshots
+
+log = get_logger(__name__)
+
+
+def precompute_forecast():
+    """Train dengan data terbaru, simpan forecast horizon maksimum; Returns: version"""
+    model, metrics, data_size = service.train_fresh_model()
+    # Horizon penuh sekali hitung; request ?days=N tinggal memotong
+    forecast = service.revenue_forecast(model, metrics, data_size, service.MAX_PREDICTION_DAYS)
+    return snapshots.save('forecast', forecast)
+
+
+def precompute_inventory():
+    """Jalankan InventoryPredictor, simpan hasilnya; Returns: version"""
+    result = InventoryPredictor().get_prediction()
+    if isinstance(result, dict) and 'error' in result:
+        raise Exception(result['error'])
+    if not isinstance(result, list):
+        raise Exception('Invalid prediction data format')
+    return snapshots.save('inventory', {'predictions': result})
+
+
+JOBS = {
+    'forecast': precompute_forecast,
+    'inventory': precompute_inventory,
+}
+
+
+def run_once(names=None):
+    """
+    Jalankan job; satu job gagal tidak menghentikan job lain
+    (snapshot lama tetap disajikan sampai kedaluwarsa)
+    Returns: {job: version atau None jika gagal}
+    """
+    results = {}
+    for name in names or JOBS:
+        started = time.perf_counter()
+        try:
+            results[name] = JOBS[name]()
+            log.info("snapshot written", extra={
+                'job': name, 'version': results[name],
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+            })
+        except Exception as error:
+            results[name] = None
+            log.error("precompute job failed", extra={'job': name, 'error': str(error)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='APIK Laundry precompute job (forecast & inventory snapshots)')
+    parser.add_argument('--loop', action='store_true', help='Jalan terus setiap --interval detik')
+    parser.add_argument('--interval', type=int, default=SNAPSHOT_INTERVAL_SECONDS, help='Detik antar run (--loop)')
+    parser.add_argument('--only', choices=sorted(JOBS), action='append', help='Job tertentu saja (boleh diulang)')
+    args = parser.parse_args()
+
+    if not snapshots.enabled():
+        print("SNAPSHOT_DIR belum di-set, tidak ada tempat menyimpan snapshot", file=sys.stderr)
+        sys.exit(2)
+
+    print(f"Snapshot dir: {SNAPSHOT_DIR}")
+    while True:
+        started = time.monotonic()
+        results = run_once(args.only)
+        for name, version in results.items():
+            print(f"  {name:<10} {version or 'FAILED'}")
+
+        if not args.loop:
+            sys.exit(0 if all(results.values()) else 1)
+
+        # Jadwal tetap: durasi run tidak menggeser interval
+        try:
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            break
+
+
+if __name__ == '__main__':
+    main()
@@ -1,152 +1,11 @@
-from http.server import BaseHTTPRequestHandler
-from urllib.parse import parse_qs, urlparse
-import json
 import os
 import sys
 
 # Add api folder to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
-# Import from original app
-try:
-    from flask import Flask
-    from flask_cors import CORS
-    from model import RevenuePredictionModel  # Changed from seasonal_model to model
-    from fetch_data import get_revenue_data
-    
-    app = Flask(__name__)
-    CORS(app)
-    
-    def train_and_predict(days=30):
-        """Train model and get predictions using Linear Regression"""
-        df = get_revenue_data() # Returns list of dicts
-        
-        if df is None or len(df) < 5:
-            raise Exception('Insufficient data for training')
-        
-        # Initialize and train Linear Regression Model
-        model = RevenuePredictionModel()
-        metrics = model.train(df)
-        
-        if 'error' in metrics:
-            raise Exception(metrics['error'])
-        
-        # Get future predictions
-        future_result = model.predict_future(days=days)
-        predictions_list = future_result['predictions']
-        
-        # Get fitted values (historical simulation)
-        fitted_list = model.get_fitted_values()
-        
-        mae = float(metrics['mae'])
-        
-        # Format predictions (add upper/lower bound)
-        formatted_predictions = []
-        for pred in predictions_list:
-            # pred['date'] is already isoformat string
-            val = float(pred['predicted_revenue'])
-            formatted_predictions.append({
-                'date': pred['date'],
-                'predicted_revenue': val,
-                'upper_bound': val + mae,
-                'lower_bound': max(0, val - mae)
-            })
-        
-        # Format fitted values
-        formatted_fitted = []
-        for fit in fitted_list:
-            formatted_fitted.append({
-                'date': fit['date'].strftime('%Y-%m-%d'),
-                'actual_revenue': float(fit['actual_revenue']),
-                'fitted_revenue': float(fit['fitted_revenue'])
-            })
-        
-        return {
-            'success': True,
-            'predictions': formatted_predictions,
-            'fitted_values': formatted_fitted,
-            'summary': {
-                'total_predicted': float(future_result['total_predicted']),
-                'average_daily': float(future_result['average_daily']),
-                'days': days
-            },
-            'model_info': {
-                'trained_with_data_size': len(df),
-                'mae': float(metrics['mae']),
-                'rmse': float(metrics['rmse']),
-                'r2': float(metrics['r2']),
-                'mape': float(metrics['mape']),
-                'algorithm': 'Linear Regression (sklearn)'
-            }
-        }
-        
-        
-except Exception as error:
-    print(f"Import error: {error}")
-    def train_and_predict(days=30):
-        return {'success': False, 'error': str(error)}
+from http_handler import make_handler
+import service
 
-
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        try:
-            # Parse query parameters
-            parsed = urlparse(self.path)
-            query_params = parse_qs(parsed.query)
-            
-            # Validate 'days' parameter (1-365 range)
-            try:
-                days = int(query_params.get('days', ['30'])[0])
-                if days < 1 or days > 365:
-                    raise ValueError("Days must be between 1 and 365")
-            except ValueError as val_error:
-                self.send_response(400)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                
-                error_response = {
-                    'success': False,
-                    'error': f'Invalid days parameter: {str(val_error)}'
-                }
-                self.wfile.write(json.dumps(error_response).encode())
-                return
-            
-            # Get predictions
-            result = train_and_predict(days)
-            
-            # Determine status code based on result
-            status_code = 200 if result.get('success') else 500
-            
-            # Send response
-            self.send_response(status_code)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Cache-Control', 'public, max-age=300')  # Cache for 5 minutes
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(result).encode())
-            
-        except Exception as error:
-            print(f"Error in predict endpoint: {error}")
-            import traceback
-            traceback.print_exc()
-            
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            error_response = {
-                'success': False,
-                'error': f'Server error: {str(error)}'
-            }
-            self.wfile.write(json.dumps(error_response).encode())
-    
-    def do_OPTIONS(self):
-        """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+# Logika endpoint ada di service.py (sama dengan index.py / backend-ml)
+handler = make_handler(service.predict)
@@ -0,0 +1,114 @@
+"""
+Profiling opt-in per request (cProfile).
+
+    GET /api/predict?profile=1   (header X-Admin-Key: <PROFILE_ADMIN_KEY>)
+
+Endpoint dijalankan di bawah cProfile, termasuk serialisasi payload, lalu
+fungsi teratas (cumulative time) ditambahkan ke response sebagai key
+'profile'. Tanpa ?profile=1 (atau PROFILE_REQUESTS=1) tidak ada profiler
+yang dibuat sama sekali, jadi tidak ada overhead.
+
+cProfile hanya melihat thread pemanggil: kerja yang biasanya dilempar ke
+thread lain (refresh financials di fetch_data.py) dicek lewat active() dan
+dijalankan langsung di thread request selama diprofile.
+"""
+import contextvars
+import cProfile
+import hmac
+import os
+import pstats
+import threading
+import time
+from config import PROFILE_ADMIN_KEY, PROFILE_REQUESTS, PROFILE_DIR
+import serialize
+
+TOP_FUNCTIONS = 25
+ADMIN_KEY_HEADER = 'X-Admin-Key'
+
+# Hanya satu profiler aktif sekaligus (cProfile tidak bisa berjalan paralel)
+_profiler_lock = threading.Lock()
+_active = contextvars.ContextVar('profiling_active', default=False)
+
+
+def active():
+    """True jika request yang sedang berjalan (context ini) sedang diprofile"""
+    return _active.get()
+
+
+def requested(params, headers=None):
+    """True jika request ini minta (dan boleh) diprofile"""
+    if PROFILE_REQUESTS:
+        return True
+    if (params or {}).get('profile') not in ('1', 'true'):
+        return False
+    if not PROFILE_ADMIN_KEY:
+        return False
+    admin_key = (headers or {}).get(ADMIN_KEY_HEADER) or ''
+    return hmac.compare_digest(admin_key.encode(), PROFILE_ADMIN_KEY.encode())
+
+
+def profile_call(endpoint, params):
+    """
+    Jalankan endpoint (+ serialisasi payload) di bawah cProfile
+    Returns: tuple endpoint yang sama, payload dict ditambah key 'profile'
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        result = endpoint(params)
+        return _attach(result, {'error': 'Profiler sedang dipakai request lain, coba lagi'})
+
+    try:
+        profiler = cProfile.Profile()
+        token = _active.set(True)
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            result = endpoint(params)
+            serialize.dumps(result[0])  # Ikut ukur serialisasi (hasilnya dibuang)
+        finally:
+            profiler.disable()
+            _active.reset(token)
+        elapsed = time.perf_counter() - started
+    finally:
+        _profiler_lock.release()
+
+    report = {
+        'endpoint': endpoint.__name__,
+        'total_ms': round(elapsed * 1000, 2),
+        'top': top_functions(profiler)
+    }
+    if PROFILE_DIR:
+        report['file'] = save(profiler, endpoint.__name__)
+    return _attach(result, report)
+
+
+def top_functions(profiler, limit=TOP_FUNCTIONS):
+    """Fungsi dengan cumulative time terbesar"""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (cc, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': name,
+            'file': f"{os.path.basename(filename)}:{line}",
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3)
+        })
+    rows.sort(key=lambda row: row['cumtime_ms'], reverse=True)
+    return rows[:limit]
+
+
+def save(profiler, name):
+    """Simpan stats mentah ke PROFILE_DIR; Returns: path file"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+    profiler.dump_stats(path)
+    return path
+
+
+def _attach(result, report):
+    payload, status_code, *rest = result
+    if isinstance(payload, dict):
+        payload = {**payload, 'profile': report}
+    # Response berisi profile tidak boleh di-cache CDN/browser
+    headers = {**(rest[0] if rest else {}), 'Cache-Control': 'no-store'}
+    return payload, status_code, headers
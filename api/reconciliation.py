@@ -0,0 +1,234 @@
+"""
+Rekonsiliasi pemakaian bahan: pemakaian teoretis menurut resep (service_bom)
+dibandingkan dengan penurunan stok_sisa yang benar-benar tercatat.
+
+Pemakaian teoretis = resep^T (barang x layanan) @ volume (layanan x hari),
+keduanya matriks sparse scipy: transaksi bertahun-tahun cukup satu fetch +
+satu perkalian matriks (tanpa loop per transaksi).
+
+inventory_items hanya menyimpan stok terakhir, jadi pergerakan stok dicatat
+StockLedger dari event change feed (penurunan = pemakaian, kenaikan =
+restock) per barang per hari, mulai hari penuh pertama setelah ledger aktif.
+Perbandingan hanya untuk rentang yang tercakup ledger; di luar itu (atau
+tanpa change feed) hanya pemakaian teoretis yang dilaporkan (status None).
+anomaly.py membaca pemakaian harian dari ledger yang sama.
+
+Status per barang (selisih relatif terhadap pemakaian teoretis):
+- sesuai : |selisih| <= TOLERANCE
+- boros  : stok turun lebih banyak dari resep (kebocoran / resep terlalu kecil)
+- hemat  : stok turun lebih sedikit (resep terlalu besar / pemakaian belum dicatat)
+"""
+import threading
+from datetime import timedelta
+import numpy as np
+from db import get_client, execute
+from date_parser import local_today
+from workload import load_transactions
+import change_feed
+import metrics
+from logger import get_logger
+
+log = get_logger(__name__)
+
+TOLERANCE = 0.10
+DEFAULT_WINDOW_DAYS = 30  # Rentang default tanpa ledger (hari terakhir data transaksi)
+
+
+class InvalidRange(ValueError):
+    """Rentang [start, end] kosong setelah default diterapkan"""
+
+
+def _sparse():
+    # scipy (dependency sklearn) di-import saat dipakai saja
+    from scipy import sparse
+    return sparse
+
+
+def volume_matrix(days, services, units):
+    """
+    Unit per layanan per hari, duplikat (layanan, hari) dijumlahkan
+    Returns: (dates datetime64[D], service_ids, csr (layanan x hari))
+    """
+    first = days.min()
+    dates = np.arange(first, days.max() + 1)
+    service_ids, row = np.unique(services, return_inverse=True)
+    column = (days - first).astype(np.int64)
+    matrix = _sparse().coo_matrix((units, (row, column)), shape=(len(service_ids), len(dates))).tocsr()
+    return dates, service_ids, matrix
+
+
+def recipe_matrix(bom, service_ids, item_ids):
+    """jumlah_dipakai_per_unit sebagai csr (layanan x barang); layanan tanpa transaksi dilewati"""
+    service_row = {service_id: i for i, service_id in enumerate(service_ids.tolist())}
+    item_column = {item_id: i for i, item_id in enumerate(item_ids)}
+    entries = [
+        (service_row[row['service_id']], item_column[row['id_inventory_item']], float(row['jumlah_dipakai_per_unit'] or 0))
+        for row in bom
+        if row['service_id'] in service_row and row['id_inventory_item'] in item_column
+    ]
+    rows, columns, rates = (np.array(values) for values in zip(*entries)) if entries else ([], [], [])
+    return _sparse().coo_matrix((rates, (rows, columns)), shape=(len(service_ids), len(item_ids))).tocsr()
+
+
+def expected_usage(transactions, bom, item_ids):
+    """
+    Pemakaian teoretis per barang per hari
+    Returns: (dates datetime64[D], csr (barang x hari)) sesuai urutan item_ids
+    """
+    days, services, units = transactions
+    with metrics.stage('aggregate'):
+        dates, service_ids, volume = volume_matrix(days, services, units)
+        recipe = recipe_matrix(bom, service_ids, item_ids)
+        return dates, (recipe.T @ volume).tocsr()
+
+
+class StockLedger:
+    """Pergerakan stok_sisa per barang per hari lokal, dari event change feed inventory_items"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.days = {}        # {id_inventory_item: {date: [pemakaian, restock]}}
+        self.stock = {}       # {id_inventory_item: stok_sisa terakhir}
+        self.since = None     # Hari pertama yang tercakup penuh
+        self.generation = None
+
+    def seed_stock(self, items):
+        """Stok awal (untuk payload tanpa old.stok_sisa); mulai mencatat jika feed terhubung"""
+        with self.lock:
+            for item in items:
+                self.stock.setdefault(item['id_inventory_item'], float(item.get('stok_sisa') or 0))
+            if self.since is None and change_feed.is_live():
+                self._reset()
+
+    def _reset(self):
+        # Hari ini belum tercakup penuh (event sebelum ledger mulai tidak tercatat),
+        # jadi cakupan dimulai besok
+        self.days = {}
+        self.since = local_today() + timedelta(days=1)
+        self.generation = change_feed.generation()
+
+    def on_change(self, op, new, old):
+        with self.lock:
+            if self.generation != change_feed.generation():
+                self._reset()  # Reconnect: event selama putus mungkin hilang
+
+            item_id = (new or old).get('id_inventory_item')
+            if op == 'DELETE':
+                self.stock.pop(item_id, None)
+                return
+            current = float(new.get('stok_sisa') or 0)
+            previous = (old or {}).get('stok_sisa', self.stock.get(item_id))
+            self.stock[item_id] = current
+            if op != 'UPDATE' or previous is None or float(previous) == current:
+                return
+
+            entry = self.days.setdefault(item_id, {}).setdefault(local_today(), [0.0, 0.0])
+            change = float(previous) - current
+            if change > 0:
+                entry[0] += change
+            else:
+                entry[1] -= change
+
+    def consumption(self, start, end):
+        """Returns: {id_inventory_item: {date: pemakaian}} hari [start, end] yang ada pemakaiannya"""
+        with self.lock:
+            result = {}
+            for item_id, days in self.days.items():
+                used = {day: entry[0] for day, entry in days.items() if start <= day <= end and entry[0] > 0}
+                if used:
+                    result[item_id] = used
+            return result
+
+    def totals(self, start, end):
+        """Returns: {id_inventory_item: (pemakaian, restock)} untuk hari [start, end]"""
+        with self.lock:
+            result = {}
+            for item_id, days in self.days.items():
+                moves = [entry for day, entry in days.items() if start <= day <= end]
+                result[item_id] = (sum(m[0] for m in moves), sum(m[1] for m in moves))
+            return result
+
+
+ledger = StockLedger()
+change_feed.subscribe('inventory_items', ledger.on_change)
+
+
+def _status(expected, actual):
+    if actual is None:
+        return None, None
+    if expected <= 0:
+        return (None, 'tanpa resep') if actual > 0 else (None, 'sesuai')
+    ratio = (actual - expected) / expected
+    if abs(ratio) <= TOLERANCE:
+        return ratio, 'sesuai'
+    return ratio, 'boros' if ratio > 0 else 'hemat'
+
+
+def reconcile(start=None, end=None):
+    """
+    Pemakaian teoretis vs tercatat per barang untuk rentang [start, end]
+    (datetime64[D] atau None). Default: sejak ledger mulai, atau
+    DEFAULT_WINDOW_DAYS hari terakhir data jika ledger belum aktif.
+    Returns: dict laporan, atau None jika tidak ada transaksi
+    Raises: InvalidRange jika start > end (mis. hanya 'from' di masa depan)
+    """
+    supabase = get_client()
+    with metrics.stage('fetch'):
+        bom = execute(supabase.table('service_bom') \
+            .select('service_id, id_inventory_item, jumlah_dipakai_per_unit')).data or []
+        items = execute(supabase.table('inventory_items') \
+            .select('id_inventory_item, nama_barang, stok_sisa, unit')).data or []
+    transactions = load_transactions()
+    if transactions is None:
+        return None
+
+    ledger.seed_stock(items)
+    item_ids = sorted({item['id_inventory_item'] for item in items} | {row['id_inventory_item'] for row in bom})
+    dates, expected = expected_usage(transactions, bom, item_ids)
+
+    # Rentang perbandingan: dipotong ke cakupan ledger; rentang di luar cakupan
+    # hanya melaporkan pemakaian teoretis
+    tracked = ledger.since is not None
+    since = np.datetime64(ledger.since, 'D') if tracked else None
+    if end is None:
+        end = max(dates[-1], np.datetime64(local_today(), 'D')) if tracked else dates[-1]
+    if start is None:
+        start = since if tracked and since <= end else end - (DEFAULT_WINDOW_DAYS - 1)
+    if start > end:
+        raise InvalidRange(f"'from' ({start}) must not be after 'to' ({end})")
+    covered = tracked and max(start, since) <= end
+    compared_from = max(start, since) if covered else None
+
+    lo = int(np.searchsorted(dates, compared_from if covered else start, side='left'))
+    hi = int(np.searchsorted(dates, end, side='right'))
+    expected_total = np.asarray(expected[:, lo:hi].sum(axis=1)).ravel()
+    actual = ledger.totals(compared_from.item(), end.item()) if covered else {}
+
+    by_id = {item['id_inventory_item']: item for item in items}
+    report = []
+    for i, item_id in enumerate(item_ids):
+        item = by_id.get(item_id, {})
+        consumed, restocked = actual.get(item_id, (0.0, 0.0)) if covered else (None, None)
+        ratio, status = _status(float(expected_total[i]), consumed)
+        report.append({
+            'id_inventory_item': item_id,
+            'nama_barang': item.get('nama_barang'),
+            'unit': item.get('unit'),
+            'stok_sisa': item.get('stok_sisa'),
+            'expected_usage': float(expected_total[i]),
+            'actual_usage': consumed,
+            'restocked': restocked,
+            'variance': consumed - float(expected_total[i]) if consumed is not None else None,
+            'variance_pct': round(ratio * 100, 1) if ratio is not None else None,
+            'status': status
+        })
+
+    # Selisih terbesar di atas
+    report.sort(key=lambda row: -abs(row['variance'] or 0))
+    return {
+        'from': str(start),
+        'to': str(end),
+        'compared_from': str(compared_from) if covered else None,
+        'tracked': tracked,
+        'transactions': int(len(transactions[0])),
+        'items': report
+    }
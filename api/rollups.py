@@ -0,0 +1,329 @@
+"""
+Rollup store: agregat revenue harian, mingguan, bulanan dan tahunan.
+
+Setiap bucket menyimpan sum, count (jumlah hari berisi data), min dan max
+revenue harian. Query satu bucket O(1) (dict index), rentang bucket pakai
+binary search, dan summary seluruh data tidak perlu men-scan series.
+
+Update bersifat inkremental: hari baru (kasus paling umum, tanggal terbaru)
+cukup di-append ke setiap level; perubahan nilai hari lama hanya menghitung
+ulang bucket yang terkena. fetch_data.py memperbarui store per hari yang
+berubah (refresh & change feed), jadi request tidak pernah membangunnya ulang.
+"""
+import bisect
+import threading
+import numpy as np
+from series import bucket_starts
+
+LEVELS = ('day', 'week', 'month', 'year')
+
+
+def bucket_key(day, level):
+    """Ordinal hari (int, hari sejak 1970-01-01) -> ordinal awal bucket"""
+    if level == 'day':
+        return day
+    if level == 'week':
+        # 1970-01-01 adalah hari Kamis -> minggu dimulai Senin
+        return day - (day + 3) % 7
+    unit = 'M' if level == 'month' else 'Y'
+    return int(np.datetime64(day, 'D').astype(f'datetime64[{unit}]').astype('datetime64[D]').astype(np.int64))
+
+
+def next_bucket_key(key, level):
+    """Ordinal awal bucket berikutnya"""
+    if level == 'day':
+        return key + 1
+    if level == 'week':
+        return key + 7
+    unit = 'M' if level == 'month' else 'Y'
+    start = np.datetime64(key, 'D').astype(f'datetime64[{unit}]')
+    return int((start + 1).astype('datetime64[D]').astype(np.int64))
+
+
+class _Level:
+    """Bucket satu granularity, terurut berdasarkan key (ordinal awal bucket)"""
+    def __init__(self):
+        self.keys = []
+        self.sums = []
+        self.counts = []
+        self.mins = []
+        self.maxs = []
+        self.index = {}  # {key: posisi di list}
+
+    def set(self, key, total, count, low, high):
+        pos = self.index.get(key)
+        if pos is None:
+            if not self.keys or key > self.keys[-1]:
+                # Append (bucket terbaru) -> O(1)
+                pos = len(self.keys)
+                self.keys.append(key)
+                self.sums.append(0.0)
+                self.counts.append(0)
+                self.mins.append(0.0)
+                self.maxs.append(0.0)
+            else:
+                # Bucket lama yang belum ada (jarang): sisipkan lalu perbarui index
+                pos = bisect.bisect_left(self.keys, key)
+                self.keys.insert(pos, key)
+                self.sums.insert(pos, 0.0)
+                self.counts.insert(pos, 0)
+                self.mins.insert(pos, 0.0)
+                self.maxs.insert(pos, 0.0)
+                for i in range(pos + 1, len(self.keys)):
+                    self.index[self.keys[i]] = i
+            self.index[key] = pos
+
+        self.sums[pos] = total
+        self.counts[pos] = count
+        self.mins[pos] = low
+        self.maxs[pos] = high
+
+    def remove(self, key):
+        pos = self.index.pop(key, None)
+        if pos is None:
+            return
+        for column in (self.keys, self.sums, self.counts, self.mins, self.maxs):
+            del column[pos]
+        for i in range(pos, len(self.keys)):
+            self.index[self.keys[i]] = i
+
+    def get(self, key):
+        pos = self.index.get(key)
+        if pos is None:
+            return None
+        return self.sums[pos], self.counts[pos], self.mins[pos], self.maxs[pos]
+
+    def span(self, first_key, last_key):
+        """Posisi [lo, hi) bucket dengan first_key <= key <= last_key"""
+        return bisect.bisect_left(self.keys, first_key), bisect.bisect_right(self.keys, last_key)
+
+
+class RollupStore:
+    def __init__(self):
+        self.levels = {level: _Level() for level in LEVELS}
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_series(cls, dates, values):
+        """Bangun semua level sekaligus dari series harian terurut (vectorized)"""
+        store = cls()
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        values = np.asarray(values, dtype=np.float64)
+        if len(dates) == 0:
+            return store
+
+        for level in LEVELS:
+            buckets = bucket_starts(dates, level)
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+
+            target = store.levels[level]
+            target.keys = buckets[starts].astype(np.int64).tolist()
+            target.sums = np.add.reduceat(values, starts).tolist()
+            target.counts = np.diff(np.r_[starts, len(values)]).tolist()
+            target.mins = np.minimum.reduceat(values, starts).tolist()
+            target.maxs = np.maximum.reduceat(values, starts).tolist()
+            target.index = {key: i for i, key in enumerate(target.keys)}
+
+        return store
+
+    # --- UPDATE INKREMENTAL ---
+
+    def set_day(self, day, value):
+        """Set total revenue satu hari (ordinal int atau datetime64/date)"""
+        day = _to_ordinal(day)
+        value = float(value)
+        with self.lock:
+            old = self.levels['day'].get(day)
+            self.levels['day'].set(day, value, 1, value, value)
+
+            for level in LEVELS[1:]:
+                key = bucket_key(day, level)
+                current = self.levels[level].get(key)
+
+                if current is None:
+                    self.levels[level].set(key, value, 1, value, value)
+                elif old is None:
+                    # Hari baru di bucket yang sudah ada -> O(1)
+                    total, count, low, high = current
+                    self.levels[level].set(key, total + value, count + 1, min(low, value), max(high, value))
+                else:
+                    total, count, low, high = current
+                    old_value = old[0]
+                    if (old_value == low and value > low) or (old_value == high and value < high):
+                        # Nilai ekstrem lama berubah: hitung ulang min/max dari hari di bucket ini
+                        low, high = self._day_extremes(key, level)
+                    else:
+                        low, high = min(low, value), max(high, value)
+                    self.levels[level].set(key, total - old_value + value, count, low, high)
+
+    def add(self, day, amount):
+        """Tambah revenue ke satu hari (mis. transaksi baru masuk)"""
+        day = _to_ordinal(day)
+        with self.lock:
+            current = self.levels['day'].get(day)
+            self.set_day(day, (current[0] if current else 0.0) + float(amount))
+
+    def remove_day(self, day):
+        """Hapus satu hari (semua transaksinya dihapus); bucket kosong ikut dihapus"""
+        day = _to_ordinal(day)
+        with self.lock:
+            old = self.levels['day'].get(day)
+            if old is None:
+                return
+            self.levels['day'].remove(day)
+
+            for level in LEVELS[1:]:
+                key = bucket_key(day, level)
+                total, count, low, high = self.levels[level].get(key)
+                if count <= 1:
+                    self.levels[level].remove(key)
+                    continue
+                if old[0] in (low, high):
+                    low, high = self._day_extremes(key, level)
+                self.levels[level].set(key, total - old[0], count - 1, low, high)
+
+    def sync(self, dates, values):
+        """
+        Samakan store dengan series harian terbaru.
+        Hanya hari yang baru atau berubah yang diproses (tanpa rebuild total);
+        jika ada hari yang hilang (data dihapus) store dibangun ulang.
+        Returns: jumlah hari yang diperbarui
+        """
+        dates = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+        values = np.asarray(values, dtype=np.float64)
+
+        with self.lock:
+            day_level = self.levels['day']
+            known = np.array([day_level.index.get(int(d), -1) for d in dates], dtype=np.int64) \
+                if day_level.keys else np.full(len(dates), -1, dtype=np.int64)
+            stored = np.asarray(day_level.sums, dtype=np.float64)
+
+            changed = known < 0
+            has_old = ~changed
+            if int(has_old.sum()) < len(day_level.keys):
+                fresh = RollupStore.from_series(dates.astype('datetime64[D]'), values)
+                self.levels = fresh.levels
+                return len(dates)
+
+            changed[has_old] = stored[known[has_old]] != values[has_old]
+
+            for day, value in zip(dates[changed].tolist(), values[changed].tolist()):
+                self.set_day(day, value)
+            return int(changed.sum())
+
+    def _day_extremes(self, key, level):
+        """min/max revenue harian di dalam satu bucket"""
+        days = self.levels['day']
+        lo, hi = days.span(key, next_bucket_key(key, level) - 1)
+        values = days.sums[lo:hi]
+        return min(values), max(values)
+
+    # --- QUERY ---
+
+    def bucket(self, level, day):
+        """Statistik bucket yang memuat `day` -> dict atau None, O(1)"""
+        key = bucket_key(_to_ordinal(day), level)
+        with self.lock:
+            stats = self.levels[level].get(key)
+        if stats is None:
+            return None
+        total, count, low, high = stats
+        return {'date': str(np.datetime64(key, 'D')), 'sum': total, 'count': count, 'min': low, 'max': high}
+
+    def summary(self):
+        """Summary seluruh data dari level tahunan (tanpa scan series harian)"""
+        with self.lock:
+            years = self.levels['year']
+            days = self.levels['day']
+            return _combine(years.sums, years.counts, years.mins, years.maxs,
+                            days.keys[0] if days.keys else None,
+                            days.keys[-1] if days.keys else None)
+
+    def range(self, level, start=None, end=None):
+        """
+        Bucket `level` untuk rentang hari [start, end] (inklusif, datetime64 / None).
+        Bucket di tepi yang hanya sebagian masuk rentang dihitung ulang dari data
+        harian, bucket di tengah langsung diambil dari rollup.
+        Returns: dict kolom numpy {'dates', 'sum', 'count', 'min', 'max'} + 'summary'
+        """
+        with self.lock:
+            days = self.levels['day']
+            buckets = self.levels[level]
+            if not days.keys:
+                return _empty_range()
+
+            first_day = days.keys[0] if start is None else max(_to_ordinal(start), days.keys[0])
+            last_day = days.keys[-1] if end is None else min(_to_ordinal(end), days.keys[-1])
+            if first_day > last_day:
+                return _empty_range()
+
+            lo, hi = buckets.span(bucket_key(first_day, level), bucket_key(last_day, level))
+            keys = buckets.keys[lo:hi]
+            sums = buckets.sums[lo:hi]
+            counts = buckets.counts[lo:hi]
+            mins = buckets.mins[lo:hi]
+            maxs = buckets.maxs[lo:hi]
+
+            if level != 'day' and keys:
+                # Bucket pertama / terakhir terpotong rentang -> hitung dari hari
+                for pos in {0, len(keys) - 1}:
+                    bucket_first = max(keys[pos], first_day)
+                    bucket_last = min(next_bucket_key(keys[pos], level) - 1, last_day)
+                    if bucket_first == keys[pos] and bucket_last == next_bucket_key(keys[pos], level) - 1:
+                        continue
+                    d_lo, d_hi = days.span(bucket_first, bucket_last)
+                    values = days.sums[d_lo:d_hi]
+                    sums[pos] = sum(values)
+                    counts[pos] = len(values)
+                    mins[pos] = min(values) if values else 0.0
+                    maxs[pos] = max(values) if values else 0.0
+
+            d_lo, d_hi = days.span(first_day, last_day)
+            result_first = days.keys[d_lo] if d_hi > d_lo else None
+            result_last = days.keys[d_hi - 1] if d_hi > d_lo else None
+
+        nonempty = [i for i, count in enumerate(counts) if count > 0]
+        return {
+            'dates': np.array([keys[i] for i in nonempty], dtype=np.int64).astype('datetime64[D]'),
+            'sum': np.array([sums[i] for i in nonempty], dtype=np.float64),
+            'count': np.array([counts[i] for i in nonempty], dtype=np.int64),
+            'min': np.array([mins[i] for i in nonempty], dtype=np.float64),
+            'max': np.array([maxs[i] for i in nonempty], dtype=np.float64),
+            'summary': _combine([sums[i] for i in nonempty], [counts[i] for i in nonempty],
+                                [mins[i] for i in nonempty], [maxs[i] for i in nonempty],
+                                result_first, result_last)
+        }
+
+
+def _to_ordinal(day):
+    if isinstance(day, (int, np.integer)):
+        return int(day)
+    return int(np.datetime64(day, 'D').astype(np.int64))
+
+
+def _combine(sums, counts, mins, maxs, first_day, last_day):
+    """Gabungkan statistik beberapa bucket menjadi blok summary response"""
+    total_days = int(sum(counts))
+    total = float(sum(sums))
+    return {
+        "total_days": total_days,
+        "total_revenue": total,
+        "average_daily": total / total_days if total_days else 0.0,
+        "min_revenue": float(min(mins)) if total_days else 0.0,
+        "max_revenue": float(max(maxs)) if total_days else 0.0,
+        "date_range": {
+            "start": str(np.datetime64(first_day, 'D')) if first_day is not None else None,
+            "end": str(np.datetime64(last_day, 'D')) if last_day is not None else None
+        }
+    }
+
+
+def _empty_range():
+    return {
+        'dates': np.array([], dtype='datetime64[D]'),
+        'sum': np.array([], dtype=np.float64),
+        'count': np.array([], dtype=np.int64),
+        'min': np.array([], dtype=np.float64),
+        'max': np.array([], dtype=np.float64),
+        'summary': _combine([], [], [], [], None, None)
+    }
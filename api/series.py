@@ -0,0 +1,47 @@
+"""
+Helper untuk series harian: parameter window /api/historical dan tanggal awal
+bucket per granularity (dipakai rollups.py).
+"""
+import numpy as np
+
+GRANULARITIES = ('day', 'week', 'month', 'year')
+
+
+def parse_date(value, name):
+    """'YYYY-MM-DD' -> numpy datetime64[D] (None jika kosong)"""
+    if not value:
+        return None
+    try:
+        return np.datetime64(value, 'D')
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def parse_window(params):
+    """Query ?from=YYYY-MM-DD&to=YYYY-MM-DD&granularity=day|week|month|year"""
+    params = params or {}
+    start = parse_date(params.get('from'), 'from')
+    end = parse_date(params.get('to'), 'to')
+    if start is not None and end is not None and start > end:
+        raise ValueError("'from' must not be after 'to'")
+
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+    return start, end, granularity
+
+
+def bucket_starts(dates, granularity):
+    """Tanggal awal bucket untuk setiap tanggal (minggu dimulai Senin)"""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    if granularity == 'week':
+        days = dates.astype(np.int64)
+        # 1970-01-01 adalah hari Kamis -> (days + 3) % 7 = 0 untuk Senin
+        return (days - (days + 3) % 7).astype('datetime64[D]')
+    if granularity == 'month':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    if granularity == 'year':
+        return dates.astype('datetime64[Y]').astype('datetime64[D]')
+    return dates
+
@@ -0,0 +1,850 @@
+"""
+Service core: satu implementasi untuk semua endpoint API.
+
+Adapter tipis di atasnya:
+- index.py          -> Flask app (Vercel serverless & WSGI untuk gunicorn)
+- asgi.py           -> ASGI app (chat async langsung di event loop)
+- predict.py, historical.py, inventory-prediction.py, workload-prediction.py,
+  order-eta.py, anomalies.py, inventory-reconciliation.py, health.py
+                    -> BaseHTTPRequestHandler per file (lihat http_handler.py)
+- backend-ml/app.py -> server long-running multi-worker (gunicorn)
+
+Setiap endpoint menerima dict query/body dan mengembalikan
+(payload, status_code) atau (payload, status_code, headers), jadi cache,
+pooling dan model registry cukup ditulis sekali di sini. Payload boleh
+berisi numpy array; adapter meng-encode-nya dengan serialize.dumps().
+"""
+import asyncio
+import json
+import os
+import threading
+import numpy as np
+from datetime import datetime
+from config import SUPABASE_URL, SUPABASE_KEY, CHATBOT_BACKEND, DATA_SOURCE, MODEL_ARTIFACT_PATH
+from db import get_client, breaker
+from metrics import stage
+from fetch_data import get_revenue_data, get_revenue_rollups, get_financial_series, financials_freshness
+from model import RevenuePredictionModel, ProfitPredictionModel, WorkloadPredictionModel, INTERVAL_LEVEL, BOOTSTRAP_RESAMPLES, data_fingerprint, series_fingerprint
+from inventory import InventoryPredictor
+from workload import get_workload_series
+import turnaround
+import anomaly
+import reconciliation
+import serialize
+import series
+import snapshots
+import singleflight
+import change_feed
+from logger import get_logger
+
+log = get_logger(__name__)
+
+MAX_PREDICTION_DAYS = 365
+PREDICT_MODES = ('revenue', 'profit')
+INTERVAL_INFO = {'method': 'residual_bootstrap', 'level': INTERVAL_LEVEL, 'resamples': BOOTSTRAP_RESAMPLES}
+
+# Cache-Control yang sama untuk semua adapter
+CACHE_PREDICT = {'Cache-Control': 'public, max-age=300'}      # 5 menit
+CACHE_HISTORICAL = {'Cache-Control': 'public, max-age=300'}   # 5 menit
+CACHE_INVENTORY = {'Cache-Control': 'public, max-age=180'}    # 3 menit
+CACHE_ORDER_ETA = {'Cache-Control': 'private, max-age=60'}    # Per pesanan, 1 menit
+NO_CACHE = {'Cache-Control': 'no-cache'}
+
+# --- MODEL REGISTRY ---
+# Model terakhir yang dilatih di proses ini (dipakai /api/train & /api/predict).
+# Selama fingerprint data sama, model (termasuk interval bootstrap yang sudah
+# di-cache di instance-nya) dipakai ulang alih-alih di-fit/load per request.
+model_cache = {
+    'model': None,
+    'metrics': None,
+    'trained_at': None,
+    'data_size': 0,
+    'fingerprint': None
+}
+model_lock = threading.Lock()
+
+# Model profit & workload terakhir: kind -> (fingerprint, model, metrics)
+fitted_models = {}
+
+# Komputasi mahal yang di-coalesce: request bersamaan menunggu hasil yang sama
+fits = singleflight.Group()         # fetch + fit model (revenue, profit, workload)
+inventory_calls = singleflight.Group()
+llm_calls = singleflight.Group()    # chat sinkron, key = pertanyaan dinormalisasi
+
+def train_fresh_model():
+    """Train model with latest data from Supabase and cache it (single-flight)"""
+    return fits.do('revenue', _train_fresh_model)
+
+def _train_fresh_model():
+    data = get_revenue_data()  # Returns list of dicts
+
+    if data is None or len(data) < 10:
+        raise Exception('Insufficient data for training')
+
+    fingerprint = data_fingerprint(data)
+    with model_lock:
+        if model_cache['model'] is not None and model_cache['fingerprint'] == fingerprint:
+            return model_cache['model'], model_cache['metrics'], model_cache['data_size']
+
+    model, metrics = load_or_train(data, fingerprint)
+
+    with model_lock:
+        model_cache['model'] = model
+        model_cache['metrics'] = metrics
+        model_cache['trained_at'] = model.trained_at
+        model_cache['data_size'] = len(data)
+        model_cache['fingerprint'] = fingerprint
+
+    return model, metrics, len(data)
+
+def load_or_train(data, fingerprint=None):
+    """
+    Model dari artifact (MODEL_ARTIFACT_PATH) jika dilatih dari data yang sama,
+    selain itu fit ulang lalu simpan artifact baru
+    Returns: (model, metrics)
+    """
+    if MODEL_ARTIFACT_PATH and fingerprint is None:
+        fingerprint = data_fingerprint(data)
+    if MODEL_ARTIFACT_PATH and os.path.exists(MODEL_ARTIFACT_PATH):
+        try:
+            model = RevenuePredictionModel.load(MODEL_ARTIFACT_PATH, fingerprint)
+            return model, model.metrics
+        except ValueError as error:
+            log.info("model artifact not used", extra={'path': MODEL_ARTIFACT_PATH, 'reason': str(error)})
+
+    model = RevenuePredictionModel()
+    metrics = model.train(data)
+
+    if 'error' in metrics:
+        raise Exception(metrics['error'])
+
+    if MODEL_ARTIFACT_PATH:
+        try:
+            model.save(MODEL_ARTIFACT_PATH)
+        except OSError as error:
+            log.warning("failed to save model artifact", extra={'path': MODEL_ARTIFACT_PATH, 'error': str(error)})
+
+    return model, metrics
+
+def parse_days(params, default=30):
+    """Validate 'days' query parameter (1-365 range)"""
+    days = int(params.get('days', default))
+    if days < 1 or days > MAX_PREDICTION_DAYS:
+        raise ValueError(f"Days must be between 1 and {MAX_PREDICTION_DAYS}")
+    return days
+
+def parse_mode(params):
+    """Validate 'mode' query parameter: revenue (default) | profit"""
+    mode = (params.get('mode') or 'revenue').lower()
+    if mode not in PREDICT_MODES:
+        raise ValueError(f"Mode must be one of: {', '.join(PREDICT_MODES)}")
+    return mode
+
+# --- ENDPOINTS ---
+
+def health(params=None):
+    """Liveness: selalu cepat, tidak menunggu Supabase / chatbot"""
+    return {
+        "status": "ok",
+        "message": "API is running",
+        "chatbot": chatbot_state['status'],
+        "environment": {
+            "supabase_url_configured": bool(SUPABASE_URL),
+            "supabase_key_configured": bool(SUPABASE_KEY),
+            "chatbot_backend": CHATBOT_BACKEND,
+            "data_source": DATA_SOURCE
+        },
+        "upstream": breaker.info(),
+        "change_feed": change_feed.status()
+    }, 200, NO_CACHE
+
+def check_database_connection():
+    """Check if database connection is working"""
+    try:
+        # Simple query to test connection
+        get_client().table('financials').select('id_transaksi').limit(1).execute()
+        return True
+    except Exception as error:
+        log.warning("database check failed", extra={'error': str(error)})
+        return False
+
+def readiness(params=None):
+    """Readiness: 200 jika database terhubung dan chatbot tidak sedang warm-up"""
+    db_status = check_database_connection()
+    with chatbot_lock:
+        status = chatbot_state['status']
+        ready_at = chatbot_state['ready_at']
+
+    ready = db_status and status != 'loading'
+    return {
+        "ready": ready,
+        "database": "connected" if db_status else "disconnected",
+        "chatbot": status,
+        "chatbot_ready_at": ready_at.isoformat() if ready_at else None
+    }, 200 if ready else 503, NO_CACHE
+
+def predict(params):
+    """Train model with fresh data and predict N days ahead (Linear Regression)"""
+    try:
+        days = parse_days(params)
+        fmt = serialize.parse_format(params)
+        mode = parse_mode(params)
+    except ValueError as val_error:
+        return {'success': False, 'error': f'Invalid parameter: {str(val_error)}'}, 400
+
+    if mode == 'profit':
+        return predict_profit(days, fmt)
+
+    # Snapshot dari precompute.py (jika ada & masih segar); ?fresh=1 memaksa hitung ulang
+    # Kolom numpy snapshot di-decode sekali per versi, per request cukup di-slice
+    snapshot = None if params.get('fresh') == '1' else snapshots.load_fresh('forecast', decode=decode_forecast)
+    if snapshot is not None:
+        forecast = forecast_horizon(snapshot['data'], days)
+        payload = forecast_payload(fmt, forecast, days)
+        payload['snapshot'] = snapshots.info(snapshot)
+        return payload, 200, CACHE_PREDICT
+
+    try:
+        # Always train with fresh data for realtime predictions
+        model, metrics, data_size = train_fresh_model()
+    except Exception as error:
+        return {'success': False, 'error': str(error)}, 500
+
+    payload = forecast_payload(fmt, revenue_forecast(model, metrics, data_size, days), days)
+    return with_freshness(payload, CACHE_PREDICT)
+
+def with_freshness(payload, headers):
+    """
+    Tambahkan indikator staleness data financials ke response;
+    data basi tidak boleh di-cache CDN selama cache normal
+    Returns: (payload, 200, headers)
+    """
+    freshness = financials_freshness()
+    payload['data_freshness'] = freshness
+    if freshness['stale']:
+        headers = {'Cache-Control': 'public, max-age=30'}
+    return payload, 200, headers
+
+def revenue_forecast(model, metrics, data_size, days):
+    """
+    Forecast N hari + fitted values sebagai kolom numpy
+    (dipakai request live dan snapshot precompute)
+    """
+    # Upper/lower bound: prediction interval residual bootstrap (di-cache per fit)
+    future_dates, predicted, lower, upper = model.forecast_intervals(days)
+    fitted_dates, actual, fitted = model.fitted_arrays()
+    return {
+        'future_dates': future_dates, 'predicted': predicted, 'lower': lower, 'upper': upper,
+        'fitted_dates': fitted_dates, 'actual': actual, 'fitted': fitted,
+        'metrics': {key: float(metrics[key]) for key in ('mae', 'rmse', 'r2', 'mape')},
+        'data_size': data_size
+    }
+
+def decode_forecast(data):
+    """Snapshot forecast (list JSON) -> kolom numpy (dibagi antar request: jangan di-mutate)"""
+    forecast = dict(data)
+    for key in ('future_dates', 'fitted_dates'):
+        forecast[key] = np.array(data[key], dtype='datetime64[D]')
+    for key in ('predicted', 'lower', 'upper', 'actual', 'fitted'):
+        forecast[key] = np.array(data[key], dtype=np.float64)
+    return forecast
+
+def forecast_horizon(forecast, days):
+    """Forecast hasil decode_forecast dengan horizon dipotong ke `days` (view, tanpa copy)"""
+    forecast = dict(forecast)
+    for key in ('future_dates', 'predicted', 'lower', 'upper'):
+        forecast[key] = forecast[key][:days]
+    return forecast
+
+def forecast_payload(fmt, forecast, days):
+    """Response /api/predict (mode revenue) dari hasil revenue_forecast"""
+    total_predicted = float(forecast['predicted'].sum())
+
+    return {
+        'success': True,
+        'format': fmt,
+        'predictions': serialize.to_shape(
+            fmt, forecast['future_dates'],
+            predicted_revenue=forecast['predicted'], upper_bound=forecast['upper'], lower_bound=forecast['lower']
+        ),
+        'fitted_values': serialize.to_shape(
+            fmt, forecast['fitted_dates'],
+            actual_revenue=forecast['actual'], fitted_revenue=forecast['fitted']
+        ),
+        'summary': {
+            'total_predicted': total_predicted,
+            'average_daily': total_predicted / days,
+            'days': days
+        },
+        'model_info': {
+            'trained_with_data_size': forecast['data_size'],
+            **forecast['metrics'],
+            'algorithm': 'Linear Regression (sklearn)',
+            'interval': INTERVAL_INFO
+        }
+    }
+
+def reuse_fitted(kind, fingerprint, fit):
+    """
+    Model `kind` terakhir jika di-fit dari series yang sama, selain itu fit() lalu simpan
+    Returns: (model, metrics)
+    """
+    with model_lock:
+        cached = fitted_models.get(kind)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1], cached[2]
+
+    model, metrics = fit()
+    with model_lock:
+        fitted_models[kind] = (fingerprint, model, metrics)
+    return model, metrics
+
+def train_profit_model():
+    """Fetch Pemasukan & Pengeluaran lalu fit ProfitPredictionModel; Returns: (model, metrics)"""
+    dates, revenue, expense = get_financial_series()
+    if dates is None or len(dates) < 10:
+        raise Exception('Insufficient data for training')
+
+    def fit():
+        model = ProfitPredictionModel()
+        metrics = model.train(dates, revenue, expense)
+        if 'error' in metrics:
+            raise Exception(metrics['error'])
+        return model, metrics
+
+    return reuse_fitted('profit', series_fingerprint(dates, revenue, expense), fit)
+
+def predict_profit(days, fmt):
+    """
+    Forecast Pemasukan & Pengeluaran bersama-sama lalu net profit (?mode=profit)
+    Kedua series berasal dari satu fetch tabel financials.
+    """
+    try:
+        model, metrics = fits.do('profit', train_profit_model)
+    except Exception as error:
+        return {'success': False, 'error': str(error)}, 500
+
+    # Interval dari residual bootstrap bersama (profit ikut korelasi revenue/expense)
+    future_dates, pred_revenue, pred_expense, pred_profit, bounds = model.forecast_intervals(days)
+    fitted_dates, actual, fitted = model.fitted_arrays()
+
+    total_revenue = float(pred_revenue.sum())
+    total_expense = float(pred_expense.sum())
+    total_profit = float(pred_profit.sum())
+
+    return with_freshness({
+        'success': True,
+        'mode': 'profit',
+        'format': fmt,
+        'predictions': serialize.to_shape(
+            fmt, future_dates,
+            predicted_revenue=pred_revenue,
+            revenue_upper=bounds['revenue'][1],
+            revenue_lower=bounds['revenue'][0],
+            predicted_expense=pred_expense,
+            expense_upper=bounds['expense'][1],
+            expense_lower=bounds['expense'][0],
+            predicted_profit=pred_profit,
+            upper_bound=bounds['profit'][1],
+            lower_bound=bounds['profit'][0]
+        ),
+        'fitted_values': serialize.to_shape(
+            fmt, fitted_dates,
+            actual_revenue=actual[:, 0], fitted_revenue=fitted[:, 0],
+            actual_expense=actual[:, 1], fitted_expense=fitted[:, 1],
+            actual_profit=actual[:, 0] - actual[:, 1],
+            fitted_profit=fitted[:, 0] - fitted[:, 1]
+        ),
+        'summary': {
+            'total_predicted_revenue': total_revenue,
+            'total_predicted_expense': total_expense,
+            'total_predicted_profit': total_profit,
+            'average_daily_profit': total_profit / days,
+            'days': days
+        },
+        'model_info': {
+            'trained_with_data_size': len(model.dates),
+            'metrics': metrics,
+            'algorithm': 'Multi-output Linear Regression (sklearn)',
+            'interval': INTERVAL_INFO
+        }
+    }, CACHE_PREDICT)
+
+def train_workload_model():
+    """Fetch transaksi lalu fit WorkloadPredictionModel; Returns: (model, metrics)"""
+    dates, service_ids, units = get_workload_series()
+    if dates is None or len(dates) < 10:
+        raise Exception('Insufficient data for training')
+
+    def fit():
+        model = WorkloadPredictionModel()
+        metrics = model.train(dates, service_ids, units)
+        if 'error' in metrics:
+            raise Exception(metrics['error'])
+        return model, metrics
+
+    return reuse_fitted('workload', series_fingerprint(dates, service_ids, units), fit)
+
+def workload_prediction(params=None):
+    """
+    Forecast beban kerja harian (jumlah_unit) per layanan N hari ke depan,
+    untuk rencana shift & kapasitas mesin cuci/pengering
+    """
+    params = params or {}
+    try:
+        days = parse_days(params)
+        fmt = serialize.parse_format(params)
+    except ValueError as val_error:
+        return {'success': False, 'error': f'Invalid parameter: {str(val_error)}'}, 400
+
+    try:
+        model, metrics = fits.do('workload', train_workload_model)
+    except Exception as error:
+        return {'success': False, 'error': str(error)}, 500
+
+    future_dates, predicted, lower, upper, total_lower, total_upper = model.forecast_intervals(days)
+    total = predicted.sum(axis=1)
+    peak = int(np.argmax(total))
+
+    services = []
+    for i, service_id in enumerate(model.service_ids.tolist()):
+        service_total = float(predicted[:, i].sum())
+        services.append({
+            'service_id': service_id,
+            'predictions': serialize.to_shape(
+                fmt, future_dates,
+                predicted_units=predicted[:, i], upper_bound=upper[:, i], lower_bound=lower[:, i]
+            ),
+            'total_predicted': service_total,
+            'average_daily': service_total / days,
+            'metrics': metrics[str(service_id)]
+        })
+
+    return {
+        'success': True,
+        'format': fmt,
+        'services': services,
+        'total': serialize.to_shape(
+            fmt, future_dates,
+            predicted_units=total, upper_bound=total_upper, lower_bound=total_lower
+        ),
+        'summary': {
+            'total_predicted_units': float(total.sum()),
+            'average_daily_units': float(total.sum()) / days,
+            'peak_date': str(future_dates[peak]),
+            'peak_units': float(total[peak]),
+            'days': days
+        },
+        'model_info': {
+            'trained_with_data_size': len(model.dates),
+            'services': len(model.service_ids),
+            'metrics': metrics['total'],
+            'algorithm': 'Multi-output Linear Regression (sklearn)',
+            'interval': INTERVAL_INFO
+        }
+    }, 200, CACHE_PREDICT
+
+def order_eta(params=None):
+    """
+    Estimasi waktu selesai satu pesanan (halaman lacak pesanan customer)
+    Query: id (id_transaction)
+    """
+    params = params or {}
+    order_id = params.get('id')
+    if not order_id or not str(order_id).isdigit():
+        return {'success': False, 'error': "Invalid parameter: 'id' must be an id_transaction"}, 400
+
+    try:
+        eta = turnaround.estimator.eta(int(order_id))
+    except Exception as error:
+        return {'success': False, 'error': str(error)}, 500
+
+    if eta is None:
+        return {'success': False, 'error': f"Order {order_id} not found"}, 404, CACHE_ORDER_ETA
+    return {'success': True, 'order': eta}, 200, CACHE_ORDER_ETA
+
+def anomalies(params=None):
+    """
+    Hari tidak biasa (revenue / pengeluaran) dan stok yang turun lebih cepat
+    dari prediksi BOM, dalam N hari terakhir data
+    """
+    params = params or {}
+    try:
+        days = parse_days(params)
+    except ValueError as val_error:
+        return {'success': False, 'error': f'Invalid parameter: {str(val_error)}'}, 400
+
+    try:
+        report = anomaly.monitor.report(days)
+    except Exception as error:
+        return {'success': False, 'error': str(error)}, 500
+
+    return {
+        'success': True,
+        'days': days,
+        'total_anomalies': len(report['anomalies']),
+        **report,
+        'method': {'baseline': 'EWMA', 'spread': 'EWMA absolute deviation', 'alpha': anomaly.ALPHA, 'threshold': anomaly.THRESHOLD, 'huber_k': anomaly.HUBER_K}
+    }, 200, NO_CACHE
+
+def inventory_reconciliation(params=None):
+    """
+    Pemakaian bahan menurut resep (service_bom x transaksi) vs penurunan stok tercatat
+    Query: from/to (YYYY-MM-DD, inklusif)
+    """
+    params = params or {}
+    try:
+        start = series.parse_date(params.get('from'), 'from')
+        end = series.parse_date(params.get('to'), 'to')
+        if start is not None and end is not None and start > end:
+            raise ValueError("'from' must not be after 'to'")
+    except ValueError as val_error:
+        return {'success': False, 'error': f'Invalid parameter: {str(val_error)}'}, 400
+
+    try:
+        report = reconciliation.reconcile(start, end)
+    except reconciliation.InvalidRange as val_error:
+        return {'success': False, 'error': f'Invalid parameter: {str(val_error)}'}, 400
+    except Exception as error:
+        return {'success': False, 'error': str(error)}, 500
+
+    if report is None:
+        return {'success': False, 'error': 'Data transaksi kosong', 'items': []}, 500
+
+    counts = {}
+    for item in report['items']:
+        if item['status']:
+            counts[item['status']] = counts.get(item['status'], 0) + 1
+    return {'success': True, **report, 'summary': counts, 'tolerance': reconciliation.TOLERANCE}, 200, NO_CACHE
+
+def train(params=None):
+    """Train the model with latest data from Supabase"""
+    try:
+        model, metrics, data_size = train_fresh_model()
+    except Exception as error:
+        return {'success': False, 'error': str(error)}, 500
+
+    return {
+        'success': True,
+        'message': 'Model trained successfully with fresh data',
+        'metrics': {
+            'mae': float(metrics['mae']),
+            'rmse': float(metrics['rmse']),
+            'r2': float(metrics['r2']),
+            'mape': float(metrics['mape'])
+        },
+        'training_data_size': data_size,
+        'trained_at': model_cache['trained_at'].isoformat()
+    }, 200
+
+def historical(params=None):
+    """
+    Get historical revenue data + summary
+    Query: from/to (YYYY-MM-DD, inklusif), granularity day|week|month|year, format rows|columnar
+    """
+    try:
+        fmt = serialize.parse_format(params)
+        start, end, granularity = series.parse_window(params)
+    except ValueError as val_error:
+        return {'success': False, 'error': f'Invalid parameter: {str(val_error)}', 'data': []}, 400
+
+    rollups = get_revenue_rollups()
+
+    if rollups is None:
+        return {
+            "success": False,
+            "error": "Could not fetch data from Supabase",
+            "data": []
+        }, 500
+
+    # Bucket dari rollup store (binary search atas tanggal bucket);
+    # bucket di tepi rentang dihitung ulang dari data harian
+    result = rollups.range(granularity, start, end)
+    windowed = start is not None or end is not None
+
+    return with_freshness({
+        "success": True,
+        "format": fmt,
+        "granularity": granularity,
+        "data": serialize.to_shape(fmt, result['dates'], revenue=result['sum']),
+        "total_records": len(result['sum']),
+        # Summary dihitung dari statistik bucket, tanpa scan series harian
+        "summary": result['summary'] if windowed else rollups.summary()
+    }, CACHE_HISTORICAL)
+
+def inventory_prediction(params=None):
+    """Predict inventory stock depletion using Moving Average"""
+    params = params or {}
+    snapshot = None if params.get('fresh') == '1' else snapshots.load_fresh('inventory')
+    if snapshot is not None:
+        payload = inventory_payload(snapshot['data']['predictions'])
+        payload['snapshot'] = snapshots.info(snapshot)
+        return payload, 200, CACHE_INVENTORY
+
+    result = inventory_calls.do('inventory', InventoryPredictor().get_prediction)
+
+    # Handle case where result might be an error dict
+    if isinstance(result, dict) and "error" in result:
+        log.warning("inventory prediction returned error", extra={'error': result['error']})
+        return {"success": False, "error": result["error"], "predictions": []}, 500
+
+    # Validate result is a list
+    if not isinstance(result, list):
+        return {"success": False, "error": "Invalid prediction data format", "predictions": []}, 500
+
+    return inventory_payload(result), 200, CACHE_INVENTORY
+
+def inventory_payload(predictions):
+    return {
+        "success": True,
+        "predictions": predictions,
+        "total_items": len(predictions),
+        "method": "Moving Average",
+        "description": "Prediksi berdasarkan rata-rata pemakaian harian dari 100 transaksi terakhir"
+    }
+
+# --- CHATBOT ---
+# Long-running server: start_warm_up() saat proses mulai (tidak memblokir port)
+# Serverless: chatbot dibuat saat request chat pertama
+chatbot_state = {
+    'bot': None,
+    'status': 'idle',  # idle | loading | ready | failed
+    'error': None,
+    'ready_at': None
+}
+chatbot_lock = threading.Lock()   # Melindungi chatbot_state
+chatbot_build_lock = threading.Lock()  # Hanya satu thread yang membangun chatbot
+chat_gateway = None
+
+def create_chatbot():
+    """Groq LLM (atau fake) jika dikonfigurasi, selain itu FAQ matcher TF-IDF"""
+    if CHATBOT_BACKEND == 'faq':
+        from faq_matcher import FaqMatcher
+        return FaqMatcher()
+    from chatbot import LaundryChatbot
+    return LaundryChatbot()
+
+def warm_up_chatbot():
+    """Bangun chatbot (download FAQ + siapkan konteks) dan catat status kesiapannya"""
+    with chatbot_build_lock:
+        if chatbot_state['status'] == 'ready':
+            return
+        with chatbot_lock:
+            chatbot_state['status'] = 'loading'
+        try:
+            new_bot = create_chatbot()
+            with chatbot_lock:
+                chatbot_state['bot'] = new_bot
+                chatbot_state['status'] = 'ready'
+                chatbot_state['error'] = None
+                chatbot_state['ready_at'] = datetime.now()
+        except Exception as e:
+            log.error("chatbot warm-up failed", extra={'error': str(e)})
+            with chatbot_lock:
+                chatbot_state['status'] = 'failed'
+                chatbot_state['error'] = str(e)
+
+def start_warm_up():
+    with chatbot_lock:
+        if chatbot_state['status'] in ('loading', 'ready'):
+            return
+        chatbot_state['status'] = 'loading'
+    threading.Thread(target=warm_up_chatbot, name='chatbot-warmup', daemon=True).start()
+
+def get_chatbot():
+    """
+    Chatbot yang siap dipakai.
+    Returns None selama warm-up background masih berjalan; jika belum pernah
+    (atau gagal) dibangun, dibangun sekarang secara sinkron (mode serverless).
+    """
+    with chatbot_lock:
+        status = chatbot_state['status']
+        if status == 'ready':
+            return chatbot_state['bot']
+        if status == 'loading':
+            return None
+
+    warm_up_chatbot()
+    with chatbot_lock:
+        return chatbot_state['bot']
+
+def apply_faq_change(op, new, old):
+    """Change feed tabel faq: perbarui index chatbot yang sedang dipakai tanpa reload"""
+    with chatbot_lock:
+        bot = chatbot_state['bot']
+    if bot is not None:
+        bot.apply_change(op, new, old)
+
+change_feed.subscribe('faq', apply_faq_change)
+
+def get_chat_gateway(bot):
+    """Async gateway (AsyncGroq) hanya untuk backend LLM"""
+    global chat_gateway
+    if chat_gateway is None:
+        from chat_gateway import ChatGateway
+        chat_gateway = ChatGateway(bot)
+    return chat_gateway
+
+def chatbot_not_ready():
+    """Response 503 selama chatbot belum siap (client boleh retry)"""
+    with chatbot_lock:
+        status, error = chatbot_state['status'], chatbot_state['error']
+    return {
+        'success': False,
+        'error': 'Chatbot sedang disiapkan, silakan coba lagi sebentar.' if status == 'loading' else f'Chatbot gagal dimuat: {error}',
+        'reply': 'Maaf, chatbot sedang disiapkan. Silakan coba lagi sebentar.',
+        'status': status
+    }, 503, {'Retry-After': '5'}
+
+def chat_reply(reply):
+    # 'response' (frontend Vercel) dan 'reply' (frontend backend-ml) dikirim dua-duanya
+    return {"success": True, "response": reply, "reply": reply, "sender": "bot"}
+
+def chat_body_error(data):
+    """400 jika body JSON bukan object (mis. [1, 2] atau "hi"); None jika boleh diproses"""
+    if data is not None and not isinstance(data, dict):
+        return {"success": False, "error": "Invalid request body"}, 400
+    return None
+
+def validate_chat_body(data):
+    """Returns (message, error_result). Pesan kosong dijawab sapaan."""
+    body_error = chat_body_error(data)
+    if body_error:
+        return None, body_error
+    if not data or 'message' not in data:
+        return None, ({"success": False, "error": "No message provided"}, 400)
+    message = str(data['message'] or '').strip()
+    if not message:
+        return None, (chat_reply("Halo! Ada yang bisa saya bantu?"), 200)
+    return message, None
+
+def wants_stream(data, accept_header=''):
+    """Mode SSE: body {"stream": true} atau header Accept: text/event-stream"""
+    return bool(data) and (data.get('stream') is True or 'text/event-stream' in (accept_header or ''))
+
+def chat_info(params=None):
+    """Info chatbot (GET /api/chatbot)"""
+    bot = get_chatbot()
+    if bot is None:
+        return chatbot_not_ready()
+    return {
+        "success": True,
+        "message": "Chatbot API is ready",
+        "backend": CHATBOT_BACKEND,
+        "faq_count": bot.faq_count,
+        "usage": {
+            "method": "POST",
+            "endpoint": "/api/chatbot",
+            "body": {
+                "message": "your question here",
+                "stream": False
+            }
+        }
+    }, 200
+
+def chat(data):
+    """Chatbot endpoint for customer inquiries (sinkron)"""
+    message, error_result = validate_chat_body(data)
+    if error_result:
+        return error_result
+
+    bot = get_chatbot()
+    if bot is None:
+        return chatbot_not_ready()
+
+    with stage('llm'):
+        if CHATBOT_BACKEND == 'faq':
+            reply = bot.get_response(message)
+        else:
+            reply = llm_calls.do(singleflight.normalize_question(message), bot.get_response, message)
+    return chat_reply(reply), 200
+
+async def chat_async(data):
+    """Sama dengan chat(), tapi panggilan LLM lewat ChatGateway (tidak memakan thread)"""
+    message, error_result = validate_chat_body(data)
+    if error_result:
+        return error_result
+
+    # Proses dingin: get_chatbot() bisa fetch FAQ dari Supabase (blocking), jadi di luar event loop
+    bot = await asyncio.to_thread(get_chatbot)
+    if bot is None:
+        return chatbot_not_ready()
+
+    if CHATBOT_BACKEND == 'faq':
+        # Lookup TF-IDF lokal: cepat, tidak perlu event loop
+        with stage('llm'):
+            reply = bot.get_response(message)
+        return chat_reply(reply), 200
+
+    from chat_gateway import ChatTimeout
+    try:
+        with stage('llm'):
+            reply = await get_chat_gateway(bot).get_response(message)
+    except ChatTimeout as e:
+        return {"success": False, "error": str(e)}, 504
+    return chat_reply(reply), 200
+
+def format_sse(payload, event=None):
+    """Format satu Server-Sent Event (payload di-encode sebagai JSON)"""
+    message = f"data: {json.dumps(payload)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+def chat_stream(bot, message):
+    """
+    Relay token dari chatbot ke client sebagai SSE:
+    - data: {"delta": "..."} untuk setiap potongan teks
+    - event: done  -> {"response": "<jawaban lengkap>"}
+    - event: error -> {"error": "..."}
+    """
+    parts = []
+    try:
+        for delta in bot.stream_response(message):
+            parts.append(delta)
+            yield format_sse({"delta": delta})
+        yield format_sse({"response": "".join(parts)}, event="done")
+    except Exception as e:
+        log.error("chatbot stream failed", extra={'error': str(e)})
+        yield format_sse({"error": str(e)}, event="error")
+
+async def chat_stream_async(bot, message):
+    """
+    Sama dengan chat_stream, tapi token LLM diambil lewat ChatGateway
+    (semaphore + timeout gateway, tidak memakan thread selama generation)
+    """
+    parts = []
+    try:
+        async for delta in _stream_deltas(bot, message):
+            parts.append(delta)
+            yield format_sse({"delta": delta})
+        yield format_sse({"response": "".join(parts)}, event="done")
+    except Exception as e:
+        log.error("chatbot stream failed", extra={'error': str(e)})
+        yield format_sse({"error": str(e)}, event="error")
+
+async def _stream_deltas(bot, message):
+    if CHATBOT_BACKEND == 'faq':
+        # Lookup TF-IDF lokal: cepat, tidak perlu gateway
+        for delta in bot.stream_response(message):
+            yield delta
+        return
+    async for delta in get_chat_gateway(bot).stream_response(message):
+        yield delta
+
+def reload_chatbot(params=None):
+    """Reload chatbot FAQ data from Supabase"""
+    bot = get_chatbot()
+    if bot is None:
+        return chatbot_not_ready()
+
+    try:
+        count = bot.reload_data()
+    except Exception as e:
+        return {"success": False, "error": str(e)}, 500
+
+    return {
+        "success": True,
+        "message": "FAQ data reloaded successfully",
+        "faq_count": count
+    }, 200
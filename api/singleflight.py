@@ -0,0 +1,71 @@
+"""
+Single-flight: request bersamaan dengan key yang sama berbagi satu eksekusi.
+
+    fits = singleflight.Group()
+    model, metrics, size = fits.do('revenue', train_fresh_model)
+
+Thread pertama (leader) menjalankan fungsi; thread lain yang datang selama
+leader masih berjalan menunggu lalu menerima hasil (atau exception) yang
+sama. Begitu selesai key dilepas, jadi panggilan berikutnya menghitung
+ulang (bukan cache). Waktu tunggu follower dicatat sebagai stage
+'coalesced' (Server-Timing & /api/metrics).
+
+Dipakai untuk fit model, inventory dan panggilan LLM sinkron (service.py).
+Fetch financials punya refresh bersama sendiri dengan batas waktu tunggu
+(fetch_data.py), jalur chat async punya coalescing sendiri di event loop
+ChatGateway (chat_gateway.py).
+"""
+import threading
+import metrics
+
+
+def normalize_question(text):
+    """Kunci coalescing pertanyaan chat: huruf kecil + spasi dirapikan"""
+    return " ".join(text.lower().split())
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.shared = 0
+
+
+class Group:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # {key: _Call yang sedang berjalan}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Jalankan fn(*args, **kwargs) sekali per key yang sedang in-flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.shared += 1
+
+        if not leader:
+            with metrics.stage('coalesced'):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def inflight(self):
+        """Jumlah key yang sedang berjalan"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,142 @@
+"""
+Snapshot berversi untuk hasil yang dihitung di luar request (precompute.py).
+
+    {SNAPSHOT_DIR}/forecast/20260119T010000Z.json   # satu file per versi
+    {SNAPSHOT_DIR}/forecast/latest.json             # pointer ke versi terbaru
+
+Pointer ditulis atomik (tulis file sementara lalu os.replace), jadi
+pembaca tidak pernah melihat snapshot setengah jadi. Snapshot yang sudah
+dibaca (dan hasil decode-nya, lihat load) di-cache di memori per proses
+sampai pointer berubah.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from config import SNAPSHOT_DIR, SNAPSHOT_MAX_AGE_SECONDS, SNAPSHOT_KEEP
+import serialize
+
+POINTER = 'latest.json'
+
+_cache = {}  # {name: (pointer mtime, snapshot)}
+_decoded = {}  # {(name, decode): (pointer mtime, snapshot dengan data hasil decode)}
+_cache_lock = threading.Lock()
+
+
+def enabled():
+    return bool(SNAPSHOT_DIR)
+
+
+def _write_atomic(path, body):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def save(name, data):
+    """
+    Simpan snapshot versi baru lalu arahkan pointer ke versi itu
+    Returns: version (timestamp UTC)
+    """
+    if not enabled():
+        raise RuntimeError('SNAPSHOT_DIR belum di-set')
+
+    folder = os.path.join(SNAPSHOT_DIR, name)
+    os.makedirs(folder, exist_ok=True)
+
+    now = datetime.now(timezone.utc)
+    version = now.strftime('%Y%m%dT%H%M%S%fZ')
+    snapshot = {'name': name, 'version': version, 'generated_at': now.isoformat(), 'data': data}
+
+    _write_atomic(os.path.join(folder, f"{version}.json"), serialize.dumps(snapshot))
+    _write_atomic(os.path.join(folder, POINTER), serialize.dumps({'version': version, 'generated_at': snapshot['generated_at']}))
+    prune(name)
+    return version
+
+
+def prune(name, keep=SNAPSHOT_KEEP):
+    """Hapus versi lama, sisakan `keep` terbaru"""
+    folder = os.path.join(SNAPSHOT_DIR, name)
+    versions = sorted(f for f in os.listdir(folder) if f.endswith('.json') and f != POINTER)
+    for old in versions[:-keep]:
+        try:
+            os.remove(os.path.join(folder, old))
+        except OSError:
+            pass
+
+
+def load(name, decode=None):
+    """
+    Snapshot terbaru {'version', 'generated_at', 'data'} atau None
+    decode: jika diisi, 'data' diganti decode(data); hasilnya di-cache per versi
+    pointer sehingga decode hanya jalan sekali per snapshot baru
+    """
+    loaded = _load(name)
+    if loaded is None:
+        return None
+    mtime, snapshot = loaded
+    if decode is None:
+        return snapshot
+
+    key = (name, decode)
+    with _cache_lock:
+        cached = _decoded.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    decoded = dict(snapshot, data=decode(snapshot['data']))
+    with _cache_lock:
+        _decoded[key] = (mtime, decoded)
+    return decoded
+
+
+def _load(name):
+    """Returns: (pointer mtime, snapshot) atau None"""
+    if not enabled():
+        return None
+
+    pointer = os.path.join(SNAPSHOT_DIR, name, POINTER)
+    try:
+        mtime = os.stat(pointer).st_mtime_ns
+    except OSError:
+        return None
+
+    with _cache_lock:
+        cached = _cache.get(name)
+        if cached and cached[0] == mtime:
+            return cached
+
+    try:
+        with open(pointer) as f:
+            version = json.load(f)['version']
+        with open(os.path.join(SNAPSHOT_DIR, name, f"{version}.json")) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    with _cache_lock:
+        _cache[name] = (mtime, snapshot)
+    return mtime, snapshot
+
+
+def age_seconds(snapshot):
+    generated = datetime.fromisoformat(snapshot['generated_at'])
+    return (datetime.now(timezone.utc) - generated).total_seconds()
+
+
+def load_fresh(name, max_age=SNAPSHOT_MAX_AGE_SECONDS, decode=None):
+    """Snapshot terbaru (lihat load) jika umurnya <= max_age detik, selain itu None"""
+    snapshot = load(name, decode)
+    if snapshot is None or age_seconds(snapshot) > max_age:
+        return None
+    return snapshot
+
+
+def info(snapshot):
+    """Metadata snapshot untuk response"""
+    return {
+        'version': snapshot['version'],
+        'generated_at': snapshot['generated_at'],
+        'age_seconds': round(age_seconds(snapshot), 1)
+    }
@@ -0,0 +1,129 @@
+"""
+Generator data laundry sintetis yang deterministik (seed tetap) untuk
+benchmark dan data source lokal (DATA_SOURCE=memory / sqlite).
+
+    tables = generate(100_000, seed=42)   # {'financials': [...], 'transactions': [...], ...}
+
+`scale` = jumlah baris financials dan transactions. Tabel referensi
+(inventory_items, service_bom, faq) ikut membesar secukupnya.
+"""
+import numpy as np
+
+START_DATE = np.datetime64('2023-01-01')
+MAX_SPAN_DAYS = 3650           # Maks. 10 tahun histori; skala besar = lebih banyak baris per hari
+ROWS_PER_DAY = 40
+SERVICES = 10
+INVENTORY_ITEMS = 30
+MATERIALS_PER_SERVICE = 3
+
+ITEM_NAMES = ['Deterjen', 'Pewangi', 'Pelembut', 'Pemutih', 'Plastik', 'Hanger', 'Gas LPG', 'Label']
+UNITS = ['Liter', 'Pcs', 'Kg']
+FAQ_TOPICS = ['harga cuci kiloan', 'harga setrika', 'jam buka', 'lokasi laundry', 'layanan antar jemput',
+              'cuci sepatu', 'cuci karpet', 'cuci bed cover', 'lama pengerjaan', 'metode pembayaran',
+              'express satu hari', 'member diskon', 'noda membandel', 'pakaian luntur', 'komplain']
+
+
+def parse_scale(text):
+    """'1k' -> 1000, '10M' -> 10_000_000, '2500' -> 2500"""
+    text = str(text).strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def _dates(rng, n):
+    span = int(min(MAX_SPAN_DAYS, max(30, n // ROWS_PER_DAY)))
+    offsets = np.sort(rng.integers(0, span, n))
+    return START_DATE + offsets
+
+
+def financials(rng, n):
+    days = _dates(rng, n).astype(str)
+    hours = rng.integers(7, 21, n)
+    is_expense = rng.random(n) < 0.3
+    # Pemasukan: nota laundry; Pengeluaran: belanja bahan (lebih besar, lebih jarang)
+    amounts = np.where(is_expense, rng.integers(20, 500, n) * 1000, rng.integers(10, 150, n) * 1000)
+    return [
+        {
+            'id_transaksi': i + 1,
+            'tanggal': f"{day}T{hour:02d}:00:00",
+            'tipe': 'Pengeluaran' if expense else 'Pemasukan',
+            'jumlah': int(amount),
+            'keterangan': 'Belanja bahan' if expense else f"Pembayaran NOTA-{i + 1}"
+        }
+        for i, (day, hour, expense, amount) in enumerate(zip(days.tolist(), hours.tolist(), is_expense.tolist(), amounts.tolist()))
+    ]
+
+
+def transactions(rng, n):
+    days = _dates(rng, n)
+    durations = rng.integers(1, 4, n)
+    finished = days + durations
+    service_ids = rng.integers(1, SERVICES + 1, n)
+    units = rng.integers(1, 10, n)
+    prices = units * rng.integers(6, 15, n) * 1000
+    statuses = rng.choice(['Diproses', 'Selesai', 'Diambil'], n, p=[0.1, 0.2, 0.7])
+    return [
+        {
+            'id_transaction': i + 1,
+            'nomor_nota': f"NOTA-{i + 1}",
+            'tanggal_masuk': f"{day}T08:00:00",
+            'tanggal_selesai': None if status == 'Diproses' else f"{done}T17:00:00",
+            'service_id': int(service_id),
+            'jumlah_unit': int(unit),
+            'total_harga': int(price),
+            'status_pesanan': status
+        }
+        for i, (day, done, service_id, unit, price, status) in enumerate(zip(
+            days.astype(str).tolist(), finished.astype(str).tolist(), service_ids.tolist(),
+            units.tolist(), prices.tolist(), statuses.tolist()))
+    ]
+
+
+def inventory_items(rng):
+    return [
+        {
+            'id_inventory_item': i + 1,
+            'nama_barang': f"{ITEM_NAMES[i % len(ITEM_NAMES)]} {i // len(ITEM_NAMES) + 1}",
+            'stok_sisa': float(rng.integers(5, 200)),
+            'unit': UNITS[i % len(UNITS)]
+        }
+        for i in range(INVENTORY_ITEMS)
+    ]
+
+
+def service_bom(rng):
+    rows = []
+    for service_id in range(1, SERVICES + 1):
+        items = rng.choice(INVENTORY_ITEMS, MATERIALS_PER_SERVICE, replace=False) + 1
+        for item_id in items.tolist():
+            rows.append({
+                'service_id': service_id,
+                'id_inventory_item': item_id,
+                'jumlah_dipakai_per_unit': round(float(rng.uniform(0.01, 0.5)), 3)
+            })
+    return rows
+
+
+def faq(rng, n):
+    rows = []
+    for i in range(n):
+        topic = FAQ_TOPICS[i % len(FAQ_TOPICS)]
+        variant = i // len(FAQ_TOPICS)
+        rows.append({
+            'id': i + 1,
+            'pertanyaan': f"berapa {topic} paket {variant}?" if variant else f"bagaimana {topic}?",
+            'jawaban': f"Info {topic} (paket {variant}): Rp {int(rng.integers(5, 50)) * 1000}"
+        })
+    return rows
+
+
+def generate(scale, seed=42):
+    """Semua tabel untuk satu skala; hasil identik untuk scale & seed yang sama"""
+    rng = np.random.default_rng(seed)
+    return {
+        'financials': financials(rng, scale),
+        'transactions': transactions(rng, scale),
+        'inventory_items': inventory_items(rng),
+        'service_bom': service_bom(rng),
+        'faq': faq(rng, int(min(5000, max(len(FAQ_TOPICS), scale // 1000))))
+    }
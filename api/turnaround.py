@@ -0,0 +1,339 @@
+"""
+Estimasi waktu selesai pesanan (ETA) untuk halaman lacak pesanan customer.
+
+Durasi pengerjaan (tanggal_masuk -> tanggal_selesai) pesanan yang sudah
+Selesai/Diambil dikumpulkan per (service_id, tingkat antrean saat pesanan
+masuk) dalam DurationSketch: histogram bucket logaritmik (resolusi ~5%),
+update O(1), quantile dari cumsum yang di-cache per sketch.
+
+    estimator = TurnaroundEstimator()
+    estimator.eta(123)   # {'status': 'Diproses', 'estimated_done': ..., ...}
+
+Antrean (backlog) = jumlah pesanan lain yang masih dikerjakan saat pesanan
+masuk; dibagi tiga tingkat (rendah / sedang / tinggi) dengan batas tertile
+histori. Sketch yang sampelnya < MIN_SAMPLES jatuh ke sketch per layanan,
+lalu ke sketch global.
+
+Seed: satu fetch tabel transactions, semua durasi & backlog dihitung
+vectorized. Setelah itu change feed (transactions) menjaga sketch terkini
+per baris; tanpa change feed, seed diulang setiap REFRESH_SECONDS.
+"""
+import math
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+from config import SHOP_TIMEZONE
+from db import get_client, breaker, execute
+from date_parser import parse_local_minutes, report_invalid
+import change_feed
+import metrics
+import singleflight
+from logger import get_logger
+
+log = get_logger(__name__)
+
+STATUS_DONE = ('Selesai', 'Diambil')
+BACKLOG_LEVELS = ('rendah', 'sedang', 'tinggi')
+QUANTILES = (0.5, 0.9)          # Estimasi & batas "paling lambat"
+MIN_SAMPLES = 20                # Minimum sampel sebelum fallback ke sketch lebih umum
+MAX_OPEN_DAYS = 14              # Pesanan Diproses lebih lama dari ini tidak dihitung antrean
+REFRESH_SECONDS = 300           # Seed ulang tanpa change feed
+
+# Bucket durasi (menit): 10 menit .. ~90 hari, tiap bucket 5% lebih lebar
+BUCKET_MIN_MINUTES = 10.0
+BUCKET_GROWTH = 1.05
+BUCKETS = int(math.ceil(math.log(90 * 24 * 60 / BUCKET_MIN_MINUTES) / math.log(BUCKET_GROWTH)))
+_EDGES = BUCKET_MIN_MINUTES * BUCKET_GROWTH ** np.arange(BUCKETS + 1)
+_MIDPOINTS = np.sqrt(_EDGES[:-1] * _EDGES[1:])  # Nilai wakil bucket (rata-rata geometrik)
+
+
+def bucket_index(minutes):
+    """Durasi (menit, skalar atau array) -> index bucket"""
+    scaled = np.log(np.maximum(minutes, BUCKET_MIN_MINUTES) / BUCKET_MIN_MINUTES) / math.log(BUCKET_GROWTH)
+    return np.minimum(scaled.astype(np.int64), BUCKETS - 1)
+
+
+class DurationSketch:
+    """Histogram durasi bucket logaritmik: add/remove O(1), quantile atas cumsum ter-cache"""
+    def __init__(self, counts=None):
+        self.counts = np.zeros(BUCKETS, dtype=np.int64) if counts is None else counts
+        self.total = int(self.counts.sum())
+        self._cumulative = None
+
+    @classmethod
+    def from_minutes(cls, minutes):
+        return cls(np.bincount(bucket_index(np.asarray(minutes, dtype=np.float64)), minlength=BUCKETS))
+
+    def add(self, minutes, count=1):
+        self.counts[bucket_index(minutes)] += count
+        self.total += count
+        self._cumulative = None
+
+    def remove(self, minutes):
+        self.add(minutes, -1)
+
+    def cumulative(self):
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(self.counts)
+        return self._cumulative
+
+    def count_above(self, minutes):
+        """Jumlah sampel dengan durasi > minutes (granularitas bucket)"""
+        index = int(bucket_index(minutes))
+        return self.total - int(self.cumulative()[index])
+
+    def quantile(self, q, above=0.0):
+        """
+        Quantile durasi (menit); above > 0 -> quantile bersyarat durasi > above
+        (pesanan yang sudah berjalan selama `above` menit). None jika tidak ada sampel.
+        """
+        cumulative = self.cumulative()
+        floor = int(cumulative[int(bucket_index(above))]) if above > 0 else 0
+        remaining = self.total - floor
+        if remaining <= 0:
+            return None
+        index = int(np.searchsorted(cumulative, floor + q * remaining, side='left'))
+        return float(max(_MIDPOINTS[min(index, BUCKETS - 1)], above))
+
+
+def _local_now_minutes():
+    """Jam lokal toko sekarang (menit sejak epoch, naive lokal seperti date_parser)"""
+    now = datetime.now(ZoneInfo(SHOP_TIMEZONE)).replace(tzinfo=None)
+    return int(np.datetime64(now, 'm').astype(np.int64))
+
+
+def _iso_minutes(minutes):
+    return None if minutes is None else str(np.datetime64(int(round(minutes)), 'm'))
+
+
+class TurnaroundEstimator:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sketches = None      # {(service_id|None, level|None): DurationSketch}
+        self.level_edges = None   # Batas backlog (tertile) -> index BACKLOG_LEVELS
+        self.open = {}            # {id_transaction: (service_id, intake, backlog)}
+        self.completed = {}       # {id_transaction: (service_id, level, intake, duration, status)}
+        self.seeded_at = None
+        self.generation = None
+        self.pending = None       # Event selama seed berjalan (diputar ulang)
+        self._seeds = singleflight.Group()
+
+    # --- SEED ---
+
+    def ready(self):
+        with self.lock:
+            if self.sketches is None:
+                return False
+            if change_feed.is_live() and self.generation == change_feed.generation():
+                return True
+            return time.monotonic() - self.seeded_at < REFRESH_SECONDS
+
+    def ensure_seeded(self):
+        if not self.ready():
+            self._seeds.do('seed', self.seed)
+
+    def seed(self):
+        """Bangun ulang semua sketch dari tabel transactions (satu fetch)"""
+        if not breaker.allow():
+            raise Exception("Supabase sedang tidak tersedia (circuit open), coba lagi sebentar.")
+
+        generation = change_feed.generation()
+        with self.lock:
+            self.pending = []
+        try:
+            with metrics.stage('fetch'):
+                rows = execute(get_client().table('transactions') \
+                    .select('id_transaction, service_id, tanggal_masuk, tanggal_selesai, status_pesanan')).data or []
+        except Exception:
+            with self.lock:
+                self.pending = None
+            raise
+
+        with metrics.stage('aggregate'):
+            state = self._build(rows)
+
+        with self.lock:
+            self.sketches, self.level_edges, self.open, self.completed = state
+            self.seeded_at = time.monotonic()
+            self.generation = generation
+            for op, new, old in self.pending:
+                self._apply(op, new, old)
+            self.pending = None
+
+    def _build(self, rows):
+        """Semua durasi, backlog & sketch dari baris transaksi, vectorized"""
+        intake, bad_intake = parse_local_minutes([row.get('tanggal_masuk') for row in rows])
+        report_invalid('transactions', 'tanggal_masuk', rows, 'id_transaction', bad_intake)
+        done, bad_done = parse_local_minutes([row.get('tanggal_selesai') for row in rows])
+
+        ids = [row.get('id_transaction') for row in rows]
+        statuses = [row.get('status_pesanan') for row in rows]
+        services = np.array([row.get('service_id') for row in rows], dtype=object)
+        finished = np.array([status in STATUS_DONE for status in statuses], dtype=bool)
+        has_service = np.array([row.get('service_id') is not None for row in rows], dtype=bool)
+        intake = intake.astype(np.int64)
+        done = done.astype(np.int64)
+
+        valid = ~bad_intake & has_service
+        complete = valid & finished & ~bad_done
+        complete[complete] = done[complete] >= intake[complete]
+
+        # Backlog saat masuk: pesanan yang sudah masuk tapi belum selesai pada waktu itu
+        # (pesanan Diproses dianggap keluar antrean setelah MAX_OPEN_DAYS)
+        starts = np.sort(intake[valid])
+        ends = np.where(complete, done, intake + MAX_OPEN_DAYS * 24 * 60)[valid]
+        ends.sort()
+        backlog = np.zeros(len(rows), dtype=np.int64)
+        backlog[valid] = (np.searchsorted(starts, intake[valid], side='right')
+                          - np.searchsorted(ends, intake[valid], side='right') - 1)
+        backlog = np.maximum(backlog, 0)
+
+        edges = np.quantile(backlog[complete], [1 / 3, 2 / 3]) if complete.any() else np.zeros(2)
+        levels = np.searchsorted(edges, backlog, side='right')
+        durations = (done - intake).astype(np.float64)
+
+        sketches = {(None, None): DurationSketch.from_minutes(durations[complete])}
+        for service_id in set(services[complete].tolist()):
+            of_service = complete & (services == service_id)
+            sketches[(service_id, None)] = DurationSketch.from_minutes(durations[of_service])
+            for level in range(len(BACKLOG_LEVELS)):
+                sketches[(service_id, level)] = DurationSketch.from_minutes(durations[of_service & (levels == level)])
+
+        completed = {
+            ids[i]: (services[i], int(levels[i]), int(intake[i]), float(durations[i]), statuses[i])
+            for i in np.flatnonzero(complete).tolist()
+        }
+        open_orders = {
+            ids[i]: (services[i], int(intake[i]), int(backlog[i]))
+            for i in np.flatnonzero(valid & ~finished).tolist()
+        }
+        return sketches, edges, open_orders, completed
+
+    # --- CHANGE FEED ---
+
+    def on_change(self, op, new, old):
+        """Handler change feed tabel transactions (idempotent per id_transaction)"""
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((op, new, old))
+            if self.sketches is not None:
+                self._apply(op, new, old)
+
+    def _apply(self, op, new, old):
+        order_id = (new or old).get('id_transaction')
+        was_open = self.open.pop(order_id, None)
+        previous = self.completed.pop(order_id, None)
+        if previous is not None:
+            self._add_duration(previous, -1)
+        if op == 'DELETE':
+            return
+
+        (intake, done), invalid = parse_local_minutes([new.get('tanggal_masuk'), new.get('tanggal_selesai')])
+        if invalid[0] or new.get('service_id') is None:
+            return
+        intake = int(intake.astype(np.int64))
+        # Backlog milik pesanan dihitung saat pesanan masuk, bukan saat event ini
+        if was_open is not None:
+            backlog = was_open[2]
+        elif previous is not None:
+            backlog = self._backlog_of(previous)
+        else:
+            backlog = self._backlog_at(intake)
+
+        status = new.get('status_pesanan')
+        if status in STATUS_DONE and not invalid[1] and int(done.astype(np.int64)) >= intake:
+            entry = (new['service_id'], self._level(backlog), intake, float(int(done.astype(np.int64)) - intake), status)
+            self.completed[order_id] = entry
+            self._add_duration(entry, 1)
+        else:
+            self.open[order_id] = (new['service_id'], intake, backlog)
+
+    def _add_duration(self, entry, count):
+        service_id, level, _, duration, _ = entry
+        for key in ((None, None), (service_id, None), (service_id, level)):
+            self.sketches.setdefault(key, DurationSketch()).add(duration, count)
+
+    def _backlog_of(self, entry):
+        """Perkiraan backlog dari level tersimpan (pesanan yang sudah pernah selesai)"""
+        level = entry[1]
+        return int(self.level_edges[level - 1]) if level > 0 else 0
+
+    def _backlog_at(self, intake):
+        """Pesanan Diproses yang masuk dalam MAX_OPEN_DAYS terakhir sebelum `intake`"""
+        oldest = intake - MAX_OPEN_DAYS * 24 * 60
+        return sum(1 for _, started, _ in self.open.values() if oldest <= started <= intake)
+
+    def _level(self, backlog):
+        return int(np.searchsorted(self.level_edges, backlog, side='right'))
+
+    # --- QUERY ---
+
+    def _sketch_for(self, service_id, level, elapsed):
+        """Sketch paling spesifik dengan cukup sampel di atas `elapsed`"""
+        for key in ((service_id, level), (service_id, None), (None, None)):
+            sketch = self.sketches.get(key)
+            if sketch is not None and sketch.count_above(elapsed) >= MIN_SAMPLES:
+                return key, sketch
+        return (None, None), self.sketches.get((None, None))
+
+    def eta(self, order_id, now=None):
+        """
+        ETA satu pesanan (lookup dict + quantile atas sketch ter-cache)
+        Returns: dict, atau None jika pesanan tidak dikenal
+        """
+        self.ensure_seeded()
+        now = _local_now_minutes() if now is None else now
+
+        with self.lock:
+            done = self.completed.get(order_id)
+            if done is not None:
+                service_id, level, intake, duration, status = done
+                return {
+                    'id_transaction': order_id, 'service_id': service_id, 'status': status,
+                    'tanggal_masuk': _iso_minutes(intake), 'tanggal_selesai': _iso_minutes(intake + duration),
+                    'estimated_done': None, 'latest_done': None, 'overdue': False, 'basis': None
+                }
+
+            pending = self.open.get(order_id)
+            if pending is None:
+                return None
+            service_id, intake, backlog = pending
+            level = self._level(backlog)
+            elapsed = max(now - intake, 0)
+            key, sketch = self._sketch_for(service_id, level, elapsed)
+            estimates = [sketch.quantile(q, elapsed) if sketch is not None else None for q in QUANTILES]
+
+        return {
+            'id_transaction': order_id, 'service_id': service_id, 'status': 'Diproses',
+            'tanggal_masuk': _iso_minutes(intake), 'tanggal_selesai': None,
+            'estimated_done': _iso_minutes(None if estimates[0] is None else intake + estimates[0]),
+            'latest_done': _iso_minutes(None if estimates[1] is None else intake + estimates[1]),
+            # Sudah lebih lama dari semua pesanan serupa di histori
+            'overdue': estimates[0] is None,
+            'basis': {
+                'service_id': key[0],
+                'backlog': backlog,
+                'backlog_level': BACKLOG_LEVELS[key[1]] if key[1] is not None else None,
+                'samples': sketch.total if sketch is not None else 0,
+                'turnaround_hours': {
+                    f"p{int(q * 100)}": round(value / 60, 1) if value is not None else None
+                    for q, value in zip(QUANTILES, estimates)
+                }
+            }
+        }
+
+    def status(self):
+        with self.lock:
+            return {
+                'seeded': self.sketches is not None,
+                'open_orders': len(self.open),
+                'completed_orders': len(self.completed),
+                'sketches': len(self.sketches or ()),
+                'backlog_edges': self.level_edges.tolist() if self.level_edges is not None else None
+            }
+
+
+estimator = TurnaroundEstimator()
+change_feed.subscribe('transactions', estimator.on_change)
@@ -0,0 +1,67 @@
+"""
+Data beban kerja harian per layanan dari tabel transactions
+(tanggal_masuk, service_id, jumlah_unit) untuk forecast kapasitas
+(WorkloadPredictionModel di model.py, endpoint /api/workload-prediction)
+dan rekonsiliasi pemakaian bahan (reconciliation.py).
+
+Unit mengikuti layanan: kg untuk kiloan, pcs untuk satuan. Hari tanpa
+transaksi dihitung 0 unit (bukan data hilang), jadi sumbu tanggalnya rapat
+dari transaksi pertama sampai terakhir.
+"""
+import numpy as np
+from db import get_client, breaker, execute
+from date_parser import parse_local_days, report_invalid
+import metrics
+from logger import get_logger
+
+log = get_logger(__name__)
+
+
+def load_transactions():
+    """
+    Transaksi valid sebagai kolom numpy (satu fetch, tanggal di-parse sekaligus)
+    Returns: (days datetime64[D], service_ids int64, units float64), atau None jika kosong
+    """
+    if not breaker.allow():
+        raise Exception("Supabase sedang tidak tersedia (circuit open), coba lagi sebentar.")
+
+    with metrics.stage('fetch'):
+        rows = execute(get_client().table('transactions') \
+            .select('id_transaction, tanggal_masuk, service_id, jumlah_unit')).data
+
+    if not rows:
+        log.warning("no data found in transactions table")
+        return None
+
+    with metrics.stage('parse'):
+        days, invalid = parse_local_days([row.get('tanggal_masuk') for row in rows])
+        missing_service = np.array([row.get('service_id') is None for row in rows], dtype=bool)
+        report_invalid('transactions', 'tanggal_masuk', rows, 'id_transaction', invalid)
+        keep = np.flatnonzero(~(invalid | missing_service))
+        if len(keep) == 0:
+            return None
+
+        services = np.array([rows[i]['service_id'] for i in keep.tolist()], dtype=np.int64)
+        units = np.array([float(rows[i].get('jumlah_unit') or 0) for i in keep.tolist()], dtype=np.float64)
+    return days[keep], services, units
+
+
+def get_workload_series():
+    """
+    Total jumlah_unit per hari per service_id
+    Returns: (dates datetime64[D] (n,), service_ids int64 (k,), units float64 (n, k)),
+    atau (None, None, None) jika tidak ada transaksi valid
+    """
+    transactions = load_transactions()
+    if transactions is None:
+        return None, None, None
+    days, services, units = transactions
+
+    with metrics.stage('aggregate'):
+        first, last = days.min(), days.max()
+        dates = np.arange(first, last + 1)
+        service_ids, column = np.unique(services, return_inverse=True)
+        totals = np.zeros((len(dates), len(service_ids)), dtype=np.float64)
+        np.add.at(totals, ((days - first).astype(np.int64), column), units)
+
+    return dates, service_ids, totals
@@ -0,0 +1,25 @@
+# Konfigurasi gunicorn untuk server long-running (otomatis dibaca dari folder ini)
+#   gunicorn app:app        -> WSGI, worker gthread
+#   gunicorn app:asgi_app   -> ASGI, set GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Beberapa worker process per mesin (Render/Heroku mengisi WEB_CONCURRENCY)
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Fit model + panggilan Supabase/Groq bisa lama, tapi jangan menggantung selamanya
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+
+# Tanpa preload: setiap worker mengimpor app sendiri sehingga thread warm-up
+# chatbot (service.start_warm_up) berjalan di worker, bukan di master.
+preload_app = False
+
+# Restart worker secara berkala untuk membatasi pertumbuhan memori
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = 100
@@ -0,0 +1,279 @@
+"""
+Load test semua endpoint utama dengan campuran request yang realistis,
+lalu laporan throughput & latency p50/p95/p99 per endpoint + cek SLO.
+
+    # Server + data lokal otomatis (DATA_SOURCE=memory, chatbot faq)
+    python benchmarks/loadtest.py --serve --duration 30 --concurrency 64
+
+    # Server yang sudah jalan
+    python benchmarks/loadtest.py --url http://127.0.0.1:5000 --mix predict=1,historical=4,inventory=2,chatbot=3
+
+Exit code 1 jika ada SLO yang dilanggar (atau p95 lebih lambat dari
+--compare baseline melebihi --threshold), jadi bisa dipakai di CI.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from urllib.parse import urlparse
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# Campuran default: dashboard owner (historical) & chat pelanggan paling sering
+DEFAULT_MIX = 'predict=1,historical=4,inventory=2,chatbot=3'
+
+# SLO per endpoint (latency ms & error rate). Override dengan --slo file.json
+DEFAULT_SLOS = {
+    'predict': {'p95_ms': 2000, 'p99_ms': 5000, 'error_rate': 0.01},
+    'historical': {'p95_ms': 500, 'p99_ms': 1500, 'error_rate': 0.01},
+    'inventory': {'p95_ms': 500, 'p99_ms': 1500, 'error_rate': 0.01},
+    'chatbot': {'p95_ms': 3000, 'p99_ms': 8000, 'error_rate': 0.02},
+}
+
+CHAT_QUESTIONS = [
+    'berapa harga cuci kiloan?', 'jam buka laundry', 'bisa antar jemput?', 'cuci sepatu berapa',
+    'lokasi dimana', 'berapa lama pengerjaan', 'ada diskon member?', 'kapan cucian saya selesai'
+]
+
+
+def build_request(endpoint, rng):
+    """Returns: (method, path, body) untuk satu request endpoint"""
+    if endpoint == 'predict':
+        return 'GET', f"/api/predict?days={rng.choice([7, 30, 30, 90])}", None
+    if endpoint == 'historical':
+        granularity = rng.choice(['day', 'week', 'month', 'month'])
+        return 'GET', f"/api/historical?granularity={granularity}&format=columnar", None
+    if endpoint == 'inventory':
+        return 'GET', '/api/inventory-prediction', None
+    if endpoint == 'chatbot':
+        return 'POST', '/api/chatbot', json.dumps({'message': rng.choice(CHAT_QUESTIONS)})
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def parse_mix(text):
+    """'predict=1,historical=4' -> (['predict', 'historical'], [1.0, 4.0])"""
+    names, weights = [], []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_SLOS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def worker(base_url, names, weights, deadline, seed, samples):
+    """Closed-loop: satu koneksi keep-alive, request berikutnya setelah response"""
+    rng = random.Random(seed)
+    target = urlparse(base_url)
+    connection = None
+    local = []
+
+    while time.perf_counter() < deadline:
+        endpoint = rng.choices(names, weights)[0]
+        method, path, body = build_request(endpoint, rng)
+        headers = {'Accept-Encoding': 'gzip, br'}
+        if body:
+            headers['Content-Type'] = 'application/json'
+
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 500
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException):
+            ok = False
+            if connection is not None:
+                connection.close()
+            connection = None
+        local.append((endpoint, (time.perf_counter() - started) * 1000, ok))
+
+    if connection is not None:
+        connection.close()
+    samples.extend(local)
+
+
+def summarize(samples, duration):
+    report = {}
+    for endpoint in sorted({sample[0] for sample in samples}):
+        latencies = np.array([s[1] for s in samples if s[0] == endpoint])
+        errors = sum(1 for s in samples if s[0] == endpoint and not s[2])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[endpoint] = {
+            'requests': int(len(latencies)),
+            'errors': errors,
+            'error_rate': round(errors / len(latencies), 4),
+            'rps': round(len(latencies) / duration, 2),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'max_ms': round(float(latencies.max()), 2)
+        }
+    return report
+
+
+def check_slos(report, slos):
+    """Returns: list pelanggaran SLO"""
+    violations = []
+    for endpoint, stats in report.items():
+        for key, limit in slos.get(endpoint, {}).items():
+            if stats.get(key, 0) > limit:
+                violations.append(f"{endpoint}: {key} {stats[key]} > {limit}")
+    return violations
+
+
+def compare(report, baseline, threshold):
+    """Returns: list endpoint yang p95-nya regresi dibanding baseline"""
+    regressions = []
+    for endpoint, stats in report.items():
+        old = baseline.get('endpoints', {}).get(endpoint)
+        if old and old['p95_ms'] and stats['p95_ms'] > old['p95_ms'] * (1 + threshold):
+            regressions.append(f"{endpoint}: p95 {old['p95_ms']} -> {stats['p95_ms']} ms")
+    return regressions
+
+
+def start_server(port, scale):
+    """Jalankan backend-ml (gunicorn jika ada, selain itu Flask) dengan data lokal"""
+    env = {
+        **os.environ,
+        'PORT': str(port),
+        'DATA_SOURCE': os.environ.get('DATA_SOURCE', 'memory'),
+        'DATA_SOURCE_SCALE': str(scale),
+        'CHATBOT_BACKEND': os.environ.get('CHATBOT_BACKEND', 'faq'),
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING'),
+    }
+    backend = os.path.join(ROOT, 'backend-ml')
+    try:
+        import gunicorn  # noqa: F401
+        command = [sys.executable, '-m', 'gunicorn', 'app:app']
+    except ImportError:
+        command = [sys.executable, 'app.py']
+    # Log akses server tidak ditampilkan (jalankan backend-ml/app.py manual untuk debug)
+    process = subprocess.Popen(command, cwd=backend, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    health = f"http://127.0.0.1:{port}/api/ready"
+    for _ in range(120):
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(health, timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('Server did not become ready in time')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='APIK Laundry API load test')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--serve', action='store_true', help='Start backend-ml lokal dengan DATA_SOURCE=memory')
+    parser.add_argument('--port', type=int, default=5055, help='Port server untuk --serve')
+    parser.add_argument('--scale', type=int, default=10000, help='Baris data sintetis untuk --serve')
+    parser.add_argument('--duration', type=float, default=30, help='Detik')
+    parser.add_argument('--warmup', type=float, default=3, help='Detik warm-up (tidak dihitung)')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--slo', help='File JSON SLO {endpoint: {p95_ms, p99_ms, error_rate}}')
+    parser.add_argument('--compare', help='Laporan JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Batas regresi p95 (0.2 = 20%%)')
+    parser.add_argument('--output', help='File JSON laporan (default: benchmarks/results/load-<timestamp>.json)')
+    args = parser.parse_args()
+    if args.duration <= 0:
+        parser.error('--duration must be greater than 0')
+
+    names, weights = parse_mix(args.mix)
+    slos = DEFAULT_SLOS
+    if args.slo:
+        with open(args.slo) as f:
+            slos = {**DEFAULT_SLOS, **json.load(f)}
+
+    server = None
+    base_url = args.url
+    if args.serve:
+        server = start_server(args.port, args.scale)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        for phase, duration in (('warmup', args.warmup), ('measure', args.duration)):
+            if duration <= 0:
+                continue
+            samples = []
+            deadline = time.perf_counter() + duration
+            threads = [
+                threading.Thread(target=worker, args=(base_url, names, weights, deadline, args.seed + i, samples))
+                for i in range(args.concurrency)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    endpoints = summarize(samples, elapsed)
+    total = len(samples)
+    report = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'url': base_url,
+            'duration_s': round(elapsed, 2),
+            'concurrency': args.concurrency,
+            'mix': args.mix,
+            'seed': args.seed
+        },
+        'total': {'requests': total, 'rps': round(total / elapsed, 2)},
+        'endpoints': endpoints,
+        'slos': slos
+    }
+
+    print(f"\n{total:,} requests in {elapsed:.1f}s ({total / elapsed:,.1f} req/s), concurrency {args.concurrency}\n")
+    print(f"  {'endpoint':<12} {'req':>8} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'err%':>7}")
+    for endpoint, stats in endpoints.items():
+        print(f"  {endpoint:<12} {stats['requests']:>8} {stats['rps']:>9.1f} {stats['p50_ms']:>7.1f}ms "
+              f"{stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms {stats['error_rate'] * 100:>6.2f}")
+
+    failures = check_slos(endpoints, slos)
+    if args.compare:
+        with open(args.compare) as f:
+            failures += compare(endpoints, json.load(f), args.threshold)
+    report['failures'] = failures
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nLaporan disimpan ke {output}")
+
+    if failures:
+        print("\nSLO FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nSemua SLO terpenuhi")
+
+
+if __name__ == '__main__':
+    main()
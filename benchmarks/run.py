@@ -0,0 +1,175 @@
+"""
+Benchmark suite: latency & peak memory hot path API dengan data sintetis.
+
+    python benchmarks/run.py                              # skala 1k, 10k, 100k
+    python benchmarks/run.py --scales 1k,1M --repeat 3
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+
+Data dari api/synthetic_data.py (deterministik) disajikan lewat
+FakeSupabase (api/fake_supabase.py), jadi tidak butuh koneksi Supabase.
+Hasil disimpan sebagai JSON; --compare menandai benchmark yang median-nya
+lebih lambat dari baseline melebihi --threshold (exit code 1).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'api'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')  # Jangan ukur I/O log
+os.environ.setdefault('CHATBOT_BACKEND', 'faq')
+os.environ['DATA_FETCH_BUDGET_MS'] = '0'  # Ukur fetch sampai selesai, bukan budget stale-while-revalidate
+os.environ['DATA_FRESH_SECONDS'] = '0'     # ... dan setiap panggilan benar-benar fetch
+
+import numpy as np
+import db
+import fetch_data
+from fake_supabase import FakeSupabase
+from fetch_data import get_revenue_data
+from model import RevenuePredictionModel
+from inventory import InventoryPredictor
+from faq_matcher import FaqMatcher
+import synthetic_data
+
+DEFAULT_SCALES = '1k,10k,100k'
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+CHAT_QUESTIONS = [
+    'berapa harga cuci kiloan?', 'jam buka laundry', 'bisa antar jemput?', 'cuci sepatu berapa',
+    'lokasi dimana', 'berapa lama pengerjaan', 'bayar pakai qris bisa?', 'ada diskon member?',
+    'noda tinta bisa hilang?', 'kapan selesai cucian saya'
+]
+
+
+def measure(fn, repeat):
+    """Latency (ms) dari `repeat` kali jalan + peak memory satu kali jalan terpisah"""
+    fn()  # Warm-up (import lazy, cache numpy, dll.)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # tracemalloc memperlambat eksekusi, jadi diukur di luar timing
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(timings[0], 3),
+        'max_ms': round(timings[-1], 3),
+        'p95_ms': round(float(np.percentile(timings, 95)), 3),
+        'peak_mb': round(peak / 1024 / 1024, 3),
+        'runs': repeat
+    }
+
+
+def run_scale(scale, repeat, seed):
+    tables = synthetic_data.generate(scale, seed=seed)
+    db.set_client(FakeSupabase(tables))
+    fetch_data.reset()  # Snapshot / rollup skala sebelumnya tidak boleh ikut terpakai
+
+    revenue_data = get_revenue_data()
+    model = RevenuePredictionModel()
+    model.train(revenue_data)
+    bot = FaqMatcher()
+
+    def chat_lookups():
+        for question in CHAT_QUESTIONS:
+            bot.get_response(question)
+
+    benchmarks = {
+        'get_revenue_data': get_revenue_data,
+        'model_train': lambda: RevenuePredictionModel().train(revenue_data),
+        'model_predict_future': lambda: model.predict_future(days=30),
+        'inventory_prediction': lambda: InventoryPredictor().get_prediction(),
+        'chatbot_lookup_x10': chat_lookups,
+    }
+
+    results = {}
+    for name, fn in benchmarks.items():
+        results[name] = measure(fn, repeat)
+        print(f"  {name:<24} median {results[name]['median_ms']:>10.2f} ms   peak {results[name]['peak_mb']:>8.2f} MB")
+
+    return {
+        'rows': {table: len(rows) for table, rows in tables.items()},
+        'revenue_days': len(revenue_data),
+        'benchmarks': results
+    }
+
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """Returns: list regresi (median lebih lambat > threshold dan > min_delta_ms dari baseline)"""
+    regressions = []
+    for scale, result in current['results'].items():
+        base = baseline.get('results', {}).get(scale)
+        if not base:
+            continue
+        for name, stats in result['benchmarks'].items():
+            old = base['benchmarks'].get(name)
+            if not old or not old['median_ms']:
+                continue
+            ratio = stats['median_ms'] / old['median_ms']
+            slower = stats['median_ms'] - old['median_ms']
+            marker = 'REGRESSION' if ratio > 1 + threshold and slower > min_delta_ms else ''
+            print(f"  {scale:>10} {name:<24} {old['median_ms']:>10.2f} -> {stats['median_ms']:>10.2f} ms  x{ratio:.2f} {marker}")
+            if marker:
+                regressions.append({'scale': scale, 'benchmark': name, 'ratio': round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='APIK Laundry API benchmark suite')
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help='Jumlah baris, mis. 1k,10k,100k,1M,10M')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='File JSON hasil (default: benchmarks/results/bench-<timestamp>.json)')
+    parser.add_argument('--compare', help='File JSON baseline untuk perbandingan')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Batas regresi median (0.2 = 20%% lebih lambat)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Selisih median minimum agar dianggap regresi (abaikan noise)')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'results': {}
+    }
+
+    for text in args.scales.split(','):
+        scale = synthetic_data.parse_scale(text)
+        print(f"Scale {scale:,} rows")
+        report['results'][str(scale)] = run_scale(scale, args.repeat, args.seed)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nPerbandingan dengan {args.compare}:")
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regresi di atas {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nTidak ada regresi")
+
+
+if __name__ == '__main__':
+    main()